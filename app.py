@@ -4,22 +4,20 @@ app.py (확장판)
 - 스타일 분석 미리보기 (샷 히스토그램 + 대표 프레임)
 - Whisper 옵션(자막 생성)
 - 편집 후 DaVinci Resolve 타임라인 생성 옵션
-- 썸네일 클릭 시 해당 장면 재생 (modules.preview)
+- 썸네일 클릭 시 해당 장면 재생 (modules.preview, 분석 직후 미리보기 클립을 캐시에 미리 생성)
+- 분석/렌더는 백그라운드 작업(modules.background)으로 실행: 창이 멈추지 않고, 대기열 + 취소 지원
 """
 import os
 import subprocess
-import json
-import shutil
 import sys
+import time
 from pathlib import Path
 import PySimpleGUI as sg
 
-from modules.analyzer import analyze_with_preview
-from modules.editor import create_edl_and_render
-from modules.style import save_style_package, load_style
-from modules.bgm import index_bgm_folder
+from modules.style import save_style_package, save_preview_assets, load_style
 from modules.resolve import export_to_resolve_project
-from modules.preview import play_scene_clip
+from modules.preview import play_scene_clip, prefetch
+from modules.background import JobRunner, EVENT_START, EVENT_LOG, EVENT_DONE
 
 # 프로젝트 폴더 설정
 ROOT = Path.cwd()
@@ -29,26 +27,21 @@ EDLS_DIR = ROOT / "edls"
 OUTPUT_DIR = ROOT / "output"
 BGM_DIR = ROOT / "bgm"
 
-for d in [STYLES_DIR, CLIPS_DIR, EDLS_DIR, OUTPUT_DIR, BGM_DIR]:
-    d.mkdir(parents=True, exist_ok=True)
-
-sg.theme("SystemDefault")
-
-layout = [
-    [sg.Text("Auto Edit Style (Local MVP) — 확장판", font=("Helvetica", 16))],
-    [sg.Button("스타일 분석", size=(20,2)), sg.Button("편집", size=(20,2))],
-    [sg.HorizontalSeparator()],
-    [sg.Text("로그 출력:")],
-    [sg.Multiline(key="-LOG-", size=(100,14), disabled=True)]
-]
-
-window = sg.Window("Auto Edit Style", layout, finalize=True)
+window = None
+runner = None
 
 
 def log(msg):
     window["-LOG-"].print(msg)
 
 
+def update_status():
+    if runner.busy():
+        window["-STATUS-"].update(f"작업 실행 중 (대기 {runner.pending()}개)")
+    else:
+        window["-STATUS-"].update("대기 중")
+
+
 def run_style_analysis():
     # Ask for YouTube URL or local file(s)
     layout_choice = [
@@ -57,6 +50,7 @@ def run_style_analysis():
         [sg.Text("유튜브 URL (하나만 가능):"), sg.Input(key="-URL-")],
         [sg.Text("또는 파일 선택:"), sg.Input(key="-FILES-"), sg.FilesBrowse(file_types=(("Video Files", "*.mp4;*.mov;*.mkv;*.webm"),))],
         [sg.Checkbox("Whisper로 자막 생성 (설치 필요)", key="-WHISPER-")],
+        [sg.Checkbox("저해상도 프록시로 분석 (같은 소스를 반복 분석할 때 빠름)", key="-PROXY-")],
         [sg.Button("분석 시작"), sg.Button("취소")]
     ]
     w = sg.Window("스타일 분석", layout_choice, modal=True)
@@ -66,114 +60,83 @@ def run_style_analysis():
             w.close(); return
         if ev == "분석 시작":
             use_whisper = bool(vals["-WHISPER-"])
+            job = {"type": "analyze", "whisper": use_whisper, "proxy": bool(vals["-PROXY-"])}
             if vals["-URLRADIO-"]:
                 url = vals["-URL-"].strip()
                 if not url:
                     sg.popup("유튜브 링크를 입력하세요.")
                     continue
-                tmpdir = ROOT / "samples" / "raw"
-                tmpdir.mkdir(parents=True, exist_ok=True)
-                log(f"다운로드 요청: {url}")
-                try:
-                    import tempfile
-                    tf = tempfile.NamedTemporaryFile(delete=False, mode="w", suffix=".txt")
-                    tf.write(url)
-                    tf.flush()
-                    tf.close()
-                    subprocess.run([sys.executable, "scripts/download.py", "--urls", tf.name, "--outdir", str(tmpdir)], check=True)
-                    os.unlink(tf.name)
-                except subprocess.CalledProcessError as e:
-                    log(f"다운로드 실패: {e}")
-                    sg.popup("다운로드 실패. 콘솔 로그 확인.")
-                    continue
-                downloaded = list(tmpdir.glob("*.*"))
-                if not downloaded:
-                    sg.popup("다운로드된 파일이 없습니다.")
-                    continue
-                # perform analysis WITH preview (generates histogram and thumbnails)
-                try:
-                    style, preview = analyze_with_preview(downloaded, use_whisper=use_whisper, progress_callback=log)
-                except Exception as e:
-                    log(f"분석 실패: {e}")
-                    sg.popup("분석 실패. 콘솔 로그 확인.")
-                    continue
+                job.update({"urls": [url], "download_dir": str(ROOT / "samples" / "raw")})
+                label = f"분석: {url}"
             else:
                 files = vals["-FILES-"]
                 if not files:
                     sg.popup("분석할 로컬 비디오 파일을 선택하세요.")
                     continue
-                paths = [Path(p) for p in files.split(";") if p]
-                try:
-                    style, preview = analyze_with_preview(paths, use_whisper=use_whisper, progress_callback=log)
-                except Exception as e:
-                    log(f"분석 실패: {e}")
-                    sg.popup("분석 실패. 콘솔 로그 확인.")
-                    continue
+                job["inputs"] = [p for p in files.split(";") if p]
+                label = f"분석: {len(job['inputs'])}개 파일"
+            runner.submit(job, label=label)
+            log(f"작업 대기열에 추가: {label}")
+            update_status()
+            w.close()
+            return
 
-            # show preview: histogram + thumbnails + subtitle excerpt if exists
-            hist_png = preview.get("histogram_png")
-            thumbs = preview.get("thumbs", [])
-            srt = preview.get("srt_path")
-            # build preview layout
-            preview_layout = [[sg.Text("분석 결과 미리보기")]]
-            if hist_png and Path(hist_png).exists():
-                preview_layout.append([sg.Image(hist_png)])
-            # create buttons for thumbnails
-            thumb_buttons = []
-            for idx, t in enumerate(thumbs):
-                thumb_path = t["thumb"]
-                if Path(thumb_path).exists():
-                    thumb_buttons.append(sg.Button(image_filename=str(thumb_path), key=f"-THUMB-{idx}-", pad=(2,2)))
-            if thumb_buttons:
-                # show in rows of up to 4
-                rows = [thumb_buttons[i:i+4] for i in range(0, len(thumb_buttons), 4)]
-                for r in rows:
-                    preview_layout.append(r)
-            if srt and Path(srt).exists():
-                preview_layout.append([sg.Text("추출된 자막(일부):")])
-                lines = open(srt, "r", encoding="utf-8").read().splitlines()[:20]
-                preview_layout.append([sg.Multiline("\n".join(lines), size=(80,10), disabled=True)])
-            preview_layout.append([sg.Button("저장"), sg.Button("취소")])
-            pv = sg.Window("미리보기", preview_layout, modal=True, finalize=True)
-            # map thumb button keys to metadata
-            thumb_map = {f"-THUMB-{i}-": t for i,t in enumerate(thumbs)}
-            while True:
-                ev2, vals2 = pv.read()
-                if ev2 in (sg.WIN_CLOSED, "취소"):
-                    pv.close()
-                    w.close()
-                    return
-                if ev2 == "저장":
-                    save_to = sg.popup_get_folder("스타일 저장할 위치 선택", default_path=str(STYLES_DIR))
-                    if not save_to:
-                        sg.popup("저장 취소됨.")
-                        pv.close(); w.close(); return
-                    style_pkg_path = save_style_package(style, Path(save_to))
-                    # copy preview assets into package assets
-                    assets_dir = Path(style_pkg_path) / "assets"
-                    assets_dir.mkdir(exist_ok=True)
-                    if hist_png:
-                        shutil.copy(hist_png, assets_dir / Path(hist_png).name)
-                    for t in thumbs:
-                        shutil.copy(t["thumb"], assets_dir / Path(t["thumb"]).name)
-                    if srt:
-                        shutil.copy(srt, assets_dir / Path(srt).name)
-                    log(f"스타일 저장 완료: {style_pkg_path}")
-                    sg.popup(f"스타일 저장 완료: {style_pkg_path}")
-                    pv.close(); w.close(); return
-                # thumbnail clicked
-                if ev2 in thumb_map:
-                    meta = thumb_map[ev2]
-                    video = meta.get("video")
-                    start = meta.get("start")
-                    end = meta.get("end")
-                    try:
-                        log(f"Play preview: {video} ({start:.2f}-{end:.2f})")
-                        play_scene_clip(video, start, end, length_sec=2.0)
-                    except Exception as e:
-                        log(f"Preview play failed: {e}")
-                        sg.popup("미리보기 재생 실패. 콘솔 로그 확인.")
-            # end preview loop
+
+def show_analysis_preview(style, preview):
+    # show preview: histogram + thumbnails + subtitle excerpt if exists
+    hist_png = preview.get("histogram_png")
+    thumbs = preview.get("thumbs", [])
+    srt = preview.get("srt_path")
+    # build preview layout
+    preview_layout = [[sg.Text("분석 결과 미리보기")]]
+    if hist_png and Path(hist_png).exists():
+        preview_layout.append([sg.Image(hist_png)])
+    # create buttons for thumbnails
+    thumb_buttons = []
+    for idx, t in enumerate(thumbs):
+        thumb_path = t["thumb"]
+        if Path(thumb_path).exists():
+            thumb_buttons.append(sg.Button(image_filename=str(thumb_path), key=f"-THUMB-{idx}-", pad=(2,2)))
+    if thumb_buttons:
+        # show in rows of up to 4
+        rows = [thumb_buttons[i:i+4] for i in range(0, len(thumb_buttons), 4)]
+        for r in rows:
+            preview_layout.append(r)
+    if srt and Path(srt).exists():
+        preview_layout.append([sg.Text("추출된 자막(일부):")])
+        lines = open(srt, "r", encoding="utf-8").read().splitlines()[:20]
+        preview_layout.append([sg.Multiline("\n".join(lines), size=(80,10), disabled=True)])
+    preview_layout.append([sg.Button("저장"), sg.Button("취소")])
+    pv = sg.Window("미리보기", preview_layout, modal=True, finalize=True)
+    # map thumb button keys to metadata
+    thumb_map = {f"-THUMB-{i}-": t for i,t in enumerate(thumbs)}
+    while True:
+        ev2, vals2 = pv.read()
+        if ev2 in (sg.WIN_CLOSED, "취소"):
+            pv.close()
+            return
+        if ev2 == "저장":
+            save_to = sg.popup_get_folder("스타일 저장할 위치 선택", default_path=str(STYLES_DIR))
+            if not save_to:
+                sg.popup("저장 취소됨.")
+                pv.close(); return
+            style_pkg_path = save_style_package(style, Path(save_to))
+            save_preview_assets(style_pkg_path, preview)
+            log(f"스타일 저장 완료: {style_pkg_path}")
+            sg.popup(f"스타일 저장 완료: {style_pkg_path}")
+            pv.close(); return
+        # thumbnail clicked
+        if ev2 in thumb_map:
+            meta = thumb_map[ev2]
+            video = meta.get("video")
+            start = meta.get("start")
+            end = meta.get("end")
+            try:
+                log(f"Play preview: {video} ({start:.2f}-{end:.2f})")
+                play_scene_clip(video, start, end, length_sec=2.0)
+            except Exception as e:
+                log(f"Preview play failed: {e}")
+                sg.popup("미리보기 재생 실패. 콘솔 로그 확인.")
 
 
 def run_edit_flow():
@@ -194,16 +157,15 @@ def run_edit_flow():
             sg.popup("스타일 선택 취소")
             return
         style_path = Path(style_path)
-    # index bgm
-    index_bgm_folder(BGM_DIR, lambda m: window["-LOG-"].print(m))
-    out_base = EDLS_DIR / f"edl_{os.getpid()}"
-    out_base.mkdir(parents=True, exist_ok=True)
-    try:
-        edl_path, rendered = create_edl_and_render(clip_paths, style_path, out_base, log_fn=log)
-    except Exception as e:
-        log(f"편집/렌더 실패: {e}")
-        sg.popup("편집 또는 렌더 중 오류가 발생했습니다. 콘솔 로그 확인.")
-        return
+    job = {"type": "edit", "clips": [str(p) for p in clip_paths], "style": str(style_path) if style_path else None,
+           "output": str(EDLS_DIR / f"edl_{os.getpid()}_{int(time.time())}"), "bgm_dir": str(BGM_DIR)}
+    label = f"편집: {len(clip_paths)}개 클립"
+    runner.submit(job, label=label)
+    log(f"작업 대기열에 추가: {label}")
+    update_status()
+
+
+def finish_edit(edl_path, rendered):
     log(f"EDL 저장: {edl_path}")
     log(f"렌더 결과: {rendered}")
     # confirm dialog with Resolve option
@@ -215,7 +177,7 @@ def run_edit_flow():
         choice = sg.popup_yes_no("DaVinci Resolve 타임라인으로 내보내시겠습니까?\n(Yes = Resolve로, No = 폴더 열기)")
         if choice == "Yes":
             try:
-                project_path = export_to_resolve_project(edl_path, Path(rendered).parent, lambda m: window["-LOG-"].print(m))
+                project_path = export_to_resolve_project(edl_path, Path(rendered).parent, log)
                 sg.popup(f"Resolve 프로젝트 생성 완료: {project_path}")
             except Exception as e:
                 log(f"Resolve export 실패: {e}")
@@ -233,13 +195,69 @@ def run_edit_flow():
             except Exception:
                 log("폴더 열기 실패")
 
-while True:
-    event, values = window.read()
-    if event == sg.WIN_CLOSED:
-        break
-    if event == "스타일 분석":
-        run_style_analysis()
-    if event == "편집":
-        run_edit_flow()
 
-window.close()
\ No newline at end of file
+def on_job_done(info):
+    if info["cancelled"]:
+        log(f"작업 취소됨: {info['label']}")
+        return
+    if info["error"]:
+        log(f"작업 실패 ({info['label']}): {info['error']}")
+        sg.popup("분석 또는 편집/렌더 중 오류가 발생했습니다. 로그 확인.")
+        return
+    log(f"작업 완료: {info['label']} ({info['wall_s']:.1f}s)")
+    result = info["result"]
+    if info["job"]["type"] == "analyze":
+        # 썸네일 클릭 시 바로 재생되도록 미리보기 클립을 백그라운드에서 생성 (로그는 이벤트로 GUI 스레드에 전달)
+        prefetch(result["preview"].get("thumbs", []), length_sec=2.0,
+                 log_fn=lambda m: window.write_event_value(EVENT_LOG, m))
+        show_analysis_preview(result["style"], result["preview"])
+    else:
+        finish_edit(result["edl"], result["rendered"])
+
+
+def main():
+    global window, runner
+    for d in [STYLES_DIR, CLIPS_DIR, EDLS_DIR, OUTPUT_DIR, BGM_DIR]:
+        d.mkdir(parents=True, exist_ok=True)
+
+    sg.theme("SystemDefault")
+
+    layout = [
+        [sg.Text("Auto Edit Style (Local MVP) — 확장판", font=("Helvetica", 16))],
+        [sg.Button("스타일 분석", size=(20,2)), sg.Button("편집", size=(20,2)), sg.Button("작업 취소", key="-CANCEL-", size=(20,2))],
+        [sg.Text("대기 중", key="-STATUS-", size=(60,1))],
+        [sg.HorizontalSeparator()],
+        [sg.Text("로그 출력:")],
+        [sg.Multiline(key="-LOG-", size=(100,14), disabled=True, autoscroll=True)]
+    ]
+
+    window = sg.Window("Auto Edit Style", layout, finalize=True)
+    # 분석/렌더는 자식 프로세스에서 실행되고, 진행 상황은 이벤트로 GUI 스레드에 전달된다
+    runner = JobRunner(window.write_event_value)
+
+    while True:
+        event, values = window.read()
+        if event == sg.WIN_CLOSED:
+            break
+        if event == "스타일 분석":
+            run_style_analysis()
+        if event == "편집":
+            run_edit_flow()
+        if event == "-CANCEL-":
+            if not runner.cancel():
+                log("취소할 작업이 없습니다.")
+        if event == EVENT_START:
+            log(f"작업 시작: {values[event]['label']}")
+        if event == EVENT_LOG:
+            log(values[event])
+        if event == EVENT_DONE:
+            on_job_done(values[event])
+        update_status()
+
+    runner.shutdown()
+    window.close()
+
+
+if __name__ == "__main__":
+    # spawn 방식 자식 프로세스가 이 모듈을 다시 import 하므로 GUI 생성은 main()에서만
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+cli.py
+- 헤드리스(GUI 없는) 배치 실행기: 분석/편집 작업 manifest를 워커 큐로 처리
+usage:
+  python cli.py run jobs.json [--workers 2] [--status status.jsonl] [--log-dir batch_logs] [--force] [--trace]
+  python cli.py merge-styles styles/a/style.json styles/b/style.json --name ab [--out styles]
+
+jobs.json 예:
+  {
+    "defaults": {"trim_workers": 2},
+    "jobs": [
+      {"id": "vlog_style", "type": "analyze", "inputs": ["refs/a.mp4", "refs/b.mp4"], "output": "styles"},
+      {"id": "ep01", "type": "edit", "clips": ["clips/ep01.mp4"], "style_job": "vlog_style", "output": "edls/ep01"}
+    ]
+  }
+- 완료된 작업(출력 폴더에 job.done.json 존재)은 건너뛰므로 중단 후 같은 명령으로 재개 가능
+- 작업별 상태(start/skipped/done/failed, wall_s, cpu_s)는 stdout(또는 --status 파일)에 JSON lines로 기록
+- --trace: 모든 작업의 단계별 계측(trace.json, trace_summary.txt)을 출력 폴더에 저장 (작업별 "trace" 키가 우선)
+- merge-styles: 저장된 스타일(style.json 또는 스타일 패키지 폴더)들의 요약 통계를 재분석 없이 합쳐 새 스타일 패키지로 저장
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from modules.batch import load_manifest, run_manifest
+from modules.style import load_style, merge_styles, save_style_package
+
+def cmd_run(args):
+    jobs = load_manifest(args.manifest)
+    if args.trace:
+        # 워커 프로세스가 환경변수를 물려받는다
+        os.environ["AUTO_EDIT_TRACE"] = "1"
+    status_fh = open(args.status, "a", encoding="utf-8") if args.status else None
+
+    def status_fn(rec):
+        rec = dict(rec, ts=time.time())
+        line = json.dumps(rec, ensure_ascii=False)
+        print(line, flush=True)
+        if status_fh:
+            status_fh.write(line + "\n")
+            status_fh.flush()
+
+    t0 = time.perf_counter()
+    try:
+        final = run_manifest(jobs, workers=args.workers, status_fn=status_fn, log_dir=args.log_dir, force=args.force)
+    finally:
+        if status_fh:
+            status_fh.close()
+    counts = {}
+    for rec in final.values():
+        counts[rec["event"]] = counts.get(rec["event"], 0) + 1
+    summary = {"event": "summary", "jobs": len(jobs), "wall_s": time.perf_counter() - t0, **counts}
+    print(json.dumps(summary, ensure_ascii=False), flush=True)
+    return 1 if counts.get("failed") else 0
+
+def cmd_merge_styles(args):
+    styles = []
+    for s in args.styles:
+        p = Path(s)
+        styles.append(load_style(p / "style.json" if p.is_dir() else p))
+    merged = merge_styles(styles, name=args.name)
+    pkg = save_style_package(merged, Path(args.out))
+    print(json.dumps({"event": "merged", "package": pkg, "sources": merged["source_count"],
+                      "mean_avg_cut_length": merged["mean_avg_cut_length"], "tempo_median": merged["tempo_median"]},
+                     ensure_ascii=False), flush=True)
+    return 0
+
+def main():
+    p = argparse.ArgumentParser(description="Auto Edit Style headless batch runner")
+    sub = p.add_subparsers(dest="command", required=True)
+    r = sub.add_parser("run", help="run a manifest of analyze/edit jobs")
+    r.add_argument("manifest", help="jobs JSON file")
+    r.add_argument("--workers", type=int, default=1, help="jobs running at the same time")
+    r.add_argument("--status", default=None, help="append JSON-lines status records to this file")
+    r.add_argument("--log-dir", default="batch_logs", help="per-job log files")
+    r.add_argument("--force", action="store_true", help="re-run jobs even if their output is complete")
+    r.add_argument("--trace", action="store_true", help="write per-stage trace.json / trace_summary.txt for every job")
+    r.set_defaults(func=cmd_run)
+    m = sub.add_parser("merge-styles", help="merge saved styles without re-analysis")
+    m.add_argument("styles", nargs="+", help="style.json files or style package folders")
+    m.add_argument("--name", default=None, help="name of the merged style (package folder name)")
+    m.add_argument("--out", default="styles", help="folder to save the merged style package in")
+    m.set_defaults(func=cmd_merge_styles)
+    args = p.parse_args()
+    sys.exit(args.func(args))
+
+if __name__ == "__main__":
+    main()
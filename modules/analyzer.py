@@ -4,27 +4,75 @@ modules/analyzer.py (확장)
 - 샷 분할(PySceneDetect)
 - 오디오 분석(librosa)
 - dissolve 전환 감지 (간단 휴리스틱)
-- 히스토그램 이미지 생성 + 대표 프레임 추출(썸네일)
+- 스트리밍 오디오 분석 (ffmpeg 파이프 블록 단위, 긴 소스에서 메모리 일정)
+- 단일 디코드 패스(scan_video): 컷 감지 + dissolve 신호 + 썸네일을 한 번의 순차 읽기로 처리
+- 빠른 컷 감지(scene_mode="fast"): 축소 + frame_skip coarse 패스로 후보를 찾고 후보 주변만 전체 프레임으로 refine
+- 긴 영상 1개의 컷 감지를 겹치는 시간 샤드로 나눠 여러 프로세스에서 실행 (detect_scenes_sharded, scene_workers 옵션)
+- 히스토그램 이미지 생성(PIL로 직접 그림) + 대표 프레임 추출(썸네일, 영상당 한 번 열어 순서대로 방문)
 - Whisper 호출 hook (실제 추론은 modules/whisper_integration.py)
+- 분석 결과 디스크 캐시 (modules/cache.py, 파일 내용 해시 + 분석 파라미터 키)
+- 여러 파일 병렬 분석 (프로세스 풀, workers 옵션)
+- 스타일 통계는 병합 가능한 요약으로 집계 (modules/style.py, 씬 목록은 스타일에 저장하지 않음)
+- 프록시 분석 (use_proxy=True: 영상 분석은 modules/proxy.py의 저해상도 프록시로, 시각은 원본 기준으로 변환)
+- 단계별 계측 (modules/trace.py: 시간/CPU/RSS, trace_run=True 또는 AUTO_EDIT_TRACE=1)
 """
 from pathlib import Path
 import json
 import tempfile
 import subprocess
 import os
+import heapq
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
-from scenedetect import VideoManager, SceneManager
+from scenedetect import SceneManager
 from scenedetect.detectors import ContentDetector
+try:
+    from scenedetect import open_video
+except ImportError:
+    # PySceneDetect < 0.6: VideoManager API만 있음
+    open_video = None
+    from scenedetect import VideoManager
 import librosa
 from typing import List, Dict
 import cv2
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-from modules.whisper_integration import transcribe_with_whisper
-from PIL import Image
+from modules.whisper_integration import transcribe_with_whisper, transcribe_many
+from modules import cache
+from modules import probe
+from modules import proxy
+from modules import trace
+from modules.style import style_from_profiles
+from PIL import Image, ImageDraw, ImageFont
+from concurrent.futures import ThreadPoolExecutor
 
-def detect_scenes(video_path: Path, threshold=30.0):
+# 분석 알고리즘이 바뀌면 올려서 이전 캐시 결과를 무효화한다
+ANALYSIS_VERSION = 2
+
+# scene_mode="fast": 축소 프레임 + frame_skip으로 후보 컷을 찾고(coarse), 후보 주변만 전체 프레임으로 다시 감지(refine)
+SCENE_MODES = ("full", "fast")
+FAST_FRAME_SKIP = 2         # coarse 패스: (FAST_FRAME_SKIP+1) 프레임마다 1장만 감지기에 넣는다
+FAST_WIDTH = 128            # coarse 패스 축소 폭 목표 (PySceneDetect 기본 auto-downscale은 256)
+FAST_COARSE_RATIO = 0.8     # coarse 임계값 = threshold * 비율 (후보를 넉넉히 잡고 refine에서 걸러냄)
+FAST_REFINE_PAD = 4         # refine 구간을 후보 앞뒤로 넓히는 프레임 수
+CONTENT_MIN_SCENE_LEN = 15  # ContentDetector 기본 min_scene_len (refine 결과에 전체 기준으로 다시 적용)
+
+def _scene_pairs(cuts, total_frames, fps):
+    # 컷 프레임 목록 -> [(start_s, end_s)] (컷이 없으면 full 모드와 같이 빈 목록)
+    if not cuts:
+        return []
+    bounds = [0] + cuts + [total_frames]
+    return [(bounds[i] / fps, bounds[i+1] / fps) for i in range(len(bounds) - 1)]
+
+def _enforce_min_len(cuts, min_len):
+    # ContentDetector와 같은 규칙: 직전 컷(처음엔 0프레임)에서 min_len 프레임 이상 떨어진 컷만 남긴다
+    kept = []
+    last = 0
+    for c in sorted(set(cuts)):
+        if c - last >= min_len:
+            kept.append(c)
+            last = c
+    return kept
+
+def _detect_scenes_legacy(video_path: Path, threshold):
     video_manager = VideoManager([str(video_path)])
     scene_manager = SceneManager()
     scene_manager.add_detector(ContentDetector(threshold=threshold))
@@ -32,16 +80,290 @@ def detect_scenes(video_path: Path, threshold=30.0):
         video_manager.start()
         scene_manager.detect_scenes(frame_source=video_manager)
         scene_list = scene_manager.get_scene_list(video_manager.get_base_timecode())
-        pairs = [(st.get_seconds(), ed.get_seconds()) for (st, ed) in scene_list]
-        return pairs
+        return [(st.get_seconds(), ed.get_seconds()) for (st, ed) in scene_list]
     finally:
         video_manager.release()
 
+def _coarse_cuts(video, threshold, end=None):
+    # 현재 위치부터 end 프레임(None = 파일 끝)까지. return: (후보 컷 프레임, 마지막으로 읽은 위치)
+    sm = SceneManager()
+    sm.auto_downscale = False
+    sm.downscale = max(1, video.frame_size[0] // FAST_WIDTH)
+    sm.add_detector(ContentDetector(threshold=threshold * FAST_COARSE_RATIO, min_scene_len=1))
+    sm.detect_scenes(video=video, end_time=end, frame_skip=FAST_FRAME_SKIP)
+    return [st.get_frames() for st, _ in sm.get_scene_list()[1:]], video.frame_number
+
+def _refine_cuts(video, candidates, threshold, total_frames, start=0):
+    """
+    후보 컷 주변 [c - skip - pad, c + pad] 구간만 모든 프레임으로 다시 감지 (겹치는 구간은 합쳐서 한 번에).
+    coarse 패스에서 c는 샘플된 프레임이므로 실제 컷은 (c - skip - 1, c] 안에 있다.
+    """
+    reach = FAST_FRAME_SKIP + 1 + FAST_REFINE_PAD
+    wins = []
+    for c in sorted(candidates):
+        lo, hi = max(start, c - reach), min(total_frames, c + FAST_REFINE_PAD + 1)
+        if wins and lo <= wins[-1][1]:
+            wins[-1][1] = max(wins[-1][1], hi)
+        else:
+            wins.append([lo, hi])
+    cuts = []
+    for lo, hi in wins:
+        video.seek(lo)
+        sm = SceneManager()
+        sm.add_detector(ContentDetector(threshold=threshold, min_scene_len=1))
+        sm.detect_scenes(video=video, end_time=hi)
+        cuts += [st.get_frames() for st, _ in sm.get_scene_list()[1:] if lo < st.get_frames() < hi]
+    return cuts
+
+@trace.traced("detect_scenes")
+def detect_scenes(video_path: Path, threshold=30.0, mode="full"):
+    """
+    return: [(start_s, end_s), ...] (컷이 없으면 빈 목록)
+    mode="full": 모든 프레임을 ContentDetector로 감지 (기존 결과)
+    mode="fast": coarse(축소 + frame_skip, 낮춘 임계값) 후보 -> 후보 주변만 전체 프레임 refine,
+    최종 컷에는 full과 같은 min_scene_len 규칙을 적용한다
+    """
+    if mode not in SCENE_MODES:
+        raise ValueError(f"unknown scene mode: {mode}")
+    if open_video is None:
+        return _detect_scenes_legacy(video_path, threshold)
+    video = open_video(str(video_path))
+    fps = video.frame_rate
+    if mode == "full":
+        sm = SceneManager()
+        sm.add_detector(ContentDetector(threshold=threshold))
+        sm.detect_scenes(video=video)
+        return [(st.get_seconds(), ed.get_seconds()) for st, ed in sm.get_scene_list()]
+    with trace.stage("scenes_coarse"):
+        candidates, total_frames = _coarse_cuts(video, threshold)
+    with trace.stage("scenes_refine", candidates=len(candidates)):
+        cuts = _refine_cuts(video, candidates, threshold, total_frames) if candidates else []
+    return _scene_pairs(_enforce_min_len(cuts, CONTENT_MIN_SCENE_LEN), total_frames, fps)
+
+# detect_scenes_sharded: 샤드 최소 길이(초) / 샤드 앞뒤로 더 읽는 겹침(초) / 이 프레임 수 이내로 붙은 컷은 하나로
+SHARD_MIN_S = 120.0
+SHARD_OVERLAP_S = 1.0
+SHARD_DEDUP_FRAMES = 1
+
+def _detect_shard(video_path, lo, hi, threshold, mode, tracing=False):
+    """
+    프로세스 풀 작업: [lo, hi) 프레임 구간의 컷 프레임 (min_scene_len=1, 전체 규칙은 호출측에서 적용).
+    hi=None이면 파일 끝까지. return: (cuts, 마지막으로 읽은 위치, 계측 기록)
+    """
+    trace.enable(tracing)
+    with trace.stage("scene_shard", lo=lo, hi=hi, mode=mode):
+        video = open_video(str(video_path))
+        if lo:
+            video.seek(lo)
+        if mode == "fast":
+            candidates, end = _coarse_cuts(video, threshold, end=hi)
+            cuts = _refine_cuts(video, candidates, threshold, end, start=lo) if candidates else []
+        else:
+            sm = SceneManager()
+            sm.add_detector(ContentDetector(threshold=threshold, min_scene_len=1))
+            sm.detect_scenes(video=video, end_time=hi)
+            cuts = [st.get_frames() for st, _ in sm.get_scene_list()[1:]]
+            end = video.frame_number
+    return cuts, end, trace.drain()
+
+@trace.traced("detect_scenes_sharded")
+def detect_scenes_sharded(video_path: Path, threshold=30.0, mode="full", workers=None, shard_s=None):
+    """
+    긴 영상 1개를 겹치는 시간 구간(샤드)으로 나눠 프로세스마다 detect_scenes(mode)와 같은 감지를 실행하고 컷 목록을 이어 붙인다.
+    샤드 i는 [b_i - overlap, b_(i+1) + overlap)을 읽고 [b_i, b_(i+1)) 안의 컷만 맡는다 (겹침 구간은 감지기 준비용).
+    경계 부근에서 SHARD_DEDUP_FRAMES 이내로 중복된 컷은 하나로 합치고, min_scene_len 규칙은 합친 뒤 전체 기준으로 적용.
+    return: detect_scenes와 같은 [(start_s, end_s), ...]
+    workers=None: CPU 수, shard_s=None: max(SHARD_MIN_S, 길이 / workers). 샤드가 1개면 detect_scenes를 그대로 호출.
+    """
+    if mode not in SCENE_MODES:
+        raise ValueError(f"unknown scene mode: {mode}")
+    workers = (os.cpu_count() or 1) if workers is None else max(1, int(workers))
+    if open_video is None or workers <= 1:
+        return detect_scenes(video_path, threshold=threshold, mode=mode)
+    video = open_video(str(video_path))
+    fps = video.frame_rate
+    frame_count = video.duration.get_frames() if video.duration else 0
+    del video
+    duration = frame_count / fps if fps else 0.0
+    shard_s = shard_s or max(SHARD_MIN_S, duration / workers)
+    n = int(-(-duration // shard_s)) if duration else 0
+    if n <= 1:
+        return detect_scenes(video_path, threshold=threshold, mode=mode)
+    bounds = [int(round(i * frame_count / n)) for i in range(n)] + [None]
+    overlap = max(2, int(round(SHARD_OVERLAP_S * fps)))
+    shards = []
+    for i in range(n):
+        lo, hi = bounds[i], bounds[i+1]
+        # 마지막 샤드는 파일 끝까지 (frame_count는 컨테이너 추정값일 수 있음)
+        shards.append((lo, hi, max(0, lo - overlap), None if hi is None else hi + overlap))
+    cuts = []
+    total_frames = frame_count
+    with ProcessPoolExecutor(max_workers=min(workers, n)) as pool:
+        futures = [pool.submit(_detect_shard, str(video_path), read_lo, read_hi, threshold, mode, trace.active())
+                   for _, _, read_lo, read_hi in shards]
+        for (own_lo, own_hi, _, _), fut in zip(shards, futures):
+            shard_cuts, end, events = fut.result()
+            trace.merge(events)
+            cuts += [c for c in shard_cuts if own_lo <= c and (own_hi is None or c < own_hi)]
+            if own_hi is None:
+                total_frames = end
+    merged = []
+    for c in sorted(cuts):
+        if merged and c - merged[-1] <= SHARD_DEDUP_FRAMES:
+            continue
+        merged.append(c)
+    return _scene_pairs(_enforce_min_len(merged, CONTENT_MIN_SCENE_LEN), total_frames, fps)
+
 def extract_audio_wav(video_path: Path, out_wav: Path):
     cmd = ["ffmpeg", "-y", "-i", str(video_path), "-vn", "-ac", "1", "-ar", "22050", str(out_wav)]
     subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
 
-def analyze_audio(video_path: Path):
+# 스트리밍 오디오 분석 설정 (librosa 기본값과 같은 프레임/홉)
+AUDIO_SR = 22050
+AUDIO_BLOCK_S = 30.0
+AUDIO_STREAMING_MIN_S = 600.0
+_AUDIO_N_FFT = 2048
+_AUDIO_HOP = 512
+_TEMPO_WIN = 384
+# librosa.onset.onset_strength(center=True)는 envelope를 lag + n_fft // (2 * hop) 프레임 뒤로 밀고 스펙트로그램 길이로 자른다
+# (끝의 zero padding 프레임에서 생기는 flux는 버려짐). 첫 flux는 이미 0이므로 lag(1)만큼 덜 민다
+_ONSET_DELAY = _AUDIO_N_FFT // (2 * _AUDIO_HOP)
+
+class _StreamingAudioStats:
+    """
+    블록 단위로 PCM을 받아 RMS 합/제곱합과 onset envelope 기반 tempogram 평균을 누적한다.
+    (librosa.feature.rms / onset_strength(aggregate=median) / tempogram / beat.tempo와 같은 계산을 블록별로 수행)
+    """
+    def __init__(self, sr):
+        self.sr = sr
+        self.n_samples = 0
+        self.rms_n = 0
+        self.rms_sum = 0.0
+        self.rms_sumsq = 0.0
+        self.carry = np.zeros(_AUDIO_N_FFT // 2, dtype=np.float32)   # center=True 앞쪽 zero padding
+        self.window = librosa.filters.get_window("hann", _AUDIO_N_FFT, fftbins=True).astype(np.float32)
+        self.mel_fb = librosa.filters.mel(sr=sr, n_fft=_AUDIO_N_FFT).astype(np.float32)
+        self.prev_db = None
+        self.db_max = -np.inf
+        self.onset_delay = np.zeros(_ONSET_DELAY, dtype=np.float32)
+        self.onset_carry = np.zeros(_TEMPO_WIN // 2, dtype=np.float32)
+        self.ac_window = librosa.filters.get_window("hann", _TEMPO_WIN, fftbins=True).astype(np.float32)
+        self.tg_sum = np.zeros(_TEMPO_WIN, dtype=np.float64)
+        self.tg_n = 0
+        self.onset_any = False
+
+    def feed(self, y, final=False):
+        self.n_samples += len(y)
+        buf = np.concatenate([self.carry, y.astype(np.float32)])
+        if final:
+            buf = np.concatenate([buf, np.zeros(_AUDIO_N_FFT // 2, dtype=np.float32)])
+        n_frames = 1 + (len(buf) - _AUDIO_N_FFT) // _AUDIO_HOP if len(buf) >= _AUDIO_N_FFT else 0
+        if n_frames > 0:
+            frames = np.lib.stride_tricks.sliding_window_view(buf, _AUDIO_N_FFT)[::_AUDIO_HOP][:n_frames]
+            rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+            self.rms_n += rms.size
+            self.rms_sum += float(rms.sum())
+            self.rms_sumsq += float((rms ** 2).sum())
+            power = np.abs(np.fft.rfft(frames * self.window, axis=1)) ** 2
+            mel_db = 10.0 * np.log10(np.maximum(1e-10, power @ self.mel_fb.T))
+            # top_db=80 바닥은 지금까지의 최댓값 기준 (블록마다 다른 바닥을 쓰면 블록 경계에서 가짜 flux가 생김)
+            self.db_max = max(self.db_max, float(mel_db.max()))
+            floor = self.db_max - 80.0
+            mel_db = np.maximum(mel_db, floor)
+            prev = mel_db[:1] if self.prev_db is None else np.maximum(self.prev_db, floor)
+            flux = np.maximum(0.0, np.diff(np.vstack([prev, mel_db]), axis=0))
+            self.prev_db = mel_db[-1:]
+            onset = np.concatenate([self.onset_delay, np.median(flux, axis=1).astype(np.float32)])
+            self.onset_delay = onset[len(onset) - _ONSET_DELAY:]
+            self._feed_onset(onset[:len(onset) - _ONSET_DELAY], final=final)
+            self.carry = buf[n_frames * _AUDIO_HOP:]
+        else:
+            self.carry = buf
+            if final:
+                self._feed_onset(np.zeros(0, dtype=np.float32), final=True)
+
+    def _feed_onset(self, onset, final=False):
+        self.onset_any = self.onset_any or bool(onset.any())
+        buf = np.concatenate([self.onset_carry, onset])
+        if final:
+            buf = np.concatenate([buf, np.zeros(_TEMPO_WIN // 2, dtype=np.float32)])
+        if len(buf) < _TEMPO_WIN:
+            self.onset_carry = buf
+            return
+        frames = np.lib.stride_tricks.sliding_window_view(buf, _TEMPO_WIN)
+        spec = np.fft.rfft(frames * self.ac_window, n=2 * _TEMPO_WIN, axis=1)
+        ac = np.fft.irfft(np.abs(spec) ** 2, axis=1)[:, :_TEMPO_WIN]
+        peak = np.max(np.abs(ac), axis=1, keepdims=True)
+        ac = np.divide(ac, peak, out=np.zeros_like(ac), where=peak > 1e-12)
+        self.tg_sum += ac.sum(axis=0)
+        self.tg_n += ac.shape[0]
+        self.onset_carry = buf[frames.shape[0]:]
+
+    def result(self):
+        if self.rms_n == 0:
+            raise RuntimeError("no audio samples decoded")
+        mean = self.rms_sum / self.rms_n
+        std = float(np.sqrt(max(0.0, self.rms_sumsq / self.rms_n - mean * mean)))
+        tempo = None
+        tg = self.tg_sum / self.tg_n if self.tg_n else None
+        if tg is not None and (not self.onset_any or not tg.any()):
+            # librosa.beat.beat_track 과 같이 onset이 전혀 없으면(비트 없는 오디오) prior 최댓값 대신 0 BPM
+            tempo = 0.0
+        elif tg is not None:
+            # librosa.beat.tempo 와 같은 log-normal prior(start_bpm=120, std_bpm=1, max_tempo=320)
+            bpms = librosa.tempo_frequencies(_TEMPO_WIN, hop_length=_AUDIO_HOP, sr=self.sr)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                logprior = -0.5 * ((np.log2(bpms) - np.log2(120.0)) / 1.0) ** 2
+            logprior[: int(np.argmax(bpms < 320.0))] = -np.inf
+            tempo = float(bpms[int(np.argmax(np.log1p(1e6 * tg) + logprior))])
+        return {
+            "sr": int(self.sr),
+            "duration": float(self.n_samples / self.sr),
+            "rms_mean": float(mean),
+            "rms_std": std,
+            "tempo": tempo
+        }
+
+def _analyze_audio_stream(video_path: Path, sr=AUDIO_SR, block_seconds=AUDIO_BLOCK_S):
+    """
+    임시 WAV 없이 ffmpeg 파이프(f32le mono)에서 고정 크기 블록으로 읽어 분석. 메모리는 파일 길이와 무관.
+    """
+    cmd = ["ffmpeg", "-v", "error", "-i", str(video_path), "-vn", "-ac", "1", "-ar", str(sr), "-f", "f32le", "-"]
+    block_bytes = int(block_seconds * sr) // _AUDIO_HOP * _AUDIO_HOP * 4
+    stats = _StreamingAudioStats(sr)
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    pending = b""
+    try:
+        while True:
+            raw = proc.stdout.read(block_bytes)
+            if not raw:
+                break
+            raw = pending + raw
+            usable = len(raw) // 4 * 4
+            pending = raw[usable:]
+            stats.feed(np.frombuffer(raw[:usable], dtype="<f4"))
+        stats.feed(np.zeros(0, dtype=np.float32), final=True)
+    finally:
+        proc.stdout.close()
+        rc = proc.wait()
+    if rc != 0:
+        raise subprocess.CalledProcessError(rc, cmd)
+    return stats.result()
+
+@trace.traced("analyze_audio")
+def analyze_audio(video_path: Path, streaming=None):
+    """
+    streaming=None: 길이가 AUDIO_STREAMING_MIN_S 이상이면 스트리밍 분석, 아니면 전체 로드(librosa).
+    두 방식 모두 같은 키의 dict를 반환한다.
+    """
+    if streaming is None:
+        try:
+            duration = probe.get_duration(video_path) or 0.0
+        except Exception:
+            duration = 0.0
+        streaming = duration >= AUDIO_STREAMING_MIN_S
+    if streaming:
+        return _analyze_audio_stream(video_path)
     with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
         tmp_wav = Path(tmp.name)
     try:
@@ -52,7 +374,7 @@ def analyze_audio(video_path: Path):
         rms_std = float(np.std(rms))
         try:
             tempo, beats = librosa.beat.beat_track(y=y, sr=sr, trim=False)
-            tempo = float(tempo)
+            tempo = float(np.atleast_1d(tempo)[0])
         except Exception:
             tempo = None
         return {
@@ -68,29 +390,92 @@ def analyze_audio(video_path: Path):
         except Exception:
             pass
 
-def extract_representative_frame(video_path: Path, start_s: float, end_s: float, out_path: Path):
+def _media_fps_frames(video_path: Path, cap=None):
+    # fps / 프레임 수는 공용 probe 캐시에서 (ffprobe 실패 시에만 cv2 속성 사용)
+    try:
+        info = probe.probe_media(video_path)
+        if info.get("fps"):
+            return info["fps"], info.get("frame_count")
+    except Exception:
+        pass
+    if cap is None:
+        return 25.0, None
+    return (cap.get(cv2.CAP_PROP_FPS) or 25.0), (cap.get(cv2.CAP_PROP_FRAME_COUNT) or None)
+
+# 다음 중간 지점까지 이 시간(초) 이내면 seek 대신 grab()으로 앞으로 읽는다 (seek는 직전 키프레임부터 다시 디코드)
+THUMB_SEEK_GAP_S = 2.0
+THUMB_SIZE = (320, 180)
+
+def _save_thumbnail(frame, out_path: Path, size=THUMB_SIZE):
+    Image.fromarray(_fit_thumbnail(frame, size)).save(str(out_path))
+    return str(out_path)
+
+def extract_representative_frames(video_path: Path, scenes: List[tuple], out_paths: List[Path], pool=None):
+    """
+    scenes[i] = (start_s, end_s)의 중간 프레임을 out_paths[i]에 저장.
+    영상은 한 번만 열고 중간 지점을 시간 순으로 방문하며, 축소/인코딩/저장은 pool(ThreadPoolExecutor)에서 한다.
+    return: 저장에 성공한 인덱스 목록
+    """
     cap = cv2.VideoCapture(str(video_path))
-    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
-    mid = (start_s + end_s) / 2.0
-    frame_idx = int(mid * fps)
-    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-    ret, frame = cap.read()
-    if ret:
-        # convert BGR to RGB and save thumbnail
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = Image.fromarray(frame)
-        img.thumbnail((320, 180))
-        img.save(str(out_path))
-    cap.release()
+    if not cap.isOpened():
+        cap.release()
+        raise RuntimeError(f"Cannot open video: {video_path}")
+    fps, _ = _media_fps_frames(video_path, cap)
+    targets = sorted((int((st + ed) / 2.0 * fps), i) for i, (st, ed) in enumerate(scenes))
+    own_pool = pool is None
+    if own_pool:
+        pool = ThreadPoolExecutor(max_workers=max(1, min(4, len(targets))))
+    futures = {}
+    pos = None
+    try:
+        for frame_idx, i in targets:
+            gap = frame_idx - pos if pos is not None else -1
+            if 0 <= gap <= THUMB_SEEK_GAP_S * fps:
+                for _ in range(gap):
+                    cap.grab()
+            else:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+            ret, frame = cap.read()
+            if not ret:
+                pos = None
+                continue
+            pos = frame_idx + 1
+            futures[i] = pool.submit(_save_thumbnail, frame, out_paths[i])
+    finally:
+        cap.release()
+    done = []
+    try:
+        for i, fut in sorted(futures.items()):
+            fut.result()
+            done.append(i)
+    finally:
+        if own_pool:
+            pool.shutdown(wait=True)
+    return done
 
-def detect_dissolves(video_path: Path, scenes: List[tuple], window=8, sensitivity=0.03):
+def extract_representative_frame(video_path: Path, start_s: float, end_s: float, out_path: Path):
+    extract_representative_frames(video_path, [(start_s, end_s)], [out_path])
+
+def _classify_dissolve(diffs, fps, sensitivity):
     """
-    간단 휴리스틱: 연속 프레임 간 MSE 변화가 서서히 증가/감소하는 구간을 dissolve로 본다.
-    scenes: list of (start, end)
-    return: list of transitions: [{"between": (i,i+1), "type":"dissolve", "duration": approx_seconds}, ...]
+    경계 주변 프레임 차이(MSE) 신호가 dissolve 패턴이면 대략적인 길이(초)를, 아니면 None을 반환.
+    """
+    diffs = np.asarray(diffs, dtype=np.float64)
+    if diffs.size < 3:
+        return None
+    # heuristic: if diffs show a smooth peak (low variance but non-zero mean) => dissolve
+    if diffs.mean() < 0.05 and diffs.std() < 0.02 and diffs.max() > sensitivity:
+        # estimate duration from number of frames around peak
+        return max(0.2, (len(diffs)/fps))
+    return None
+
+def _detect_dissolves_seek(video_path: Path, scenes: List[tuple], window=8, sensitivity=0.03):
+    """
+    이전 구현 (경계마다 2*window번 seek, 원본 해상도 float32). 벤치마크 비교용으로만 남겨 둔다.
     """
     cap = cv2.VideoCapture(str(video_path))
-    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    fps, frame_count = _media_fps_frames(video_path, cap)
+    video_end = (frame_count / fps) if frame_count else float("inf")
     transitions = []
     # compute per-frame luminance differences for window around scene boundaries
     for idx in range(len(scenes)-1):
@@ -100,7 +485,7 @@ def detect_dissolves(video_path: Path, scenes: List[tuple], window=8, sensitivit
         # sample frames around boundary
         samples = []
         start_time = max(0, last_end - window/fps)
-        end_time = min(next_start + window/fps, cap.get(cv2.CAP_PROP_FRAME_COUNT)/fps)
+        end_time = min(next_start + window/fps, video_end)
         times = np.linspace(start_time, end_time, num=2*window)
         for t in times:
             cap.set(cv2.CAP_PROP_POS_MSEC, t*1000)
@@ -115,39 +500,330 @@ def detect_dissolves(video_path: Path, scenes: List[tuple], window=8, sensitivit
         for i in range(1, len(samples)):
             mse = np.mean((samples[i] - samples[i-1])**2) / (255.0**2)
             diffs.append(mse)
-        # look for a ramp-up and ramp-down pattern: mean diffs relatively low but gradually changing
-        diffs = np.array(diffs)
-        if diffs.size == 0:
-            continue
-        # heuristic: if diffs show a smooth peak (low variance but non-zero mean) => dissolve
-        if diffs.mean() < 0.05 and diffs.std() < 0.02 and diffs.max() > sensitivity:
-            # estimate duration from number of frames around peak
-            approx_sec = max(0.2, (len(diffs)/fps))
+        approx_sec = _classify_dissolve(diffs, fps, sensitivity)
+        if approx_sec is not None:
             transitions.append({"between": (idx, idx+1), "type": "dissolve", "duration": approx_sec})
     cap.release()
     return transitions
 
-def make_histogram_png(cut_lengths: List[float], out_png: Path):
-    import matplotlib
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
-    plt.figure(figsize=(6,3))
-    if cut_lengths:
-        plt.hist(cut_lengths, bins=[0,1,2,3,4,5,10,30], edgecolor='black')
-        plt.title("Cut length distribution (s)")
+# detect_dissolves: 프레임 버퍼 메모리 상한 / 축소 폭 상한 / 이 이상 떨어진 다음 구간은 순차 읽기 대신 seek
+DISSOLVE_BUFFER_BYTES = 32 * 1024 * 1024
+DISSOLVE_MAX_WIDTH = 320
+DISSOLVE_SEEK_GAP_S = 10.0
+
+@trace.traced("detect_dissolves")
+def detect_dissolves(video_path: Path, scenes: List[tuple], window=8, sensitivity=0.03, buffer_bytes=DISSOLVE_BUFFER_BYTES):
+    """
+    간단 휴리스틱: 연속 프레임 간 MSE 변화가 서서히 증가/감소하는 구간을 dissolve로 본다.
+    경계 주변 [b-window, b+window) 프레임 구간들을 정렬된 순서로 한 번에 순차 읽기 하고,
+    축소한 그레이 프레임을 고정 크기 링 버퍼(2*window장, buffer_bytes 이내)에 담아 구간별로 NumPy 일괄 계산한다.
+    scenes: list of (start, end)
+    return: list of transitions: [{"between": (i,i+1), "type":"dissolve", "duration": approx_seconds}, ...]
+    """
+    transitions = []
+    if len(scenes) < 2:
+        return transitions
+    cap = cv2.VideoCapture(str(video_path))
+    fps, frame_count = _media_fps_frames(video_path, cap)
+    last_frame = (int(frame_count) - 1) if frame_count else None
+    span = 2 * window
+    wins = []
+    for idx in range(len(scenes)-1):
+        b = int(round(scenes[idx][1] * fps))
+        lo = max(0, b - window)
+        hi = b + window - 1
+        if last_frame is not None:
+            hi = min(hi, last_frame)
+        if hi - lo + 1 >= 4:
+            wins.append((lo, hi, idx))
+    wins.sort()
+    seek_gap = int(DISSOLVE_SEEK_GAP_S * fps)
+    ring = None
+    small_size = None
+    ring_owner = np.full(span, -1, dtype=np.int64)
+    pos = 0
+    try:
+        for lo, hi, idx in wins:
+            # 구간이 겹치면 앞 구간 프레임이 이미 링 버퍼에 있으므로 이어서 읽기만 한다
+            if lo > pos + seek_gap:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, lo)
+                pos = lo
+            while pos < lo:
+                if not cap.grab():
+                    break
+                pos += 1
+            while lo <= pos <= hi:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if ring is None:
+                    h, w = frame.shape[:2]
+                    # 링 버퍼(uint8) + 계산용 float32 사본이 buffer_bytes 안에 들어가는 크기로 축소
+                    max_px = max(1, buffer_bytes // (span * 5))
+                    scale = min(1.0, DISSOLVE_MAX_WIDTH / w, (max_px / float(w * h)) ** 0.5)
+                    small_size = (max(1, int(w * scale)), max(1, int(h * scale)))
+                    ring = np.empty((span, small_size[1], small_size[0]), dtype=np.uint8)
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                slot = pos % span
+                ring[slot] = cv2.resize(gray, small_size, interpolation=cv2.INTER_AREA)
+                ring_owner[slot] = pos
+                pos += 1
+            if ring is None:
+                continue
+            frames_idx = np.arange(lo, min(hi, pos - 1) + 1)
+            slots = frames_idx % span
+            have = ring_owner[slots] == frames_idx
+            if have.sum() < 4:
+                continue
+            stack = ring[slots[have]].astype(np.float32)
+            diffs = np.mean((stack[1:] - stack[:-1]) ** 2, axis=(1, 2)) / (255.0 ** 2)
+            approx_sec = _classify_dissolve(diffs, fps, sensitivity)
+            if approx_sec is not None:
+                transitions.append({"between": (idx, idx+1), "type": "dissolve", "duration": approx_sec})
+    finally:
+        cap.release()
+    transitions.sort(key=lambda t: t["between"][0])
+    return transitions
+
+def _fit_thumbnail(frame, size=(320, 180)):
+    # BGR 프레임을 size 안에 들어가도록 축소한 RGB 배열 (PIL Image.thumbnail과 같은 비율 유지)
+    h, w = frame.shape[:2]
+    scale = min(1.0, size[0] / w, size[1] / h)
+    if scale < 1.0:
+        frame = cv2.resize(frame, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+@trace.traced("scan_video")
+def scan_video(video_path: Path, threshold=30.0, window=8, sensitivity=0.03, thumb_dir: Path=None, max_thumbs=4):
+    """
+    단일 디코드 패스: 프레임을 한 번만 순차적으로 읽으면서
+    - ContentDetector로 컷 감지 (detect_scenes와 같은 (start, end) 목록)
+    - 다운스케일 그레이 프레임 간 MSE 신호 기록 -> 경계별 dissolve 판정 (detect_dissolves와 같은 구조)
+    - 씬 중간 지점 썸네일 캡처 (가장 긴 씬 max_thumbs개, thumb_dir 지정 시 저장)
+    return: (scenes, transitions, thumbs)  thumbs: [{"thumb", "start", "end"}, ...] (길이 내림차순)
+    """
+    video_path = Path(video_path)
+    cap = cv2.VideoCapture(str(video_path))
+    if not cap.isOpened():
+        cap.release()
+        raise RuntimeError(f"Cannot open video: {video_path}")
+    fps, _ = _media_fps_frames(video_path, cap)
+    detector = ContentDetector(threshold=threshold)
+    cuts = []
+    diffs = []          # diffs[i]: MSE(frame i-1, frame i), diffs[0] = 0
+    prev_gray = None
+    small_size = None
+    # 현재 씬의 중간 프레임 후보: stride 간격으로 샘플링, 버퍼가 차면 절반을 버리고 stride를 두 배로
+    samples = []
+    stride = 1
+    max_samples = 32
+    scene_start = 0
+    longest = []        # min-heap of (length, start_frame, end_frame, rgb)
+    frame_idx = 0
+
+    def close_scene(start_f, end_f):
+        if thumb_dir is None or not samples or max_thumbs <= 0:
+            return
+        mid = (start_f + end_f) / 2.0
+        _, rgb = min(samples, key=lambda s: abs(s[0] - mid))
+        item = (end_f - start_f, start_f, end_f, rgb)
+        if len(longest) < max_thumbs:
+            heapq.heappush(longest, item)
+        elif item[0] > longest[0][0]:
+            heapq.heapreplace(longest, item)
+
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            if small_size is None:
+                h, w = frame.shape[:2]
+                # PySceneDetect 기본 auto-downscale 규칙 (최소 폭 256px)
+                factor = max(1, w // 256)
+                small_size = (max(1, round(w / factor)), max(1, round(h / factor)))
+            small = cv2.resize(frame, small_size, interpolation=cv2.INTER_LINEAR) if small_size != frame.shape[1::-1] else frame
+            # PySceneDetect 0.6 API: 프레임 번호를 넣고 컷 프레임 번호 목록을 받는다 (0.7은 FrameTimecode, requirements.txt에서 <0.7 고정)
+            for cut in detector.process_frame(frame_idx, small) or []:
+                close_scene(scene_start, cut)
+                cuts.append(cut)
+                scene_start = cut
+                samples.clear()
+                stride = 1
+            gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+            if prev_gray is None:
+                diffs.append(0.0)
+            else:
+                diffs.append(float(np.mean((gray - prev_gray) ** 2) / (255.0 ** 2)))
+            prev_gray = gray
+            if thumb_dir is not None and (frame_idx - scene_start) % stride == 0:
+                samples.append((frame_idx, _fit_thumbnail(frame)))
+                if len(samples) >= max_samples:
+                    del samples[1::2]
+                    stride *= 2
+            frame_idx += 1
+    finally:
+        cap.release()
+    if hasattr(detector, "post_process"):
+        cuts.extend(c for c in (detector.post_process(frame_idx) or []) if c not in cuts)
+
+    scenes = []
+    transitions = []
+    if cuts:
+        close_scene(scene_start, frame_idx)
+        bounds = [0] + cuts + [frame_idx]
+        scenes = [(bounds[i] / fps, bounds[i+1] / fps) for i in range(len(bounds) - 1)]
+        for idx, cut in enumerate(cuts):
+            approx_sec = _classify_dissolve(diffs[max(1, cut - window + 1):cut + window], fps, sensitivity)
+            if approx_sec is not None:
+                transitions.append({"between": (idx, idx+1), "type": "dissolve", "duration": approx_sec})
+
+    thumbs = []
+    if thumb_dir is not None and scenes:
+        thumb_dir = Path(thumb_dir)
+        thumb_dir.mkdir(parents=True, exist_ok=True)
+        for i, (_, st, ed, rgb) in enumerate(sorted(longest, key=lambda x: x[0], reverse=True)):
+            out_thumb = thumb_dir / f"{video_path.stem}_thumb_{i}.jpg"
+            Image.fromarray(rgb).save(str(out_thumb))
+            thumbs.append({"thumb": str(out_thumb), "start": st / fps, "end": ed / fps})
+    return scenes, transitions, thumbs
+
+HIST_BINS = [0, 1, 2, 3, 4, 5, 10, 30]
+
+def _draw_text(draw, xy, text, font, anchor="la"):
+    # anchor: 가로 l/m/r + 세로 a(위)/m/d(아래). 기본 비트맵 폰트는 PIL anchor를 지원하지 않아 직접 맞춘다
+    x0, y0, x1, y1 = draw.textbbox((0, 0), text, font=font)
+    tw, th = x1 - x0, y1 - y0
+    x, y = xy
+    x -= {"l": 0, "m": tw / 2, "r": tw}[anchor[0]]
+    y -= {"a": 0, "m": th / 2, "d": th}[anchor[1]]
+    draw.text((x - x0, y - y0), text, fill="black", font=font)
+
+@trace.traced("histogram")
+def make_histogram_png(cut_lengths: List[float], out_png: Path, size=(600, 300)):
+    """
+    컷 길이 분포 막대그래프를 PIL로 직접 그린다 (구간: HIST_BINS, 막대 폭은 구간마다 같음).
+    """
+    w, h = size
+    img = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default()
+    if not cut_lengths:
+        _draw_text(draw, (w // 2, h // 2), "No cuts detected", font, "mm")
+        img.save(str(out_png))
+        return
+    counts, _ = np.histogram(cut_lengths, bins=HIST_BINS)
+    left, right, top, bottom = 40, w - 12, 28, h - 28
+    _draw_text(draw, (w // 2, 12), "Cut length distribution (s)", font, "mm")
+    draw.line([(left, top), (left, bottom), (right, bottom)], fill="black")
+    peak = max(1, int(counts.max()))
+    bar_w = (right - left) / len(counts)
+    for i, c in enumerate(counts):
+        x0 = left + i * bar_w
+        y0 = bottom - (bottom - top) * c / peak
+        if c:
+            draw.rectangle([x0 + 2, y0, x0 + bar_w - 2, bottom], fill=(31, 119, 180), outline="black")
+            _draw_text(draw, (x0 + bar_w / 2, y0 - 2), str(int(c)), font, "md")
+        _draw_text(draw, (x0 + bar_w / 2, bottom + 4), f"{HIST_BINS[i]}-{HIST_BINS[i+1]}", font, "ma")
+    _draw_text(draw, (left - 4, top), str(peak), font, "ra")
+    _draw_text(draw, (left - 4, bottom), "0", font, "rd")
+    img.save(str(out_png))
+
+def analysis_params(use_whisper=False, threshold=30.0, window=8, sensitivity=0.03, whisper_model="small", use_proxy=False,
+                    scene_mode="full", scene_workers=1):
+    # 오디오 분석 방식은 파일 길이(내용)로 결정되므로 키에 따로 넣지 않는다
+    # scene_workers(샤드 병렬 컷 감지)는 실행 방식만 바꾸므로 키에 넣지 않는다
+    # analyze_local_file 결과에 영향을 주는 파라미터 (캐시 키)
+    params = {
+        "version": ANALYSIS_VERSION,
+        "threshold": float(threshold),
+        "window": int(window),
+        "sensitivity": float(sensitivity),
+        "whisper_model": whisper_model if use_whisper else None
+    }
+    if use_proxy:
+        # 프록시 분석 결과는 원본 분석과 조금 다를 수 있으므로 별도 키 (원본 분석 캐시 키는 그대로)
+        params["proxy"] = proxy.PROXY_HEIGHT
+    if scene_mode != "full":
+        # fast 모드는 컷 위치가 full과 다를 수 있으므로 별도 키 (full의 기존 캐시 키는 그대로)
+        params["scene_mode"] = scene_mode
+    return params
+
+def _scan_split(video_path: Path, scene_mode="fast", scene_workers=1, threshold=30.0, window=8, sensitivity=0.03,
+                thumb_dir: Path=None, max_thumbs=4):
+    """
+    scene_mode="fast" 또는 scene_workers > 1일 때의 scan_video 대용: 컷 감지(detect_scenes / detect_scenes_sharded)
+    + detect_dissolves(경계 주변만 읽기) + 가장 긴 씬 max_thumbs개의 썸네일. 반환 형식은 scan_video와 같다.
+    """
+    video_path = Path(video_path)
+    if scene_workers > 1:
+        scenes = detect_scenes_sharded(video_path, threshold=threshold, mode=scene_mode, workers=scene_workers)
     else:
-        plt.text(0.5,0.5,"No cuts detected", ha='center')
-    plt.tight_layout()
-    plt.savefig(str(out_png))
-    plt.close()
+        scenes = detect_scenes(video_path, threshold=threshold, mode=scene_mode)
+    transitions = detect_dissolves(video_path, scenes, window=window, sensitivity=sensitivity)
+    thumbs = []
+    if thumb_dir is not None and scenes and max_thumbs > 0:
+        thumb_dir = Path(thumb_dir)
+        thumb_dir.mkdir(parents=True, exist_ok=True)
+        longest = sorted(scenes, key=lambda x: x[1]-x[0], reverse=True)[:max_thumbs]
+        outs = [thumb_dir / f"{video_path.stem}_thumb_{i}.jpg" for i in range(len(longest))]
+        for i in extract_representative_frames(video_path, longest, outs):
+            thumbs.append({"thumb": str(outs[i]), "start": longest[i][0], "end": longest[i][1]})
+    return scenes, transitions, thumbs
 
-def analyze_local_file(path: Path, use_whisper=False, progress_callback=print):
+def _scan_source(path, progress_callback, use_proxy, scene_mode="full", scene_workers=1, **kwargs):
+    """
+    scan_video(scene_mode="fast"이거나 scene_workers > 1이면 _scan_split)를 (use_proxy면) 프록시에서 실행하고
+    scenes/thumbs 시각을 원본 기준으로 되돌린다. 프록시가 필요 없거나 만들 수 없으면 원본을 그대로 분석.
+    """
+    if scene_mode == "full" and scene_workers <= 1:
+        scan = scan_video
+    else:
+        scan = lambda p, **kw: _scan_split(p, scene_mode=scene_mode, scene_workers=scene_workers, **kw)
+    meta = None
+    if use_proxy:
+        try:
+            meta = proxy.get_proxy(path, log_fn=progress_callback)
+        except Exception as e:
+            progress_callback(f"Proxy failed for {path}: {e}; analysing the original")
+    if meta is None:
+        return scan(path, **kwargs)
+    scenes, transitions, thumbs = scan(Path(meta["proxy"]), **kwargs)
+    scenes = [(proxy.to_source(st, meta), proxy.to_source(ed, meta)) for st, ed in scenes]
+    for t in thumbs:
+        t["start"] = proxy.to_source(t["start"], meta)
+        t["end"] = proxy.to_source(t["end"], meta)
+    return scenes, transitions, thumbs
+
+def analyze_local_file(path: Path, use_whisper=False, progress_callback=print, thumb_dir: Path=None,
+                       threshold=30.0, window=8, sensitivity=0.03, whisper_model="small", use_proxy=False, scene_mode="full",
+                       scene_workers=1):
+    """
+    use_proxy=True: 컷/dissolve/썸네일은 저해상도 프록시(modules/proxy.py)로 분석, 오디오/Whisper는 원본 사용.
+    scene_mode="fast": 컷은 coarse-to-fine detect_scenes, dissolve는 경계 주변만 읽는 detect_dissolves로 (_scan_split)
+    scene_workers > 1: 컷 감지를 시간 샤드로 나눠 여러 프로세스에서 (detect_scenes_sharded)
+    """
+    with trace.stage("analyze_file", path=str(path)):
+        return _analyze_local_file(path, use_whisper, progress_callback, thumb_dir, threshold, window, sensitivity, whisper_model,
+                                   use_proxy, scene_mode, scene_workers)
+
+def _analyze_local_file(path, use_whisper, progress_callback, thumb_dir, threshold, window, sensitivity, whisper_model, use_proxy,
+                        scene_mode, scene_workers):
+    # 컷 감지 / dissolve 신호 / 썸네일은 scan_video 한 번의 디코드로 처리 (scene_mode="fast" / scene_workers > 1이면 _scan_split)
     scenes = []
+    transitions = []
+    thumbs = []
+    errors = []
     try:
-        scenes = detect_scenes(path)
+        scenes, transitions, thumbs = _scan_source(path, progress_callback, use_proxy, scene_mode=scene_mode, scene_workers=scene_workers, threshold=threshold,
+                                                   window=window, sensitivity=sensitivity, thumb_dir=thumb_dir)
+    except (AttributeError, TypeError, NameError):
+        # PySceneDetect API 불일치 같은 코드 오류는 "씬 0개"로 숨기지 않고 그대로 올린다
+        raise
     except Exception as e:
         progress_callback(f"Scene detect failed for {path}: {e}")
-        scenes = []
+        errors.append(f"scenes: {e}")
+        scenes, transitions, thumbs = [], [], []
     cut_lengths = [ed-st for st,ed in scenes] if scenes else []
     avg_cut = float(np.mean(cut_lengths)) if cut_lengths else None
     audio = {}
@@ -155,23 +831,17 @@ def analyze_local_file(path: Path, use_whisper=False, progress_callback=print):
         audio = analyze_audio(path)
     except Exception as e:
         progress_callback(f"Audio analyze failed for {path}: {e}")
+        errors.append(f"audio: {e}")
         audio = {}
-    # detect dissolves across scenes
-    transitions = []
-    try:
-        if scenes and len(scenes) > 1:
-            transitions = detect_dissolves(path, scenes)
-    except Exception as e:
-        progress_callback(f"Transition detect failed for {path}: {e}")
-        transitions = []
 
     # whisper transcription (optional)
     srt_path = None
     if use_whisper:
         try:
-            srt_path = transcribe_with_whisper(path, progress_callback=progress_callback)
+            srt_path = transcribe_with_whisper(path, model_name=whisper_model, progress_callback=progress_callback)
         except Exception as e:
             progress_callback(f"Whisper transcription failed: {e}")
+            errors.append(f"whisper: {e}")
             srt_path = None
 
     profile = {
@@ -182,47 +852,194 @@ def analyze_local_file(path: Path, use_whisper=False, progress_callback=print):
         "cut_lengths": cut_lengths,
         "audio": audio,
         "transitions": transitions,
-        "srt": srt_path
+        "thumbs": thumbs,
+        "srt": srt_path,
+        "errors": errors
     }
     return profile
 
-def analyze_with_preview(paths: List[Path], use_whisper=False, progress_callback=print):
-    # analyze each, aggregate style, generate preview assets (histogram png, thumbnails)
-    profiles = []
-    for p in paths:
-        progress_callback(f"분석중: {p}")
-        prof = analyze_local_file(p, use_whisper=use_whisper, progress_callback=progress_callback)
-        profiles.append(prof)
-    avg_cuts = [p["avg_cut_length"] for p in profiles if p.get("avg_cut_length")]
-    tempos = [p.get("audio", {}).get("tempo") for p in profiles if p.get("audio", {}).get("tempo")]
-    style = {
-        "source_count": len(profiles),
-        "mean_avg_cut_length": float(np.mean(avg_cuts)) if avg_cuts else 3.0,
-        "median_avg_cut_length": float(np.median(avg_cuts)) if avg_cuts else 3.0,
-        "tempo_median": float(np.median(tempos)) if tempos else None,
-        "profiles": profiles
+def analyze_cached(path: Path, use_whisper=False, progress_callback=print, thumb_dir: Path=None,
+                   use_cache=True, cache_root=None, **params):
+    """
+    analyze_local_file + 디스크 캐시. 파일 내용과 분석 파라미터가 같으면 저장된 profile을 그대로 쓴다.
+    """
+    key_params = analysis_params(use_whisper=use_whisper, **params)
+    if use_cache:
+        try:
+            prof = cache.load_profile(path, key_params, root=cache_root, out_dir=thumb_dir)
+            if prof is not None:
+                progress_callback(f"캐시 사용: {path}")
+                return prof
+        except Exception as e:
+            progress_callback(f"Cache read failed for {path}: {e}")
+    prof = analyze_local_file(path, use_whisper=use_whisper, progress_callback=progress_callback, thumb_dir=thumb_dir, **params)
+    # 일부 단계가 실패한 결과는 캐시하지 않는다 (다음 실행에서 재시도)
+    if use_cache and not prof.get("errors"):
+        try:
+            cache.store_profile(path, key_params, prof, root=cache_root)
+        except Exception as e:
+            progress_callback(f"Cache write failed for {path}: {e}")
+    return prof
+
+def _failed_profile(path, err):
+    return {
+        "path": str(path), "num_scenes": 0, "scenes": [], "avg_cut_length": None, "cut_lengths": [],
+        "audio": {}, "transitions": [], "thumbs": [], "srt": None, "errors": [str(err)]
     }
+
+def _analyze_worker(path, use_whisper, thumb_dir, params, tracing=False):
+    # 프로세스 풀 작업: 진행 메시지와 계측 기록은 모아서 부모 프로세스로 돌려준다
+    messages = []
+    trace.enable(tracing)
+    prof = analyze_local_file(Path(path), use_whisper=use_whisper, progress_callback=messages.append, thumb_dir=thumb_dir, **params)
+    return prof, messages, trace.drain()
+
+def _transcribe_profiles(paths, profiles, idxs, whisper_model, progress_callback=print):
+    # 분석이 끝난 파일들을 한 번 로드한 Whisper 모델로 연달아 전사 (파일/워커 프로세스마다 모델을 로드하지 않음)
+    try:
+        srts = transcribe_many([str(paths[i]) for i in idxs], model_name=whisper_model, progress_callback=progress_callback)
+    except Exception as e:
+        progress_callback(f"Whisper transcription failed: {e}")
+        srts = [e] * len(idxs)
+    for i, srt_path in zip(idxs, srts):
+        if srt_path is None or isinstance(srt_path, Exception):
+            profiles[i]["errors"].append(f"whisper: {srt_path or 'transcription failed'}")
+            srt_path = None
+        profiles[i]["srt"] = srt_path
+
+def analyze_paths(paths: List[Path], use_whisper=False, progress_callback=print, thumb_dir: Path=None,
+                  use_cache=True, cache_root=None, workers=1, **params):
+    """
+    여러 파일 분석. 결과 순서는 항상 paths 순서와 같다.
+    workers > 1 이면 캐시에 없는 파일을 프로세스 풀(최대 workers개)에서 분석한다.
+    use_whisper면 자막은 파일별 분석이 끝난 뒤 부모 프로세스에서 transcribe_many로 한 번에 만든다 (모델 1회 로드).
+    한 파일이 실패해도 나머지는 계속 진행하며, 실패한 파일은 "errors"가 채워진 빈 profile로 남는다.
+    """
+    paths = [Path(p) for p in paths]
+    profiles = [None] * len(paths)
+    key_params = analysis_params(use_whisper=use_whisper, **params)
+    todo = []
+    for i, p in enumerate(paths):
+        if use_cache:
+            try:
+                prof = cache.load_profile(p, key_params, root=cache_root, out_dir=thumb_dir)
+            except Exception as e:
+                progress_callback(f"Cache read failed for {p}: {e}")
+                prof = None
+            if prof is not None:
+                progress_callback(f"캐시 사용: {p}")
+                profiles[i] = prof
+                continue
+        todo.append(i)
+    if not todo:
+        return profiles
+    failed = set()
+    if workers is None or workers <= 1 or len(todo) <= 1:
+        for i in todo:
+            p = paths[i]
+            progress_callback(f"분석중: {p}")
+            try:
+                profiles[i] = analyze_local_file(p, use_whisper=False, progress_callback=progress_callback, thumb_dir=thumb_dir, **params)
+            except Exception as e:
+                progress_callback(f"분석 실패: {p}: {e}")
+                profiles[i] = _failed_profile(p, e)
+                failed.add(i)
+    else:
+        n_workers = max(1, min(workers, len(todo), os.cpu_count() or 1))
+        progress_callback(f"병렬 분석: {len(todo)}개 파일, {n_workers} workers")
+        done = len(paths) - len(todo)
+        # 파일 단위로 이미 병렬이므로 파일 안의 샤드 병렬 컷 감지는 끈다 (프로세스 과다 생성 방지)
+        worker_params = dict(params, scene_workers=1)
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = {pool.submit(_analyze_worker, str(paths[i]), False, thumb_dir, worker_params, trace.active()): i for i in todo}
+            for fut in as_completed(futures):
+                i = futures[fut]
+                p = paths[i]
+                done += 1
+                try:
+                    prof, messages, events = fut.result()
+                except Exception as e:
+                    progress_callback(f"[{done}/{len(paths)}] 분석 실패: {p}: {e}")
+                    profiles[i] = _failed_profile(p, e)
+                    failed.add(i)
+                    continue
+                for m in messages:
+                    progress_callback(m)
+                trace.merge(events)
+                progress_callback(f"[{done}/{len(paths)}] 분석 완료: {p}")
+                profiles[i] = prof
+    if use_whisper:
+        _transcribe_profiles(paths, profiles, [i for i in todo if i not in failed], params.get("whisper_model", "small"),
+                             progress_callback=progress_callback)
+    # 일부 단계가 실패한 결과는 캐시하지 않는다 (다음 실행에서 재시도)
+    if use_cache:
+        for i in todo:
+            if profiles[i].get("errors"):
+                continue
+            try:
+                cache.store_profile(paths[i], key_params, profiles[i], root=cache_root)
+            except Exception as e:
+                progress_callback(f"Cache write failed for {paths[i]}: {e}")
+    return profiles
+
+def summarize_profiles(profiles: List[Dict]):
+    # 수집된 profile들로부터 스타일 통계 집계 (병합 가능한 요약만, profiles 자체는 스타일에 넣지 않음)
+    return style_from_profiles(profiles)
+
+def analyze_with_preview(paths: List[Path], use_whisper=False, progress_callback=print, use_cache=True, cache_root=None, workers=1,
+                         trace_run=None, use_proxy=False, scene_mode="full", scene_workers=1):
+    """
+    use_proxy: 영상 분석을 캐시된 저해상도 프록시로 (modules/proxy.py)
+    scene_mode: "full" (모든 프레임) / "fast" (coarse-to-fine 컷 감지, detect_scenes 참고)
+    scene_workers: 파일 1개의 컷 감지를 나눠 실행할 프로세스 수 (detect_scenes_sharded, 여러 파일 병렬 분석 시에는 1)
+    trace_run: True면 단계별 계측 결과(trace.json, trace_summary.txt)를 미리보기 폴더에 저장하고 preview["trace"]에 경로를 넣는다
+    (None = AUTO_EDIT_TRACE 환경변수).
+    """
+    # analyze each, aggregate style, generate preview assets (histogram png, thumbnails)
+    tmpdir = Path(tempfile.mkdtemp(prefix="style_preview_"))
+    with trace.run("analyze", out_dir=tmpdir, log_fn=progress_callback, enabled=trace_run, sources=len(paths)) as traced_run:
+        style, preview = _analyze_with_preview(paths, use_whisper, progress_callback, use_cache, cache_root, workers, tmpdir, use_proxy,
+                                               scene_mode, scene_workers)
+    if traced_run.get("trace"):
+        preview["trace"] = traced_run["trace"]
+    return style, preview
+
+def _analyze_with_preview(paths, use_whisper, progress_callback, use_cache, cache_root, workers, tmpdir, use_proxy, scene_mode,
+                          scene_workers):
+    profiles = analyze_paths(paths, use_whisper=use_whisper, progress_callback=progress_callback, thumb_dir=tmpdir,
+                             use_cache=use_cache, cache_root=cache_root, workers=workers, use_proxy=use_proxy, scene_mode=scene_mode,
+                             scene_workers=scene_workers)
+    style = summarize_profiles(profiles)
     # generate histogram png from merged cut lengths
     all_cut_lengths = []
     for p in profiles:
         all_cut_lengths.extend(p.get("cut_lengths", []))
-    tmpdir = Path(tempfile.mkdtemp(prefix="style_preview_"))
     hist_png = tmpdir / "cut_hist.png"
     make_histogram_png(all_cut_lengths, hist_png)
-    # choose representative frames: pick longest shots across first video (or all)
+    # representative frames: up to 4 longest scenes per video, captured during scan_video
     thumbs = []
+    missing = []
     for p in profiles:
-        scenes = p.get("scenes") or []
-        # pick up to 4 longest scenes
-        scenes_sorted = sorted(scenes, key=lambda x: x[1]-x[0], reverse=True)[:4]
-        for i, (st, ed) in enumerate(scenes_sorted):
-            out_thumb = tmpdir / f"{Path(p['path']).stem}_thumb_{i}.jpg"
-            try:
-                extract_representative_frame(Path(p['path']), st, ed, out_thumb)
-                # store thumb metadata so GUI can play corresponding snippet
-                thumbs.append({"thumb": str(out_thumb), "video": p['path'], "start": float(st), "end": float(ed)})
-            except Exception as e:
-                progress_callback(f"Thumb extract failed: {e}")
+        if p.get("thumbs"):
+            for t in p["thumbs"]:
+                thumbs.append({"thumb": t["thumb"], "video": p['path'], "start": float(t["start"]), "end": float(t["end"])})
+        elif p.get("scenes"):
+            missing.append(p)
+    if missing:
+        # fallback: up to 4 longest scenes per video, one capture per video, encoding/saving on a shared pool
+        with trace.stage("thumbnails", videos=len(missing)), ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1)) as pool:
+            for p in missing:
+                scenes_sorted = sorted(p["scenes"], key=lambda x: x[1]-x[0], reverse=True)[:4]
+                outs = [tmpdir / f"{Path(p['path']).stem}_thumb_{i}.jpg" for i in range(len(scenes_sorted))]
+                try:
+                    done = extract_representative_frames(Path(p['path']), scenes_sorted, outs, pool=pool)
+                except Exception as e:
+                    progress_callback(f"Thumb extract failed: {e}")
+                    continue
+                for i in done:
+                    st, ed = scenes_sorted[i]
+                    # store thumb metadata so GUI can play corresponding snippet
+                    thumbs.append({"thumb": str(outs[i]), "video": p['path'], "start": float(st), "end": float(ed)})
     preview = {"histogram_png": str(hist_png), "thumbs": thumbs}
     # attach first found srt (if any)
     for p in profiles:
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+modules/background.py
+- GUI용 백그라운드 작업 실행기 (분석/편집 작업을 GUI 스레드 밖에서 실행)
+- 작업은 대기열에 쌓이고 하나씩 별도 자식 프로세스에서 modules.batch.run_job으로 실행
+- 진행 로그/시작/완료는 post_fn(key, value)로 전달 (PySimpleGUI: window.write_event_value)
+- 취소: 실행 중인 자식 프로세스 그룹 전체(ffmpeg, Whisper, 분석 워커 포함)를 종료
+"""
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+EVENT_START = "-JOB-START-"
+EVENT_LOG = "-JOB-LOG-"
+EVENT_DONE = "-JOB-DONE-"
+
+def _child_main(job, msg_q):
+    # 자식 프로세스: 새 프로세스 그룹을 만들어 취소 시 손자 프로세스(ffmpeg 등)까지 한 번에 종료되게 한다
+    if hasattr(os, "setsid"):
+        try:
+            os.setsid()
+        except OSError:
+            pass
+    from modules.batch import run_job
+    try:
+        result = run_job(job, log_fn=lambda m: msg_q.put(("log", str(m))))
+        msg_q.put(("done", result))
+    except Exception as e:
+        msg_q.put(("error", f"{type(e).__name__}: {e}"))
+
+def _kill_tree(proc):
+    if proc.pid is None or not proc.is_alive():
+        return
+    if sys.platform.startswith("win"):
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+    except OSError:
+        proc.terminate()
+    proc.join(3.0)
+    if proc.is_alive():
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            proc.kill()
+
+class JobRunner:
+    """
+    작업 대기열 + 작업 스레드. submit()은 즉시 반환하고, 작업은 순서대로 하나씩 실행된다.
+    """
+    def __init__(self, post_fn):
+        self.post = post_fn
+        self._queue = queue.Queue()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._current = None        # (job_id, Process)
+        self._cancelled = set()
+        self._ctx = mp.get_context("spawn")
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, job, label=None):
+        job_id = next(self._ids)
+        self._queue.put((job_id, job, label or job.get("type")))
+        return job_id
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def busy(self):
+        with self._lock:
+            return self._current is not None
+
+    def cancel(self):
+        """실행 중인 작업을 취소. 취소할 작업이 있으면 True."""
+        with self._lock:
+            current = self._current
+            if current is None:
+                return False
+            self._cancelled.add(current[0])
+        _kill_tree(current[1])
+        return True
+
+    def shutdown(self):
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self.cancel()
+        self._queue.put(None)
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            job_id, job, label = item
+            msg_q = self._ctx.Queue()
+            proc = self._ctx.Process(target=_child_main, args=(job, msg_q))
+            t0 = time.perf_counter()
+            self.post(EVENT_START, {"id": job_id, "label": label, "job": job, "pending": self.pending()})
+            with self._lock:
+                proc.start()
+                self._current = (job_id, proc)
+            result, error = None, None
+            finished = False
+            while not finished:
+                try:
+                    kind, payload = msg_q.get(timeout=0.2)
+                except queue.Empty:
+                    if not proc.is_alive():
+                        # 마지막 메시지가 큐에 남아 있을 수 있으므로 한 번 더 비운다
+                        try:
+                            kind, payload = msg_q.get(timeout=0.5)
+                        except queue.Empty:
+                            error = f"worker exited (code {proc.exitcode})"
+                            break
+                    else:
+                        continue
+                if kind == "log":
+                    self.post(EVENT_LOG, payload)
+                elif kind == "done":
+                    result = payload
+                    finished = True
+                else:
+                    error = payload
+                    finished = True
+            proc.join(5.0)
+            with self._lock:
+                self._current = None
+                cancelled = job_id in self._cancelled
+                self._cancelled.discard(job_id)
+            self.post(EVENT_DONE, {"id": job_id, "label": label, "job": job, "result": result,
+                                   "error": None if cancelled else error, "cancelled": cancelled,
+                                   "wall_s": time.perf_counter() - t0, "pending": self.pending()})
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+modules/batch.py
+- GUI 없이 분석/편집 작업 실행 (cli.py, app.py 백그라운드 작업에서 공용)
+- manifest: {"jobs": [{"id", "type": "analyze"|"edit", ...}, ...]}
+- 제한된 수의 워커 프로세스로 실행, 완료 마커(job.done.json)가 있는 작업은 건너뜀 (크래시 후 재개)
+- 작업별 상태/소요 시간을 JSON lines로 출력
+"""
+from pathlib import Path
+import json
+import shutil
+import subprocess
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+DONE_MARKER = "job.done.json"
+ROOT = Path(__file__).resolve().parent.parent
+
+def load_manifest(path):
+    data = json.load(open(path, "r", encoding="utf-8"))
+    jobs = data.get("jobs", data) if isinstance(data, dict) else data
+    defaults = data.get("defaults", {}) if isinstance(data, dict) else {}
+    seen = set()
+    out = []
+    for i, job in enumerate(jobs):
+        job = dict(defaults, **job)
+        job.setdefault("id", f"job_{i:04d}")
+        if job["id"] in seen:
+            raise ValueError(f"duplicate job id: {job['id']}")
+        if job.get("type") not in ("analyze", "edit"):
+            raise ValueError(f"job {job['id']}: type must be 'analyze' or 'edit'")
+        seen.add(job["id"])
+        out.append(job)
+    return out
+
+def job_output_dir(job):
+    """
+    완료 마커를 둘 폴더. analyze: <output>/<id> (스타일 패키지), edit: <output>
+    """
+    if not job.get("output"):
+        return None
+    if job["type"] == "analyze":
+        return Path(job["output"]) / job["id"]
+    return Path(job["output"])
+
+def job_done(job):
+    out = job_output_dir(job)
+    return out is not None and (out / DONE_MARKER).exists()
+
+def _download(urls, outdir, log_fn=print):
+    outdir = Path(outdir)
+    outdir.mkdir(parents=True, exist_ok=True)
+    before = set(outdir.glob("*.*"))
+    for u in urls:
+        log_fn(f"다운로드 요청: {u}")
+        subprocess.run([sys.executable, str(ROOT / "scripts" / "download.py"), "--urls", "-", "--outdir", str(outdir)],
+                       input=u, text=True, check=True)
+    return sorted(set(outdir.glob("*.*")) - before) or sorted(outdir.glob("*.*"))
+
+def _resolve_style(job, jobs_by_id):
+    style = job.get("style")
+    if job.get("style_job"):
+        dep = jobs_by_id[job["style_job"]]
+        style = str(job_output_dir(dep) / "style.json")
+    return Path(style) if style else None
+
+def run_job(job, log_fn=print, jobs_by_id=None):
+    """
+    작업 1개 실행. 반환 dict는 JSON으로 직렬화 가능 (GUI용 analyze 작업은 style/preview 포함).
+    analyze: inputs(파일 목록) 또는 urls, whisper, analysis_workers, cache, proxy, scene_mode ("full" / "fast"), scene_workers, output(없으면 저장 안 함)
+    edit: clips, style 또는 style_job, output, bgm_dir, trim_workers, trim_mode, engine, draft, edl_format ("json" 기본 / "aedl"), segment_cache
+    공통: trace (True면 단계별 계측 trace.json / trace_summary.txt 저장, 생략 시 AUTO_EDIT_TRACE 환경변수)
+    """
+    from modules.analyzer import analyze_with_preview
+    from modules.editor import create_edl_and_render
+    from modules.style import save_style_package, save_preview_assets
+    from modules.bgm import index_bgm_folder
+
+    out_dir = job_output_dir(job)
+    if job["type"] == "analyze":
+        paths = [Path(p) for p in job.get("inputs", [])]
+        if job.get("urls"):
+            paths += _download(job["urls"], job.get("download_dir", "samples/raw"), log_fn=log_fn)
+        if not paths:
+            raise ValueError("no inputs to analyze")
+        style, preview = analyze_with_preview(paths, use_whisper=bool(job.get("whisper")), progress_callback=log_fn,
+                                              use_cache=job.get("cache", True), workers=job.get("analysis_workers", 1),
+                                              trace_run=job.get("trace"), use_proxy=bool(job.get("proxy")),
+                                              scene_mode=job.get("scene_mode", "full"), scene_workers=job.get("scene_workers", 1))
+        result = {"sources": len(paths)}
+        if out_dir is None:
+            result.update({"style": style, "preview": preview})
+            return result
+        style["name"] = job["id"]
+        if out_dir.exists():
+            # 이전 실행이 마커 없이 중단된 패키지는 덮어쓴다
+            shutil.rmtree(out_dir)
+        pkg = save_style_package(style, out_dir.parent)
+        save_preview_assets(pkg, preview)
+        if preview.get("trace"):
+            for name in ("trace.json", "trace_summary.txt"):
+                shutil.copy(Path(preview["trace"]).parent / name, Path(pkg) / name)
+        result.update({"package": pkg, "style_path": str(Path(pkg) / "style.json")})
+    else:
+        clips = [Path(p) for p in job.get("clips", [])]
+        if not clips:
+            raise ValueError("no clips to edit")
+        if out_dir is None:
+            raise ValueError("edit job needs an output folder")
+        style_path = _resolve_style(job, jobs_by_id or {})
+        bgm_dir = Path(job.get("bgm_dir", "bgm"))
+        index_bgm_folder(bgm_dir, log_fn)
+        edl_path, rendered = create_edl_and_render(clips, style_path, out_dir, log_fn=log_fn,
+                                                   workers=job.get("trim_workers"),
+                                                   trim_mode=job.get("trim_mode", "encode"),
+                                                   engine=job.get("engine", "parts"),
+                                                   trace_run=job.get("trace"), draft=bool(job.get("draft")),
+                                                   edl_format=job.get("edl_format", "json"),
+                                                   segment_cache=job.get("segment_cache", True), bgm_dir=bgm_dir)
+        result = {"edl": edl_path, "rendered": rendered}
+        pkg = out_dir
+    with open(Path(pkg) / DONE_MARKER, "w", encoding="utf-8") as fh:
+        json.dump(dict(result, id=job["id"], finished_at=time.time()), fh, ensure_ascii=False)
+    return result
+
+def _job_entry(job, jobs_by_id, log_dir):
+    # 워커 프로세스: 작업 로그는 작업별 파일로
+    log_path = Path(log_dir) / f"{job['id']}.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    c0 = time.process_time()
+    with open(log_path, "a", encoding="utf-8") as lf:
+        def log_fn(msg):
+            lf.write(f"{time.strftime('%H:%M:%S')} {msg}\n")
+            lf.flush()
+        try:
+            result = run_job(job, log_fn=log_fn, jobs_by_id=jobs_by_id)
+            error = None
+        except Exception as e:
+            log_fn(traceback.format_exc())
+            result = None
+            error = f"{type(e).__name__}: {e}"
+    return {"result": result, "error": error, "wall_s": time.perf_counter() - t0,
+            "cpu_s": time.process_time() - c0, "log": str(log_path)}
+
+def run_manifest(jobs, workers=1, status_fn=None, log_dir="batch_logs", force=False):
+    """
+    jobs를 최대 workers개 프로세스로 실행. style_job 의존성이 있는 edit 작업은 해당 analyze 작업 후에 시작한다.
+    status_fn(dict)로 작업별 상태 이벤트(start/skipped/done/failed)를 보낸다.
+    return: {id: 최종 상태 dict}
+    """
+    status_fn = status_fn or (lambda rec: print(json.dumps(rec, ensure_ascii=False), flush=True))
+    jobs_by_id = {j["id"]: j for j in jobs}
+    for j in jobs:
+        if j.get("style_job") and j["style_job"] not in jobs_by_id:
+            raise ValueError(f"job {j['id']}: unknown style_job {j['style_job']}")
+    final = {}
+    pending = []
+    for j in jobs:
+        if not force and job_done(j):
+            rec = {"event": "skipped", "id": j["id"], "type": j["type"], "reason": "output complete"}
+            status_fn(rec)
+            final[j["id"]] = rec
+        else:
+            pending.append(j)
+    running = {}
+    with ProcessPoolExecutor(max_workers=max(1, int(workers))) as pool:
+        while pending or running:
+            for j in list(pending):
+                if len(running) >= max(1, int(workers)):
+                    break
+                dep = j.get("style_job")
+                if dep and dep not in final:
+                    continue
+                pending.remove(j)
+                if dep and final[dep]["event"] == "failed":
+                    rec = {"event": "failed", "id": j["id"], "type": j["type"], "error": f"dependency {dep} failed"}
+                    status_fn(rec)
+                    final[j["id"]] = rec
+                    continue
+                status_fn({"event": "start", "id": j["id"], "type": j["type"], "started_at": time.time()})
+                running[pool.submit(_job_entry, j, jobs_by_id, log_dir)] = j
+            if not running:
+                if pending:
+                    # 남은 작업은 모두 의존성 대기 중인데 실행 중인 작업이 없음
+                    for j in pending:
+                        rec = {"event": "failed", "id": j["id"], "type": j["type"], "error": "unresolvable dependency"}
+                        status_fn(rec)
+                        final[j["id"]] = rec
+                    pending = []
+                break
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in done:
+                j = running.pop(fut)
+                try:
+                    out = fut.result()
+                except Exception as e:
+                    out = {"result": None, "error": f"worker crashed: {e}", "wall_s": None, "cpu_s": None, "log": None}
+                rec = {"event": "failed" if out["error"] else "done", "id": j["id"], "type": j["type"],
+                       "wall_s": out["wall_s"], "cpu_s": out["cpu_s"], "log": out["log"]}
+                if out["error"]:
+                    rec["error"] = out["error"]
+                else:
+                    rec["result"] = out["result"]
+                status_fn(rec)
+                final[j["id"]] = rec
+    return final
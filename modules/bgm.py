@@ -3,27 +3,132 @@
 modules/bgm.py
 - bgm 폴더 인덱스 및 간단한 tempo 기반 선택기
 - 규칙: bgm/ 폴더 내 파일만 사용
+- 증분 인덱스: 파일별 지문(size, mtime, hash)을 bgm_index.json에 저장하고
+  새로 추가/변경된 트랙만 (프로세스 풀에서) 분석, 삭제된 트랙은 제거
+- 분석 실패 트랙은 bgm_failed.json에 지문과 오류를 기록 (파일이 바뀔 때까지 건너뜀, 삭제와 따로 집계)
 """
 from pathlib import Path
 import librosa
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from modules.cache import file_content_hash, write_json_atomic
 
-def index_bgm_folder(bgm_folder: Path, log_fn=print):
+BGM_EXTS = [".mp3", ".wav", ".m4a", ".aac", ".flac"]
+
+def _analyze_track(path):
+    y, sr = librosa.load(str(path), sr=None, mono=True, duration=60.0)
+    tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
+    return {"tempo": float(tempo), "duration": float(librosa.get_duration(y=y, sr=sr))}
+
+def _load_index(idx_file: Path):
+    try:
+        data = json.load(open(idx_file, "r", encoding="utf-8"))
+        return data if isinstance(data, list) else []
+    except Exception:
+        return []
+
+def _load_failed(failed_file: Path):
+    try:
+        data = json.load(open(failed_file, "r", encoding="utf-8"))
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+def index_bgm_folder(bgm_folder: Path, log_fn=print, workers=None):
+    """
+    bgm_index.json 갱신. size/mtime이 그대로인 트랙은 재분석하지 않고,
+    size/mtime이 바뀌어도 내용 해시가 같으면 이전 결과를 재사용한다.
+    분석에 실패한 트랙은 bgm_failed.json에 지문과 함께 기록해 파일이 바뀔 때까지 다시 분석하지 않는다.
+    workers: 분석 프로세스 수 (None = CPU 코어 수, 1 = 직렬)
+    """
     bgm_folder = Path(bgm_folder)
+    idx_file = bgm_folder / "bgm_index.json"
+    failed_file = bgm_folder / "bgm_failed.json"
+    old = {e.get("file"): e for e in _load_index(idx_file)}
+    old_failed = _load_failed(failed_file)
+    by_hash = {e["hash"]: e for e in old.values() if e.get("hash") and "tempo" in e}
     index = []
+    failed = {}
+    present = set()
+    todo = []
+    skipped = 0
     for f in sorted(bgm_folder.glob("*.*")):
-        if f.suffix.lower() not in [".mp3", ".wav", ".m4a", ".aac", ".flac"]:
+        if f.suffix.lower() not in BGM_EXTS:
+            continue
+        present.add(str(f))
+        st = f.stat()
+        prev = old.get(str(f))
+        if prev and prev.get("size") == st.st_size and prev.get("mtime_ns") == st.st_mtime_ns and "tempo" in prev:
+            index.append(prev)
+            continue
+        prev_fail = old_failed.get(str(f))
+        if prev_fail and prev_fail.get("size") == st.st_size and prev_fail.get("mtime_ns") == st.st_mtime_ns:
+            failed[str(f)] = prev_fail
+            skipped += 1
             continue
         try:
-            y, sr = librosa.load(str(f), sr=None, mono=True, duration=60.0)
-            tempo, _ = librosa.beat.beat_track(y=y, sr=sr)
-            index.append({"file": str(f), "tempo": float(tempo), "duration": float(librosa.get_duration(y=y, sr=sr))})
-            log_fn(f"Indexed BGM: {f.name} tempo={tempo:.1f}")
+            # bgm_index.json 자체가 지문 저장소이므로 공용 해시 메모는 쓰지 않는다
+            digest = file_content_hash(f, memo=False)
         except Exception as e:
             log_fn(f"Failed index {f.name}: {e}")
+            continue
+        entry = {"file": str(f), "size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest}
+        same = by_hash.get(digest)
+        if same:
+            entry.update({"tempo": same["tempo"], "duration": same["duration"]})
+            index.append(entry)
+            continue
+        if prev_fail and prev_fail.get("hash") == digest:
+            # mtime만 바뀌고 내용은 그대로인 실패 트랙
+            failed[str(f)] = dict(prev_fail, size=st.st_size, mtime_ns=st.st_mtime_ns)
+            skipped += 1
+            continue
+        todo.append(entry)
+    if skipped:
+        log_fn(f"BGM index: skipped {skipped} unchanged tracks that failed before (see {failed_file.name})")
+
+    if todo:
+        n_workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+        log_fn(f"BGM index: analysing {len(todo)} new/changed tracks ({n_workers} workers)")
+        if n_workers == 1:
+            results = []
+            for entry in todo:
+                try:
+                    results.append((entry, _analyze_track(entry["file"]), None))
+                except Exception as e:
+                    results.append((entry, None, e))
+        else:
+            results = []
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                futures = {pool.submit(_analyze_track, entry["file"]): entry for entry in todo}
+                for fut in as_completed(futures):
+                    try:
+                        results.append((futures[fut], fut.result(), None))
+                    except Exception as e:
+                        results.append((futures[fut], None, e))
+        n_failed = 0
+        for entry, res, err in results:
+            name = Path(entry["file"]).name
+            if err is not None:
+                log_fn(f"Failed index {name}: {err}")
+                failed[entry["file"]] = dict(entry, error=str(err))
+                n_failed += 1
+                continue
+            entry.update(res)
+            index.append(entry)
+            log_fn(f"Indexed BGM: {name} tempo={res['tempo']:.1f}")
+        if n_failed:
+            log_fn(f"BGM index: {n_failed} tracks failed to analyse (retried when the file changes)")
+    removed = len(set(old) - present)
+    if removed:
+        log_fn(f"BGM index: dropped {removed} removed tracks")
+    index.sort(key=lambda e: e["file"])
     # write index
-    with open(bgm_folder / "bgm_index.json", "w", encoding="utf-8") as fh:
-        json.dump(index, fh, indent=2)
+    bgm_folder.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(idx_file, index)
+    if failed or old_failed:
+        write_json_atomic(failed_file, failed)
     return index
 
 def choose_bgm_for_style(bgm_folder: Path, target_tempo=None):
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+modules/cache.py
+- 디스크 캐시 공통 유틸 (캐시 루트, 파일 내용 해시, LRU 제거)
+- 분석 결과(profile) 캐시: 키 = 파일 내용 해시 + 분석 파라미터
+- 용량 상한(LRU 제거) + 명시적 무효화 API (invalidate_profiles)
+"""
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+CACHE_ROOT = Path(os.environ.get("AUTO_EDIT_CACHE_DIR") or (Path.cwd() / "cache"))
+ANALYSIS_MAX_BYTES = 512 * 1024 * 1024
+_HASH_CHUNK = 1024 * 1024
+_HASH_MEMO = "hash_memo.json"
+
+def cache_dir(name, root=None) -> Path:
+    d = Path(root or CACHE_ROOT) / name
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+def write_json_atomic(path: Path, data):
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp_", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False)
+        os.replace(tmp, path)
+    except Exception:
+        try:
+            os.remove(tmp)
+        except Exception:
+            pass
+        raise
+
+def _hash_file(path: Path) -> str:
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def file_content_hash(path, root=None, memo=True) -> str:
+    """
+    파일 내용 전체의 blake2b 해시.
+    (절대경로, size, mtime_ns)가 같으면 이전 해시를 재사용하므로 변경 없는 파일은 다시 읽지 않는다.
+    memo=False: 해시 메모 파일을 읽고 쓰지 않음 (호출측이 자체 지문을 관리할 때)
+    """
+    path = Path(path).resolve()
+    if not memo:
+        return _hash_file(path)
+    st = path.stat()
+    memo_file = Path(root or CACHE_ROOT) / _HASH_MEMO
+    try:
+        memo = json.load(open(memo_file, "r", encoding="utf-8"))
+    except Exception:
+        memo = {}
+    hit = memo.get(str(path))
+    if hit and hit.get("size") == st.st_size and hit.get("mtime_ns") == st.st_mtime_ns:
+        return hit["hash"]
+    digest = _hash_file(path)
+    memo[str(path)] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest}
+    memo_file.parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(memo_file, memo)
+    return digest
+
+def _entry_size(p: Path) -> int:
+    if p.is_file():
+        return p.stat().st_size
+    return sum(f.stat().st_size for f in p.rglob("*") if f.is_file())
+
+def touch(p: Path):
+    try:
+        os.utime(p, None)
+    except OSError:
+        pass
+
+def evict_lru(directory: Path, max_bytes: int, log_fn=None):
+    """
+    directory 바로 아래 항목(파일 또는 폴더)을 마지막 사용 시각(mtime) 순으로 지워 총 크기를 max_bytes 이하로 맞춘다.
+    캐시 적중 시 touch()로 mtime을 갱신해 두어야 LRU 순서가 된다.
+    """
+    directory = Path(directory)
+    if not directory.exists():
+        return 0
+    entries = []
+    for p in directory.iterdir():
+        if p.name.startswith("."):
+            continue
+        try:
+            entries.append((p.stat().st_mtime, _entry_size(p), p))
+        except OSError:
+            continue
+    total = sum(e[1] for e in entries)
+    removed = 0
+    for _, size, p in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        if p.is_dir():
+            shutil.rmtree(p, ignore_errors=True)
+        else:
+            try:
+                p.unlink()
+            except OSError:
+                continue
+        total -= size
+        removed += 1
+        if log_fn:
+            log_fn(f"Cache evict: {p.name}")
+    return removed
+
+# ---- analysis profile cache ----
+
+def profile_key(path, params: dict, root=None) -> str:
+    h = hashlib.sha1()
+    h.update(file_content_hash(path, root=root).encode("ascii"))
+    h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+def load_profile(path, params: dict, root=None, out_dir: Path=None):
+    """
+    캐시된 profile을 반환 (없으면 None).
+    캐시에 함께 저장된 썸네일/SRT는 out_dir로 복사해 경로를 바꿔준다 (LRU 제거와 무관하게 쓰도록).
+    """
+    d = cache_dir("analysis", root)
+    entry = d / profile_key(path, params, root=root)
+    pf = entry / "profile.json"
+    if not pf.exists():
+        return None
+    try:
+        data = json.load(open(pf, "r", encoding="utf-8"))
+    except Exception:
+        return None
+    touch(entry)
+    profile = data["profile"]
+    profile["path"] = str(path)
+    out_dir = Path(out_dir) if out_dir else entry
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for t in profile.get("thumbs") or []:
+        src = entry / t["thumb"]
+        dst = out_dir / t["thumb"]
+        if src != dst:
+            shutil.copy(src, dst)
+        t["thumb"] = str(dst)
+    if profile.get("srt"):
+        src = entry / profile["srt"]
+        dst = out_dir / profile["srt"]
+        if src != dst:
+            shutil.copy(src, dst)
+        profile["srt"] = str(dst)
+    return profile
+
+def store_profile(path, params: dict, profile: dict, root=None, max_bytes=ANALYSIS_MAX_BYTES, log_fn=None):
+    d = cache_dir("analysis", root)
+    key = profile_key(path, params, root=root)
+    entry = d / key
+    entry.mkdir(parents=True, exist_ok=True)
+    stored = json.loads(json.dumps(profile))
+    for t in stored.get("thumbs") or []:
+        name = Path(t["thumb"]).name
+        shutil.copy(t["thumb"], entry / name)
+        t["thumb"] = name
+    if stored.get("srt") and Path(stored["srt"]).exists():
+        name = Path(stored["srt"]).name
+        shutil.copy(stored["srt"], entry / name)
+        stored["srt"] = name
+    else:
+        stored["srt"] = None
+    meta = {
+        "source": str(Path(path).resolve()),
+        "content_hash": file_content_hash(path, root=root),
+        "params": params,
+        "profile": stored
+    }
+    write_json_atomic(entry / "profile.json", meta)
+    evict_lru(d, max_bytes, log_fn=log_fn)
+    return key
+
+def invalidate_profiles(path=None, root=None) -> int:
+    """
+    path=None: 분석 캐시 전체 삭제.
+    path 지정: 해당 파일(경로 또는 현재 내용 해시가 같은 항목)의 모든 파라미터 조합을 삭제.
+    return: 삭제된 항목 수
+    """
+    d = cache_dir("analysis", root)
+    if path is None:
+        entries = [p for p in d.iterdir() if p.is_dir()]
+        for p in entries:
+            shutil.rmtree(p, ignore_errors=True)
+        return len(entries)
+    src = str(Path(path).resolve())
+    digest = file_content_hash(path, root=root) if Path(path).exists() else None
+    removed = 0
+    for entry in d.iterdir():
+        pf = entry / "profile.json"
+        if not pf.exists():
+            continue
+        try:
+            meta = json.load(open(pf, "r", encoding="utf-8"))
+        except Exception:
+            meta = {}
+        if meta.get("source") == src or (digest and meta.get("content_hash") == digest):
+            shutil.rmtree(entry, ignore_errors=True)
+            removed += 1
+    return removed
@@ -5,50 +5,333 @@ modules/editor.py (확장)
 - 전환(dissolve) 정보 반영
 - FFmpeg로 xfade / acrossfade 체인을 생성해 비디오+오디오 dissolve 적용
 - fallback: simple concat (no transitions)
+- 파트 트리밍은 여러 ffmpeg 프로세스로 병렬 실행 (workers 옵션)
+- smart 트림: 키프레임 사이 구간은 stream copy, 앞뒤 GOP 일부만 재인코딩 (trim_mode="smart")
+- direct 렌더 엔진: 파트 파일 없이 소스에서 바로 ffmpeg 1회 호출로 타임라인 전체를 인코딩 (engine="direct")
+- 세그먼트 캐시: 트림된 파트를 내용 키로 캐시해 다시 렌더할 때 바뀐 이벤트만 인코딩 (modules/segments.py)
+- 분할 전환 렌더: 하드 컷에서 타임라인을 나누고 dissolve 주변 프레임만 재인코딩, 나머지는 stream copy 후 concat (병렬, 메모리 일정)
+- EDL 저장: 기본은 기존 edl.json, edl_format="aedl"이면 압축 형식 edl.aedl (modules/edl.py, 이벤트 스트리밍 쓰기)
+- draft 렌더: 같은 EDL을 저해상도 프록시(modules/proxy.py)로 렌더 (draft=True, 결과는 draft.mp4)
+- 단계별 계측 (modules/trace.py): trim / concat / transitions / BGM mix, out_base/trace.json
 """
 from pathlib import Path
 import json
-from moviepy.editor import VideoFileClip
 from modules.style import load_style
+from modules import probe
+from modules import trace
+from modules import proxy
+from modules import edl
+from modules import segments
 from modules.bgm import choose_bgm_for_style
 import subprocess
 import os
 import shlex
+import threading
+import bisect
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# 동시에 실행할 ffmpeg 트림 프로세스 수 기본값 (libx264 자체도 멀티스레드이므로 코어 수의 절반)
+TRIM_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+# smart 트림: 키프레임 정렬된 중간 구간이 이보다 짧으면 그냥 전체 재인코딩
+SMART_MIN_COPY = 2.0
+# 파트 인코딩 설정 (세그먼트 캐시 키에 포함되므로 바꾸면 캐시된 파트는 자동으로 다시 인코딩된다)
+TRIM_ENCODER = ["-c:v", "libx264", "-preset", "fast", "-crf", "23"]
+BGM_MIX_FILTER = "[{bgm}:a]volume=0.25[a1];{main}[a1]amix=inputs=2:duration=first:dropout_transition=2[aout]"
+# 분할 전환 렌더가 실패했을 때 단일 filter_complex(_render_with_transitions)로 재시도할 최대 파트 수
+XFADE_GRAPH_MAX = 40
+_X264_PROFILES = {
+    "Constrained Baseline": "baseline", "Baseline": "baseline", "Main": "main", "High": "high",
+    "High 10": "high10", "High 4:2:2": "high422", "High 4:4:4 Predictive": "high444"
+}
 
 def chop_clip_parts(path, part_len):
-    clip = VideoFileClip(str(path))
-    dur = clip.duration
+    dur = probe.get_duration(path)
     parts = []
     t = 0.0
     while t < dur - 0.01:
         end = min(dur, t + part_len)
         parts.append({"file": str(path), "in_start": float(t), "in_end": float(end), "duration": float(end-t)})
         t = end
-    clip.close()
     return parts
 
-def _trim_parts(clips, events, tmpdir, log_fn=print):
+def _trim_cmd(ev, part_out, keys=None):
+    # keys: 파트 안에서 키프레임을 강제할 시각(초) 목록 (dissolve 경계, _render_segmented가 stream copy로 자름)
+    force = ["-force_key_frames", ",".join(f"{k:.6f}" for k in keys)] if keys else []
+    return [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-ss", str(ev["in_start"]), "-to", str(ev["in_end"]),
+        "-i", ev["infile"]
+    ] + TRIM_ENCODER + force + [
+        "-c:a", "aac", "-movflags", "+faststart", str(part_out)
+    ]
+
+def _snap(t, fps):
+    return round(t * fps) / fps
+
+def _dissolve_windows(items, fpss):
+    """
+    items[i]의 (head, tail). 하드 컷 경계는 None.
+    head: 앞 파트에서 dissolve로 들어오는 구간 길이(초), tail: 다음 파트로 dissolve가 시작되는 시각(초).
+    둘 다 프레임 격자에 맞춘다 (트림 시 강제 키프레임 위치 = 분할 렌더의 stream copy 경계).
+    """
+    tdurs = _transition_durations(items)
+    out = []
+    for i, it in enumerate(items):
+        fps = fpss[i] or 25.0
+        head = tail = None
+        if i > 0 and it.get("transition") == "dissolve":
+            head = max(1.0 / fps, _snap(tdurs[i], fps))
+        if i + 1 < len(items) and items[i+1].get("transition") == "dissolve":
+            tail = _snap(it["duration"] - tdurs[i+1], fps)
+        out.append((head, tail))
+    return out
+
+def _smart_trim_cmds(ev, part_out, seg_dir, info):
+    """
+    키프레임 정렬된 중간 구간 [k1, k2)는 stream copy, 앞뒤 [in, k1) / [k2, out)만 소스와 같은 코덱 설정
+    (profile / level / pix_fmt / 참조 프레임 수 / 색 정보)으로 재인코딩.
+    세그먼트는 MPEG-TS(인밴드 SPS/PPS)로 만든 뒤 concat demuxer로 이어 붙이고, 오디오는 이벤트 전체를 AAC로 인코딩해 mux한다.
+    이어 붙이기 전에 재인코딩 조각의 스트림 파라미터를 원본과 비교하는 검증 단계(callable, False면 불일치)를 넣는다.
+    조건이 안 맞으면 None (호출측에서 _trim_cmd 사용).
+    """
+    if not info or info.get("video_codec") != "h264" or not info.get("keyframes"):
+        return None
+    a, b = float(ev["in_start"]), float(ev["in_end"])
+    keys = info["keyframes"]
+    half = 0.5 / (info.get("fps") or 25.0)
+    i1 = bisect.bisect_left(keys, a - half)
+    i2 = bisect.bisect_right(keys, b + half) - 1
+    if i1 >= len(keys) or i2 < 0:
+        return None
+    k1, k2 = keys[i1], keys[i2]
+    if k2 - k1 < SMART_MIN_COPY:
+        return None
+    src = ev["infile"]
+    stem = Path(part_out).stem
+    src_params = probe.video_params(info)
+    enc = list(TRIM_ENCODER)
+    if info.get("pix_fmt"):
+        enc += ["-pix_fmt", info["pix_fmt"]]
+    if info.get("profile") in _X264_PROFILES:
+        enc += ["-profile:v", _X264_PROFILES[info["profile"]]]
+    level = _num_param(src_params.get("level"))
+    if level and level > 0:
+        enc += ["-level:v", f"{level // 10}.{level % 10}"]
+    refs = _num_param(src_params.get("refs"))
+    if refs and refs > 0:
+        enc += ["-x264-params", f"ref={refs}"]
+    for opt, key in (("-color_range", "color_range"), ("-colorspace", "color_space"),
+                     ("-color_primaries", "color_primaries"), ("-color_trc", "color_transfer")):
+        if src_params.get(key):
+            enc += [opt, src_params[key]]
+    base = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
+    cmds = []
+    segs = []
+    if k1 - a > half:
+        head = seg_dir / f"{stem}_head.ts"
+        cmds.append(base + ["-ss", str(a), "-i", src, "-t", str(k1 - a), "-map", "0:v:0", "-an"] + enc + ["-f", "mpegts", str(head)])
+        segs.append(head)
+    mid = seg_dir / f"{stem}_mid.ts"
+    # 입력 seek은 키프레임보다 반 프레임 뒤(반올림 오차로 이전 GOP가 잡히지 않게),
+    # 끝은 k2보다 1/4 프레임 앞 (k2 프레임은 tail 세그먼트가 시작)
+    cmds.append(base + ["-ss", str(k1 + half), "-i", src, "-t", str(k2 - k1 - 1.5 * half), "-map", "0:v:0", "-an",
+                        "-c:v", "copy", "-bsf:v", "h264_mp4toannexb", "-f", "mpegts", str(mid)])
+    segs.append(mid)
+    if b - k2 > half:
+        tail = seg_dir / f"{stem}_tail.ts"
+        cmds.append(base + ["-ss", str(k2), "-i", src, "-t", str(b - k2), "-map", "0:v:0", "-an"] + enc + ["-f", "mpegts", str(tail)])
+        segs.append(tail)
+    reencoded = [sp for sp in segs if sp is not mid]
+    if reencoded:
+        cmds.append(lambda: _params_match(src_params, reencoded))
+    seg_list = seg_dir / f"{stem}_segs.txt"
+    with open(seg_list, "w", encoding="utf-8") as fh:
+        for sp in segs:
+            fh.write(f"file '{sp.resolve()}'\n")
+    mux = base + ["-f", "concat", "-safe", "0", "-i", str(seg_list)]
+    if info.get("has_audio"):
+        audio = seg_dir / f"{stem}_audio.m4a"
+        cmds.append(base + ["-ss", str(a), "-to", str(b), "-i", src, "-vn", "-c:a", "aac", str(audio)])
+        mux += ["-i", str(audio), "-map", "0:v", "-map", "1:a"]
+    cmds.append(mux + ["-c", "copy", "-movflags", "+faststart", str(part_out)])
+    return cmds
+
+def _num_param(v):
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return None
+
+def _params_match(src_params, seg_paths):
+    """재인코딩한 head/tail 조각의 스트림 파라미터가 원본과 같으면 True (다르면 concat 이음새에서 디코더가 깨질 수 있음)."""
+    for sp in seg_paths:
+        try:
+            got = probe.video_params(probe.probe_media(sp, use_cache=False))
+        except Exception:
+            return False
+        if any(got.get(k) != v for k, v in src_params.items()):
+            return False
+    return True
+
+@trace.traced("trim")
+def _trim_parts(clips, events, tmpdir, log_fn=print, workers=None, mode="encode", use_cache=True):
+    """
+    EDL 이벤트마다 part_NNNN.mp4를 만든다. 최대 workers개의 ffmpeg를 동시에 실행하고,
+    반환 목록은 항상 events 순서(_render_concat / _render_with_transitions가 기대하는 순서)이다.
+    하나라도 실패하면 대기 중인 작업은 취소, 실행 중인 ffmpeg는 종료한 뒤 예외를 다시 던진다.
+    mode="smart"이면 가능한 이벤트는 _smart_trim_cmds(키프레임 구간 stream copy)로 만든다.
+    dissolve에 붙은 파트는 항상 재인코딩하고 dissolve 경계에 키프레임을 강제한다 (_render_segmented용 head/tail/fps를 반환 항목에 포함).
+    use_cache=True: 세그먼트 캐시(modules/segments.py)에 같은 키의 파트가 있으면 재사용하고, 새로 만든 파트는 캐시에 넣는다.
+    log_fn은 호출한 스레드에서만 불린다.
+    """
     tmpdir = Path(tmpdir)
     tmpdir.mkdir(parents=True, exist_ok=True)
-    part_paths = []
-    for i, ev in enumerate(events):
-        part_out = tmpdir / f"part_{i:04d}.mp4"
-        cmd = [
-            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
-            "-ss", str(ev["in_start"]), "-to", str(ev["in_end"]),
-            "-i", ev["infile"],
-            "-c:v", "libx264", "-preset", "fast", "-crf", "23",
-            "-c:a", "aac", "-movflags", "+faststart", str(part_out)
-        ]
-        log_fn(f"Trimming: {' '.join(shlex.quote(x) for x in cmd)}")
+    workers = TRIM_WORKERS if workers is None else max(1, int(workers))
+    outs = [tmpdir / f"part_{i:04d}.mp4" for i in range(len(events))]
+    windows = [(None, None)] * len(events)
+    fpss = [None] * len(events)
+    if any(ev.get("transition") == "dissolve" for ev in events):
+        for i, ev in enumerate(events):
+            try:
+                fpss[i] = probe.get_fps(ev["infile"])
+            except Exception:
+                fpss[i] = 25.0
+        windows = _dissolve_windows(events, fpss)
+    plans = [[_trim_cmd(ev, out, [k for k in win if k])] for ev, out, win in zip(events, outs, windows)]
+    full_plans = [list(p) for p in plans]
+    mismatched = set()
+    keys = [None] * len(events)
+    if use_cache:
+        with trace.stage("segment_cache", parts=len(events)):
+            for i, ev in enumerate(events):
+                try:
+                    keys[i] = segments.segment_key(ev, TRIM_ENCODER, mode=mode, keys=[k for k in windows[i] if k])
+                except OSError:
+                    continue
+                if segments.fetch(keys[i], outs[i]):
+                    plans[i] = []
+        n_hit = sum(1 for p in plans if not p)
+        log_fn(f"Segment cache: {n_hit}/{len(events)} parts reused, {len(events) - n_hit} to encode")
+    seg_dir = tmpdir / "smart_segs"
+    if mode == "smart":
+        seg_dir.mkdir(exist_ok=True)
+        infos = {}
+        for f in sorted(set(ev["infile"] for ev, plan in zip(events, plans) if plan)):
+            try:
+                infos[f] = probe.probe_media(f)
+                if infos[f].get("video_codec") == "h264":
+                    # 키프레임 목록은 패킷 전체를 읽으므로 smart 트림 대상 코덱일 때만 조회
+                    infos[f] = probe.probe_media(f, keyframes=True)
+            except Exception as e:
+                log_fn(f"Keyframe probe failed for {f}: {e}; re-encoding its parts")
+                infos[f] = None
+        n_smart = 0
+        for i, ev in enumerate(events):
+            if any(windows[i]) or not plans[i]:
+                continue
+            cmds = _smart_trim_cmds(ev, outs[i], seg_dir, infos.get(ev["infile"]))
+            if cmds:
+                plans[i] = cmds
+                n_smart += 1
+        log_fn(f"Smart trim: {n_smart}/{sum(1 for p in plans if p)} parts use keyframe stream copy")
+    running = {}
+    lock = threading.Lock()
+    failed = threading.Event()
+
+    def trim_one(i):
+        # 동시에 여러 ffmpeg를 기다리므로 자식 CPU 시간은 상위 "trim" 단계에서만 합산
+        with trace.stage("trim_part", children=False, part=i, cmds=len(plans[i])):
+            return _run_plan(i)
+
+    def _run_plan(i):
+        # 이전 렌더의 파트가 캐시 항목과 하드링크로 inode를 공유할 수 있으므로 ffmpeg -y로 덮어쓰기 전에 링크를 끊는다
         try:
-            subprocess.run(cmd, check=True)
-        except subprocess.CalledProcessError as e:
-            log_fn(f"ffmpeg trim failed for {ev['infile']} ({ev['in_start']}-{ev['in_end']}): {e}")
-            raise
-        part_paths.append({"path": str(part_out), "duration": ev["duration"], "transition": ev.get("transition","cut"), "transition_duration": ev.get("transition_duration", 0.0)})
+            outs[i].unlink()
+        except OSError:
+            pass
+        return _run_cmds(i, plans[i])
+
+    def _run_cmds(i, cmds):
+        for cmd in cmds:
+            if callable(cmd):
+                # smart 트림 검증 단계: 재인코딩 조각이 원본과 인코더 파라미터가 다르면 이벤트 전체를 재인코딩
+                if not cmd():
+                    mismatched.add(i)
+                    return _run_cmds(i, full_plans[i])
+                continue
+            with lock:
+                if failed.is_set():
+                    return False
+                proc = subprocess.Popen(cmd)
+                running[i] = proc
+            rc = proc.wait()
+            with lock:
+                running.pop(i, None)
+            if rc != 0:
+                if failed.is_set():
+                    return False
+                raise subprocess.CalledProcessError(rc, cmd)
+        if keys[i]:
+            segments.store(keys[i], outs[i])
+        return True
+
+    todo = [i for i in range(len(events)) if plans[i]]
+    total = len(todo)
+    log_fn(f"Trimming {total} parts with {min(workers, max(1, total))} workers")
+    if total:
+        log_fn(f"Trimming: {' '.join(shlex.quote(x) for x in _trim_cmd(events[todo[0]], outs[todo[0]]))} ...")
+    step = max(1, total // 20)
+    done = 0
+    completed = set()
+    error = None
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(trim_one, i): i for i in todo}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                ok = fut.result()
+            except Exception as e:
+                if error is None:
+                    error = e
+                    ev = events[i]
+                    log_fn(f"ffmpeg trim failed for {ev['infile']} ({ev['in_start']}-{ev['in_end']}): {e}")
+                    failed.set()
+                    for f in futures:
+                        f.cancel()
+                    with lock:
+                        for proc in running.values():
+                            proc.kill()
+                continue
+            if ok:
+                completed.add(i)
+                done += 1
+                if done % step == 0 or done == total:
+                    log_fn(f"Trimmed {done}/{total}")
+    if error is not None:
+        # 중단된 ffmpeg가 남긴 불완전한 파트 삭제
+        for i in todo:
+            out = outs[i]
+            if i not in completed:
+                try:
+                    out.unlink()
+                except OSError:
+                    pass
+        log_fn(f"Trimming cancelled after {done}/{total} parts")
+        shutil.rmtree(seg_dir, ignore_errors=True)
+        raise error
+    shutil.rmtree(seg_dir, ignore_errors=True)
+    if mismatched:
+        log_fn(f"Smart trim: encoder params differ from source in {len(mismatched)} parts, re-encoded them fully")
+    if use_cache:
+        segments.evict(log_fn=log_fn)
+    part_paths = []
+    for ev, out, (head, tail), fps in zip(events, outs, windows, fpss):
+        part_paths.append({"path": str(out), "duration": ev["duration"], "transition": ev.get("transition","cut"), "transition_duration": ev.get("transition_duration", 0.0),
+                           "fps": fps, "head": head, "tail": tail})
     return part_paths
 
+@trace.traced("concat")
 def _render_concat(part_paths, out_file, tmpdir, log_fn=print):
     concat_txt = Path(tmpdir) / "concat.txt"
     with open(concat_txt, "w", encoding="utf-8") as fconcat:
@@ -62,6 +345,34 @@ def _render_concat(part_paths, out_file, tmpdir, log_fn=print):
         log_fn(f"ffmpeg concat failed: {e}")
         raise
 
+def _concat_quote(path):
+    # concat demuxer 목록용 작은따옴표 이스케이프
+    return "'" + str(path).replace("'", "'\\''") + "'"
+
+def _xfade_filters(durations, tdurs, vid_streams, aud_streams):
+    """
+    순차 xfade(비디오) / acrossfade(오디오) 필터 체인.
+    tdurs[i]: i-1 -> i 전환 길이 (tdurs[0]은 사용 안 함)
+    return: (filters, 최종 비디오 라벨, 최종 오디오 라벨)
+    """
+    vchain = vid_streams[0]
+    achain = aud_streams[0]
+    filters = []
+    for i in range(1, len(vid_streams)):
+        tdur = tdurs[i]
+        offset = max(0.001, durations[i-1] - tdur)
+        out_v = f"[v{i}]"
+        out_a = f"[a{i}]"
+        filters.append(f"{vchain}{vid_streams[i]}xfade=transition=fade:duration={tdur}:offset={offset}{out_v}")
+        filters.append(f"{achain}{aud_streams[i]}acrossfade=d={tdur}{out_a}")
+        vchain = out_v
+        achain = out_a
+    return filters, vchain, achain
+
+def _transition_durations(items):
+    return [0.0] + [items[i].get("transition_duration") or items[i-1].get("transition_duration") or 0.4 for i in range(1, len(items))]
+
+@trace.traced("transitions")
 def _render_with_transitions(part_paths, out_file, tmpdir, log_fn=print):
     """
     Build ffmpeg filter_complex with sequential xfades (video) and acrossfade (audio).
@@ -70,31 +381,9 @@ def _render_with_transitions(part_paths, out_file, tmpdir, log_fn=print):
     input_args = []
     for p in part_paths:
         input_args.extend(["-i", p["path"]])
-    vid_streams = []
-    aud_streams = []
-    for i in range(len(part_paths)):
-        vid_streams.append(f"[{i}:v]")
-        aud_streams.append(f"[{i}:a]")
-
-    vchain = vid_streams[0]
-    achain = aud_streams[0]
-    filter_idx = 0
-    filters = []
-    for i in range(1, len(part_paths)):
-        cur = vid_streams[i]
-        cur_a = aud_streams[i]
-        tdur = part_paths[i].get("transition_duration") or part_paths[i-1].get("transition_duration") or 0.4
-        prev_dur = part_paths[i-1]["duration"]
-        offset = max(0.001, prev_dur - tdur)
-        out_v = f"[v{filter_idx+1}]"
-        out_a = f"[a{filter_idx+1}]"
-        vf = f"{vchain}{cur}xfade=transition=fade:duration={tdur}:offset={offset}{out_v}"
-        af = f"{achain}{cur_a}acrossfade=d={tdur}{out_a}"
-        filters.append(vf)
-        filters.append(af)
-        vchain = out_v
-        achain = out_a
-        filter_idx += 1
+    vid_streams = [f"[{i}:v]" for i in range(len(part_paths))]
+    aud_streams = [f"[{i}:a]" for i in range(len(part_paths))]
+    filters, vchain, achain = _xfade_filters([p["duration"] for p in part_paths], _transition_durations(part_paths), vid_streams, aud_streams)
 
     filter_complex = ";".join(filters)
     cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
@@ -110,9 +399,176 @@ def _render_with_transitions(part_paths, out_file, tmpdir, log_fn=print):
         log_fn(f"ffmpeg transition render failed: {e}")
         raise
 
-def create_edl_and_render(clips, style_path, out_base: Path, log_fn=print):
+def _segment_cmds(part_paths, seg_dir):
+    """
+    _render_segmented용 (세그먼트 경로, ffmpeg 명령) 목록 (타임라인 순서).
+    - 본문: 파트의 [head, tail) 구간. 비디오는 강제 키프레임에서 stream copy, 오디오만 재인코딩
+    - 전환: 앞 파트의 [tail, 끝) + 다음 파트의 [0, head)만 디코드해 xfade/acrossfade 인코딩 (입력 2개)
+    모든 세그먼트는 MPEG-TS (concat demuxer로 -c copy 연결).
+    """
+    base = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
+    enc = ["-c:v", "libx264", "-preset", "fast", "-crf", "23", "-c:a", "aac", "-f", "mpegts"]
+    jobs = []
+    for i, p in enumerate(part_paths):
+        fps = p.get("fps") or 25.0
+        head = p.get("head") or 0.0
+        tail = p.get("tail")
+        if tail is not None and tail - head < 1.0 / fps:
+            raise ValueError(f"part {i} ({p['duration']:.2f}s) is shorter than its dissolves")
+        if p.get("head") is not None:
+            prev = part_paths[i-1]
+            xf_out = seg_dir / f"xfade_{i:04d}.ts"
+            da = max(1.0 / fps, prev["duration"] - prev["tail"])
+            d = min(da, head)
+            graph = (f"[0:v][1:v]xfade=transition=fade:duration={d:.6f}:offset={max(0.0, da - head):.6f}[v];"
+                     f"[0:a][1:a]acrossfade=d={d:.6f}[a]")
+            jobs.append((xf_out, base + ["-ss", f"{prev['tail']:.6f}", "-i", prev["path"], "-t", f"{head:.6f}", "-i", p["path"],
+                                         "-filter_complex", graph, "-map", "[v]", "-map", "[a]"] + enc + [str(xf_out)]))
+        body = seg_dir / f"body_{i:04d}.ts"
+        if not head and tail is None:
+            cmd = base + ["-i", p["path"], "-map", "0:v:0", "-map", "0:a:0?", "-c", "copy", "-f", "mpegts", str(body)]
+        else:
+            # 비디오 입력은 반 프레임 뒤로 seek해 강제 키프레임(head)에서 정확히 시작, 오디오는 head에서 디코드
+            cmd = base + ["-ss", f"{head + 0.5 / fps:.6f}" if head else "0", "-i", p["path"], "-ss", f"{head:.6f}", "-i", p["path"]]
+            if tail is not None:
+                cmd += ["-t", f"{tail - head:.6f}"]
+            cmd += ["-map", "0:v:0", "-map", "1:a:0?", "-c:v", "copy", "-c:a", "aac",
+                    "-avoid_negative_ts", "make_zero", "-f", "mpegts", str(body)]
+        jobs.append((body, cmd))
+    return jobs
+
+@trace.traced("transitions_segmented")
+def _render_segmented(part_paths, out_file, tmpdir, log_fn=print, workers=None):
+    """
+    dissolve가 많은 타임라인용 전환 렌더. 하드 컷 사이의 구간마다 본문은 stream copy, dissolve 구간만 재인코딩하고
+    세그먼트들을 최대 workers개 ffmpeg로 병렬 생성한 뒤 concat demuxer(-c copy)로 잇는다.
+    ffmpeg 하나가 여는 입력은 최대 2개라 파트 수와 무관하게 메모리/파일 디스크립터 사용량이 일정하다.
+    파트는 _trim_parts로 만든 것이어야 한다 (dissolve 경계 강제 키프레임 + head/tail/fps 정보).
+    """
+    if any("head" not in p for p in part_paths):
+        raise ValueError("parts carry no dissolve keyframe info (trim them with _trim_parts)")
+    seg_dir = Path(tmpdir) / "xfade_segs"
+    seg_dir.mkdir(parents=True, exist_ok=True)
+    workers = TRIM_WORKERS if workers is None else max(1, int(workers))
+    jobs = _segment_cmds(part_paths, seg_dir)
+    n_xfade = sum(1 for p in part_paths if p.get("head") is not None)
+    log_fn(f"Segmented transition render: {len(jobs)} segments ({n_xfade} dissolves re-encoded, bodies stream-copied), {workers} workers")
+    try:
+        error = None
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(subprocess.run, cmd, check=True): out for out, cmd in jobs}
+            for fut in as_completed(futures):
+                try:
+                    fut.result()
+                except Exception as e:
+                    if error is None:
+                        error = e
+                        log_fn(f"ffmpeg segment failed ({futures[fut].name}): {e}")
+                        for f in futures:
+                            f.cancel()
+        if error is not None:
+            raise error
+        seg_list = seg_dir / "segments.txt"
+        with open(seg_list, "w", encoding="utf-8") as fh:
+            for out, _ in jobs:
+                fh.write(f"file {_concat_quote(out.resolve())}\n")
+        cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", str(seg_list),
+               "-c", "copy", "-movflags", "+faststart", str(out_file)]
+        subprocess.run(cmd, check=True)
+    finally:
+        shutil.rmtree(seg_dir, ignore_errors=True)
+
+def _render_timeline(part_paths, out_file, tmpdir, log_fn=print, workers=None):
+    """
+    트림된 파트들을 최종 파일로. dissolve가 있으면 _render_segmented, 실패하면
+    파트 수가 XFADE_GRAPH_MAX 이하일 때만 단일 그래프(_render_with_transitions)로 재시도하고,
+    그래도 안 되면 전환 없이 concat한다 (어느 경로로 렌더했는지 항상 로그에 남김).
+    return: "concat" | "segmented" | "graph" | "concat_fallback"
+    """
+    n_dissolves = sum(1 for p in part_paths[1:] if p.get("transition") == "dissolve")
+    if not n_dissolves:
+        _render_concat(part_paths, out_file, tmpdir, log_fn=log_fn)
+        return "concat"
+    try:
+        _render_segmented(part_paths, out_file, tmpdir, log_fn=log_fn, workers=workers)
+        return "segmented"
+    except Exception as e:
+        log_fn(f"Segmented transition render failed: {e}")
+    if len(part_paths) <= XFADE_GRAPH_MAX:
+        log_fn(f"Retrying transitions as a single filter graph ({len(part_paths)} parts)")
+        try:
+            _render_with_transitions(part_paths, out_file, tmpdir, log_fn=log_fn)
+            return "graph"
+        except Exception as e:
+            log_fn(f"Transition render failed: {e}")
+    log_fn(f"WARNING: rendering without transitions ({n_dissolves} dissolves dropped, plain concat)")
+    _render_concat(part_paths, out_file, tmpdir, log_fn=log_fn)
+    return "concat_fallback"
+
+@trace.traced("render_direct")
+def _render_direct(events, out_file, tmpdir, log_fn=print, bgm_file=None):
+    """
+    중간 파트 파일 없이 소스에서 바로 한 번의 ffmpeg 호출로 렌더 (BGM 믹스 포함).
+    - 컷만 있는 타임라인: concat demuxer + inpoint/outpoint, concatdec_select로 정확한 프레임만 인코딩
+    - dissolve 타임라인: 이벤트별 -ss/-to 입력 + xfade/acrossfade 체인 (인코딩 1회)
+    """
+    tmpdir = Path(tmpdir)
+    tmpdir.mkdir(parents=True, exist_ok=True)
+    enc = ["-c:v", "libx264", "-preset", "fast", "-crf", "23", "-c:a", "aac", "-movflags", "+faststart", str(out_file)]
+    cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
+    has_dissolve = any(ev.get("transition") == "dissolve" for ev in events)
+    if not has_dissolve:
+        timeline_txt = tmpdir / "timeline.txt"
+        with open(timeline_txt, "w", encoding="utf-8") as fh:
+            for ev in events:
+                fh.write(f"file {_concat_quote(Path(ev['infile']).resolve())}\n")
+                fh.write(f"inpoint {ev['in_start']}\n")
+                fh.write(f"outpoint {ev['in_end']}\n")
+        cmd += ["-f", "concat", "-safe", "0", "-segment_time_metadata", "1", "-i", str(timeline_txt)]
+        vout = "[0:v]select=concatdec_select[vout]"
+        aout = "[0:a]aselect=concatdec_select,aresample=async=1"
+        n_inputs = 1
+    else:
+        for ev in events:
+            cmd += ["-ss", str(ev["in_start"]), "-to", str(ev["in_end"]), "-i", ev["infile"]]
+        n_inputs = len(events)
+        filters, vchain, achain = _xfade_filters(
+            [ev["duration"] for ev in events], _transition_durations(events),
+            [f"[{i}:v]" for i in range(n_inputs)], [f"[{i}:a]" for i in range(n_inputs)])
+        vout = ";".join(filters + [f"{vchain}null[vout]"])
+        aout = f"{achain}anull"
+    if bgm_file:
+        cmd += ["-i", str(bgm_file)]
+        graph = f"{vout};{aout}[amain];" + BGM_MIX_FILTER.format(bgm=n_inputs, main="[amain]")
+    else:
+        graph = f"{vout};{aout}[aout]"
+    cmd += ["-filter_complex", graph, "-map", "[vout]", "-map", "[aout]"] + enc
+    log_fn(f"Running direct render ({len(events)} events, single ffmpeg pass)")
+    try:
+        subprocess.run(cmd, check=True)
+    except subprocess.CalledProcessError as e:
+        log_fn(f"ffmpeg direct render failed: {e}")
+        raise
+
+def create_edl_and_render(clips, style_path, out_base: Path, log_fn=print, workers=None, trim_mode="encode", engine="parts",
+                          trace_run=None, draft=False, edl_format="json", segment_cache=True, bgm_dir="bgm"):
+    """
+    engine="parts": 이벤트별 파트 파일 트림 후 concat / xfade (기본)
+    engine="direct": 파트 파일 없이 소스에서 한 번에 렌더 (_render_direct)
+    edl_format="json": out_base/edl.json (스타일 내장, 기본) / "aedl": out_base/edl.aedl (modules/edl.py, 스타일은 ID 참조)
+    draft=True: EDL은 원본 기준 그대로 저장하고, 렌더만 프록시로 해서 out_base/draft.mp4를 만든다
+    (최종 렌더는 같은 EDL을 원본으로: scripts/render.py 또는 draft=False로 다시 실행)
+    segment_cache=True: 이전 렌더와 키(소스/in-out/인코더 설정/트림 모드)가 같은 파트는 cache/segments에서 재사용 (modules/segments.py)
+    bgm_dir: 스타일 템포에 맞는 BGM을 고를 폴더 (bgm_index.json이 없으면 색인)
+    trace_run: True면 단계별 계측 결과를 out_base/trace.json, trace_summary.txt로 저장 (None = AUTO_EDIT_TRACE 환경변수)
+    """
     out_base = Path(out_base)
     out_base.mkdir(parents=True, exist_ok=True)
+    with trace.run("render", out_dir=out_base, log_fn=log_fn, enabled=trace_run, engine=engine, trim_mode=trim_mode, draft=draft):
+        return _create_edl_and_render(clips, style_path, out_base, log_fn, workers, trim_mode, engine, draft, edl_format, segment_cache,
+                                      Path(bgm_dir))
+
+def _create_edl_and_render(clips, style_path, out_base, log_fn, workers, trim_mode, engine, draft, edl_format, segment_cache, bgm_dir):
     if style_path:
         style = load_style(style_path)
         asl = style.get("mean_avg_cut_length") or style.get("median_avg_cut_length") or 3.0
@@ -123,48 +579,66 @@ def create_edl_and_render(clips, style_path, out_base: Path, log_fn=print):
         style = {"note":"auto"}
     events = []
     out_time = 0.0
-    for c in clips:
-        parts = chop_clip_parts(c, asl)
-        for p in parts:
-            ev = {
-                "infile": p["file"],
-                "in_start": p["in_start"],
-                "in_end": p["in_end"],
-                "out_start": out_time,
-                "duration": p["duration"],
-                "transition": "cut",
-                "transition_duration": 0.0
-            }
-            events.append(ev)
-            out_time += p["duration"]
-    edl = {"style": style, "events": events}
-    edl_path = out_base / "edl.json"
-    with open(edl_path, "w", encoding="utf-8") as fh:
-        json.dump(edl, fh, indent=2, ensure_ascii=False)
+    if edl_format == "aedl":
+        # 스타일은 내장하지 않고 style.json(없으면 EDL 옆 style_<id>.json)을 ID로 참조
+        edl_path = out_base / "edl.aedl"
+        writer = edl.EdlWriter(edl_path, style=style, style_path=style_path)
+    elif edl_format == "json":
+        edl_path = out_base / "edl.json"
+        writer = None
+    else:
+        raise ValueError(f"unknown edl_format: {edl_format!r} (json / aedl)")
+    with trace.stage("edl", clips=len(clips)):
+        try:
+            for c in clips:
+                parts = chop_clip_parts(c, asl)
+                for p in parts:
+                    ev = {
+                        "infile": p["file"],
+                        "in_start": p["in_start"],
+                        "in_end": p["in_end"],
+                        "out_start": out_time,
+                        "duration": p["duration"],
+                        "transition": "cut",
+                        "transition_duration": 0.0
+                    }
+                    events.append(ev)
+                    if writer:
+                        writer.append(ev)
+                    out_time += p["duration"]
+        except BaseException:
+            if writer:
+                writer.abort()
+            raise
+        if writer:
+            writer.close()
+        else:
+            with open(edl_path, "w", encoding="utf-8") as fh:
+                json.dump({"style": style, "events": events}, fh, indent=2, ensure_ascii=False)
     log_fn(f"EDL created: {edl_path}")
-    bgm_file = choose_bgm_for_style(Path("bgm"), tempo)
-    rendered = out_base / "final.mp4"
+    bgm_file = choose_bgm_for_style(bgm_dir, tempo)
+    rendered = out_base / ("draft.mp4" if draft else "final.mp4")
+    if draft:
+        with trace.stage("proxies", sources=len(clips)):
+            events = proxy.proxy_events(events, log_fn=log_fn)
+        log_fn("Draft render from proxies")
+    if engine == "direct":
+        _render_direct(events, str(rendered), out_base, log_fn=log_fn, bgm_file=bgm_file)
+        return str(edl_path), str(rendered)
     tmpdir = out_base / "parts"
-    part_paths = _trim_parts(clips, events, tmpdir, log_fn=log_fn)
-    has_dissolve = any(p.get("transition") == "dissolve" for p in part_paths)
-    if has_dissolve:
-        try:
-            _render_with_transitions(part_paths, str(rendered), tmpdir, log_fn=log_fn)
-        except Exception as e:
-            log_fn(f"Transition render failed: {e}. Falling back to concat.")
-            _render_concat(part_paths, str(rendered), tmpdir, log_fn=log_fn)
-    else:
-        _render_concat(part_paths, str(rendered), tmpdir, log_fn=log_fn)
+    part_paths = _trim_parts(clips, events, tmpdir, log_fn=log_fn, workers=workers, mode=trim_mode, use_cache=segment_cache)
+    _render_timeline(part_paths, str(rendered), tmpdir, log_fn=log_fn, workers=workers)
     if bgm_file:
-        mixed = out_base / "final_bgm.mp4"
+        mixed = out_base / f"{rendered.stem}_bgm.mp4"
         cmd_mix = [
             "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
             "-i", str(rendered), "-i", str(bgm_file),
-            "-filter_complex", "[1:a]volume=0.25[a1];[0:a][a1]amix=inputs=2:duration=first:dropout_transition=2[aout]",
+            "-filter_complex", BGM_MIX_FILTER.format(bgm=1, main="[0:a]"),
             "-map", "0:v", "-map", "[aout]", "-c:v", "copy", "-c:a", "aac", str(mixed)
         ]
         try:
-            subprocess.run(cmd_mix, check=True)
+            with trace.stage("bgm_mix"):
+                subprocess.run(cmd_mix, check=True)
             Path(mixed).replace(rendered)
         except subprocess.CalledProcessError as e:
             log_fn(f"BGM mix failed: {e}; keeping original audio")
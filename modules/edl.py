@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+modules/edl.py
+- 압축 EDL 형식(.aedl): 이벤트를 고정 크기 레코드(NumPy structured array)로 저장, infile/transition은 문자열 테이블 인덱스
+- 스타일은 EDL에 넣지 않고 ID(내용 해시) + 파일 경로로 참조 (스타일 패키지의 style.json 또는 EDL 옆 style_<id>.json)
+- EdlWriter: 이벤트를 받는 대로 청크 단위로 기록 (스트리밍 쓰기), EdlFile: 레코드를 np.memmap으로 읽음
+- JSON EDL(기존 edl.json)과 무손실 상호 변환 (json_to_aedl / aedl_to_json), load_edl은 두 형식 모두 읽음
+
+파일 구조:
+  [0:64)    헤더  magic "AEDL", version(u16), reserved(u16), n_events(u64), data_offset(u64), footer_offset(u64)
+  [64:...)  레코드 n_events개 (EVENT_DTYPE)
+  [footer)  UTF-8 JSON: strings, transitions, style 참조, 레코드에 없는 이벤트 키(extras), 최상위 메타
+"""
+from collections.abc import Sequence
+from pathlib import Path
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import numpy as np
+
+MAGIC = b"AEDL"
+EDL_VERSION = 1
+HEADER_SIZE = 64
+_HEADER = struct.Struct("<4sHHQQQ")
+EVENT_DTYPE = np.dtype([
+    ("infile", "<u4"), ("transition", "<u4"),
+    ("in_start", "<f8"), ("in_end", "<f8"), ("out_start", "<f8"),
+    ("duration", "<f8"), ("transition_duration", "<f8"),
+])
+# 레코드에 들어가는 키 (JSON 변환 시 이 순서로 복원), 없던 값은 NaN / MISSING 으로 표시
+EVENT_KEYS = ["infile", "in_start", "in_end", "out_start", "duration", "transition", "transition_duration"]
+_FLOAT_KEYS = ["in_start", "in_end", "out_start", "duration", "transition_duration"]
+MISSING = 0xFFFFFFFF
+
+def style_id(style) -> str:
+    raw = json.dumps(style, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+def is_aedl(path) -> bool:
+    try:
+        with open(path, "rb") as fh:
+            return fh.read(4) == MAGIC
+    except OSError:
+        return False
+
+class EdlWriter:
+    """
+    with EdlWriter(path, style=style, style_path=style_json) as w:
+        for ev in events: w.append(ev)
+    style_path가 있으면 그 파일을 참조하고, 없으면 style을 EDL 옆 style_<id>.json으로 저장해 참조한다.
+    임시 파일에 쓰고 close()에서 교체하므로 중간에 실패해도 기존 EDL은 남는다.
+    """
+    def __init__(self, path, style=None, style_path=None, meta=None, chunk=4096):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.strings = {}
+        self.transitions = {}
+        self.extras = {}
+        self.meta = dict(meta or {})
+        self.style_ref = self._style_ref(style, style_path)
+        self.n = 0
+        self._buf = np.zeros(chunk, dtype=EVENT_DTYPE)
+        self._fill = 0
+        fd, self._tmp = tempfile.mkstemp(prefix=".tmp_", suffix=".aedl", dir=str(self.path.parent))
+        self._fh = os.fdopen(fd, "wb")
+        self._fh.write(b"\0" * HEADER_SIZE)
+
+    def _style_ref(self, style, style_path):
+        if style is None and style_path is None:
+            return None
+        if style_path is not None:
+            style_path = Path(style_path).resolve()
+            if style is None:
+                style = json.load(open(style_path, "r", encoding="utf-8"))
+            return {"id": style_id(style), "path": str(style_path)}
+        sid = style_id(style)
+        sidecar = self.path.parent / f"style_{sid}.json"
+        if not sidecar.exists():
+            with open(sidecar, "w", encoding="utf-8") as fh:
+                json.dump(style, fh, ensure_ascii=False)
+        return {"id": sid, "path": sidecar.name}
+
+    def _intern(self, table, value):
+        idx = table.get(value)
+        if idx is None:
+            idx = table[value] = len(table)
+        return idx
+
+    def append(self, ev):
+        rec = self._buf[self._fill]
+        rec["infile"] = self._intern(self.strings, str(ev["infile"]))
+        rec["transition"] = self._intern(self.transitions, ev["transition"]) if "transition" in ev else MISSING
+        for k in _FLOAT_KEYS:
+            v = ev.get(k)
+            rec[k] = float(v) if v is not None else np.nan
+        extra = {k: v for k, v in ev.items() if k not in EVENT_KEYS or (k == "infile" and not isinstance(v, str))
+                 or (k in _FLOAT_KEYS and (not isinstance(v, float) or v != v))}
+        if extra:
+            # 레코드로 표현 못 하는 값(추가 키, float가 아닌 숫자/None, NaN — 레코드의 NaN은 "키 없음")은 원래 값 그대로 보관
+            self.extras[str(self.n)] = extra
+        self.n += 1
+        self._fill += 1
+        if self._fill == len(self._buf):
+            self._flush()
+
+    def _flush(self):
+        if self._fill:
+            self._buf[:self._fill].tofile(self._fh)
+            self._fill = 0
+
+    def close(self):
+        if self._fh is None:
+            return
+        self._flush()
+        footer_offset = self._fh.tell()
+        footer = {
+            "strings": list(self.strings), "transitions": list(self.transitions),
+            "style": self.style_ref, "extras": self.extras, "meta": self.meta
+        }
+        self._fh.write(json.dumps(footer, ensure_ascii=False).encode("utf-8"))
+        self._fh.seek(0)
+        self._fh.write(_HEADER.pack(MAGIC, EDL_VERSION, 0, self.n, HEADER_SIZE, footer_offset))
+        self._fh.close()
+        self._fh = None
+        os.replace(self._tmp, self.path)
+
+    def abort(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        try:
+            os.remove(self._tmp)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+class EdlFile(Sequence):
+    """
+    .aedl 읽기. records는 np.memmap (파일 크기와 무관하게 바로 열림),
+    column(name)으로 열 단위 접근, event(i) / f[i] / 순회로 JSON과 같은 dict (읽을 때마다 만듦), events()는 전체 목록.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as fh:
+            magic, version, _, n, data_offset, footer_offset = _HEADER.unpack(fh.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"not an AEDL file: {path}")
+            if version > EDL_VERSION:
+                raise ValueError(f"unsupported AEDL version {version}: {path}")
+            fh.seek(footer_offset)
+            footer = json.loads(fh.read().decode("utf-8"))
+        self.strings = footer["strings"]
+        self.transitions = footer["transitions"]
+        self.style_ref = footer.get("style")
+        self.extras = footer.get("extras", {})
+        self.meta = footer.get("meta", {})
+        self.records = np.memmap(self.path, dtype=EVENT_DTYPE, mode="r", offset=data_offset, shape=(n,)) if n else np.zeros(0, dtype=EVENT_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def column(self, name):
+        if name == "infile":
+            return np.asarray(self.strings, dtype=object)[self.records["infile"]]
+        return self.records[name]
+
+    def event(self, i):
+        rec = self.records[i]
+        ev = {}
+        for k in EVENT_KEYS:
+            if k == "infile":
+                ev[k] = self.strings[int(rec["infile"])]
+            elif k == "transition":
+                if int(rec["transition"]) != MISSING:
+                    ev[k] = self.transitions[int(rec["transition"])]
+            else:
+                v = float(rec[k])
+                if v == v:
+                    ev[k] = v
+        extra = self.extras.get(str(i))
+        if extra:
+            ev.update(extra)
+        return ev
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.event(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.event(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.event(i)
+
+    def events(self):
+        return list(self)
+
+    def style(self):
+        if not self.style_ref:
+            return None
+        p = Path(self.style_ref["path"])
+        if not p.is_absolute():
+            p = self.path.parent / p
+        return json.load(open(p, "r", encoding="utf-8"))
+
+def write_edl(path, events, style=None, style_path=None, meta=None):
+    with EdlWriter(path, style=style, style_path=style_path, meta=meta) as w:
+        for ev in events:
+            w.append(ev)
+    return str(path)
+
+def load_edl(path, with_style=True):
+    """
+    .aedl / JSON EDL 모두 {"style": ..., "events": [...], 기타 최상위 키} 형태로 반환.
+    .aedl의 events는 EdlFile (len / 인덱스 / 순회를 지원하는 읽기 전용 시퀀스, dict는 접근할 때 만듦).
+    with_style=False면 스타일 파일을 읽지 않는다 (style=None).
+    """
+    if is_aedl(path):
+        f = EdlFile(path)
+        data = dict(f.meta)
+        data["style"] = f.style() if with_style else None
+        data["events"] = f
+        return data
+    data = json.load(open(path, "r", encoding="utf-8"))
+    if not with_style:
+        data["style"] = None
+    return data
+
+def json_to_aedl(json_path, aedl_path=None):
+    data = json.load(open(json_path, "r", encoding="utf-8"))
+    aedl_path = Path(aedl_path) if aedl_path else Path(json_path).with_suffix(".aedl")
+    meta = {k: v for k, v in data.items() if k not in ("style", "events")}
+    meta["_key_order"] = list(data)
+    style = data.get("style")
+    if style is None:
+        # 스타일이 없거나 null이면 참조를 만들지 않고, null이었다는 것만 기록
+        meta["_style_null"] = "style" in data
+    return write_edl(aedl_path, data.get("events", []), style=style, meta=meta)
+
+def aedl_to_json(aedl_path, json_path=None, indent=None):
+    f = EdlFile(aedl_path)
+    meta = dict(f.meta)
+    order = meta.pop("_key_order", None)
+    style_null = meta.pop("_style_null", False)
+    data = dict(meta)
+    if f.style_ref or style_null:
+        data["style"] = f.style()
+    data["events"] = f.events()
+    if order:
+        data = {k: data[k] for k in order if k in data}
+    json_path = Path(json_path) if json_path else Path(aedl_path).with_suffix(".json")
+    with open(json_path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=indent, ensure_ascii=False)
+    return str(json_path)
@@ -3,20 +3,61 @@
 modules/preview.py
 - 썸네일 클릭시 해당 장면 재생을 위한 유틸
 - play_scene_clip(video_path, start, end, length_sec=2.0)
-  -> ffmpeg로 짧은 임시 클립 생성 후 시스템 기본 플레이어로 실행
+  -> 짧은 미리보기 클립을 (캐시에서 가져오거나 만들어) 시스템 기본 플레이어로 실행
+- 미리보기 클립 캐시: cache/preview, 키 = (영상 경로/크기/mtime, 시작 시각, 길이), 용량 상한(LRU 제거)
+- 시작점 근처에 키프레임이 있으면 재인코딩 없이 stream copy
+- prefetch(): 분석 직후 썸네일들의 클립을 백그라운드 스레드에서 미리 생성
 """
 from pathlib import Path
+import hashlib
 import subprocess
-import tempfile
+import threading
 import os
-import shlex
 import sys
+from modules import cache
+from modules import probe
 
-def _create_temp_clip(video_path: str, mid_s: float, length_sec: float=2.0):
-    tmpdir = Path(tempfile.mkdtemp(prefix="preview_clip_"))
-    out_file = tmpdir / "clip_preview.mp4"
-    half = length_sec / 2.0
-    start = max(0.0, mid_s - half)
+PREVIEW_MAX_BYTES = int(float(os.environ.get("AUTO_EDIT_PREVIEW_MB", 256)) * 1024 * 1024)
+# 시작점보다 이만큼(초) 앞까지의 키프레임이면 그 키프레임부터 stream copy
+KEYFRAME_SLACK = 0.5
+
+_key_locks = {}
+_key_locks_guard = threading.Lock()
+
+def _clip_window(mid_s: float, length_sec: float):
+    return max(0.0, mid_s - length_sec / 2.0), float(length_sec)
+
+def _clip_key(video_path: Path, start: float, length_sec: float):
+    st = video_path.stat()
+    raw = f"{video_path}|{st.st_size}|{st.st_mtime_ns}|{start:.3f}|{length_sec:.3f}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _key_lock(key):
+    with _key_locks_guard:
+        return _key_locks.setdefault(key, threading.Lock())
+
+def _copy_start(video_path: Path, start: float):
+    """start 직전 KEYFRAME_SLACK 안의 키프레임 시각 (없으면 None = 재인코딩)."""
+    try:
+        keys = probe.get_keyframes(video_path)
+    except Exception:
+        return None
+    before = [k for k in keys if k <= start + 1e-3]
+    if before and start - before[-1] <= KEYFRAME_SLACK:
+        return before[-1]
+    return None
+
+def _encode_clip(video_path: Path, start: float, length_sec: float, out_file: Path):
+    k = _copy_start(video_path, start)
+    if k is not None:
+        cmd = [
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-ss", str(k), "-i", str(video_path), "-t", str(length_sec),
+            "-map", "0:v:0", "-map", "0:a:0?", "-c", "copy", "-avoid_negative_ts", "make_zero",
+            "-f", "mp4", str(out_file)
+        ]
+        if subprocess.run(cmd).returncode == 0:
+            return
     # use -ss and -t for reliable trimming; re-encode to ensure compatibility
     cmd = [
         "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
@@ -25,11 +66,52 @@ def _create_temp_clip(video_path: str, mid_s: float, length_sec: float=2.0):
         "-t", str(length_sec),
         "-c:v", "libx264", "-preset", "fast", "-crf", "28",
         "-c:a", "aac",
-        str(out_file)
+        "-f", "mp4", str(out_file)
     ]
     subprocess.run(cmd, check=True)
+
+def get_preview_clip(video_path, mid_s: float, length_sec: float=2.0, max_bytes=PREVIEW_MAX_BYTES):
+    """
+    mid_s를 중심으로 한 length_sec 길이 클립 경로. 캐시에 있으면 바로 반환 (같은 클립을 동시에 요청하면 한 번만 생성).
+    """
+    video_path = Path(video_path).resolve()
+    start, length_sec = _clip_window(mid_s, length_sec)
+    key = _clip_key(video_path, start, length_sec)
+    d = cache.cache_dir("preview")
+    out_file = d / f"{key}.mp4"
+    with _key_lock(key):
+        if out_file.exists():
+            cache.touch(out_file)
+            return str(out_file)
+        tmp = d / f".tmp_{key}.mp4"
+        try:
+            _encode_clip(video_path, start, length_sec, tmp)
+            os.replace(tmp, out_file)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+    cache.evict_lru(d, max_bytes)
     return str(out_file)
 
+def prefetch(thumbs, length_sec: float=2.0, log_fn=None):
+    """
+    analyze_with_preview의 preview["thumbs"] 항목({"video", "start", "end"})의 클립을 백그라운드에서 생성.
+    return: 작업 스레드 (daemon)
+    """
+    items = [(t["video"], (float(t["start"]) + float(t["end"])) / 2.0) for t in thumbs if t.get("video")]
+
+    def work():
+        for video, mid in items:
+            try:
+                get_preview_clip(video, mid, length_sec=length_sec)
+            except Exception as e:
+                if log_fn:
+                    log_fn(f"Preview prefetch failed for {video} @ {mid:.2f}s: {e}")
+
+    th = threading.Thread(target=work, name="preview-prefetch", daemon=True)
+    th.start()
+    return th
+
 def _open_with_default_app(path: str):
     if sys.platform.startswith("win"):
         os.startfile(path)
@@ -41,12 +123,12 @@ def _open_with_default_app(path: str):
 
 def play_scene_clip(video_path: str, start: float, end: float, length_sec: float=2.0):
     """
-    Create a short clip centered around the scene midpoint and open it.
-    Returns path to temp clip.
+    Create (or reuse a cached) short clip centered around the scene midpoint and open it.
+    Returns path to the clip.
     """
     try:
         mid = (start + end) / 2.0
-        clip = _create_temp_clip(video_path, mid, length_sec=length_sec)
+        clip = get_preview_clip(video_path, mid, length_sec=length_sec)
         _open_with_default_app(clip)
         return clip
     except subprocess.CalledProcessError as e:
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+modules/probe.py
+- ffprobe로 미디어 정보 수집: 길이, fps, 프레임 수, 스트림 구성 (format/stream 헤더만 읽음, 파일 길이와 무관하게 빠름)
+- 비디오 키프레임 위치는 모든 패킷을 읽어야 하므로 필요할 때만 따로 조회 (probe_media(keyframes=True) / get_keyframes)
+- 결과는 메모리 + 디스크(cache/probe)에 캐시 (절대경로/크기/mtime 기준, 키프레임은 ms 델타 인코딩)
+- editor(chop_clip_parts, smart 트림), analyzer(fps/프레임 수), preview(키프레임)가 공용으로 사용
+"""
+from pathlib import Path
+import hashlib
+import json
+import subprocess
+import threading
+from modules import cache
+
+PROBE_VERSION = 3
+_memo = {}
+_memo_lock = threading.Lock()
+
+_ENTRIES = (
+    "format=duration,start_time,format_name"
+    ":stream=index,codec_type,codec_name,profile,level,refs,pix_fmt,width,height,field_order"
+    ",color_range,color_space,color_primaries,color_transfer"
+    ",r_frame_rate,avg_frame_rate,nb_frames,duration,sample_rate,channels"
+)
+
+def _fps_from_rate(rate):
+    num, _, den = (rate or "").partition("/")
+    try:
+        num, den = float(num), float(den or 1)
+        return num / den if num > 0 and den > 0 else None
+    except ValueError:
+        return None
+
+def _num(v, cast=float):
+    try:
+        return cast(v)
+    except (TypeError, ValueError):
+        return None
+
+def _run_ffprobe(path: Path):
+    cmd = ["ffprobe", "-v", "error", "-show_entries", _ENTRIES, "-of", "compact=p=1:nk=0", str(path)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    fmt = {}
+    streams = []
+    for line in out.splitlines():
+        section, _, rest = line.partition("|")
+        fields = dict(kv.partition("=")[::2] for kv in rest.split("|") if kv)
+        if section == "stream":
+            streams.append(fields)
+        elif section == "format":
+            fmt = fields
+    video = next((st for st in streams if st.get("codec_type") == "video"), {})
+    fps = _fps_from_rate(video.get("avg_frame_rate")) or _fps_from_rate(video.get("r_frame_rate"))
+    duration = _num(fmt.get("duration")) or _num(video.get("duration"))
+    # nb_frames가 없는 컨테이너(mkv 등)는 길이 x fps 추정 (패킷을 세려면 파일 전체를 읽어야 함)
+    frame_count = _num(video.get("nb_frames"), int) or (int(round(duration * fps)) if duration and fps else None)
+    return {
+        "duration": duration,
+        "start_time": _num(fmt.get("start_time")) or 0.0,
+        "format": fmt.get("format_name"),
+        "fps": fps,
+        "frame_count": frame_count,
+        "width": _num(video.get("width"), int),
+        "height": _num(video.get("height"), int),
+        "video_codec": video.get("codec_name"),
+        "profile": video.get("profile"),
+        "pix_fmt": video.get("pix_fmt"),
+        "has_audio": any(st.get("codec_type") == "audio" for st in streams),
+        "streams": [
+            {k: v for k, v in st.items() if v not in ("", "N/A", "unknown")}
+            for st in streams
+        ]
+    }
+
+def _run_ffprobe_keyframes(path: Path):
+    # 첫 비디오 스트림의 패킷 플래그만 읽는다 (디코딩은 하지 않지만 파일 전체를 읽음)
+    cmd = ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries", "packet=pts_time,flags",
+           "-of", "compact=p=0:nk=0", str(path)]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+    keyframes = []
+    for line in out.splitlines():
+        fields = dict(kv.partition("=")[::2] for kv in line.split("|") if kv)
+        if "K" in fields.get("flags", ""):
+            t = _num(fields.get("pts_time"))
+            if t is not None:
+                keyframes.append(t)
+    return sorted(keyframes)
+
+def _pack(info):
+    # 키프레임 목록은 ms 단위 정수 델타로 저장 (수 시간 분량도 수십 KB 수준), 아직 조회하지 않았으면 키 없음
+    packed = dict(info)
+    if info.get("keyframes") is not None:
+        kf_ms = [int(round(t * 1000)) for t in info["keyframes"]]
+        packed["keyframes"] = [kf_ms[0]] + [b - a for a, b in zip(kf_ms, kf_ms[1:])] if kf_ms else []
+    packed["version"] = PROBE_VERSION
+    return packed
+
+def _unpack(packed):
+    info = dict(packed)
+    if info.pop("version", None) != PROBE_VERSION:
+        raise ValueError("stale probe cache entry")
+    if "keyframes" in packed:
+        keys = []
+        acc = 0
+        for d in packed["keyframes"]:
+            acc += d
+            keys.append(acc / 1000.0)
+        info["keyframes"] = keys
+    return info
+
+def _cache_key(path: Path):
+    st = path.stat()
+    raw = f"{path}|{st.st_size}|{st.st_mtime_ns}|{PROBE_VERSION}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def probe_media(path, use_cache=True, keyframes=False):
+    """
+    return: {"duration", "start_time", "format", "fps", "frame_count", "width", "height",
+             "video_codec", "profile", "pix_fmt", "has_audio", "streams"}
+    keyframes=True면 "keyframes"(비디오 키프레임 시각 목록)도 채운다 (캐시에 없으면 패킷 전체를 읽는 ffprobe 1회 추가).
+    """
+    path = Path(path).resolve()
+    key = _cache_key(path)
+    info = None
+    with _memo_lock:
+        if use_cache and key in _memo:
+            info = _memo[key]
+    if info is not None and (not keyframes or "keyframes" in info):
+        return info
+    cache_file = cache.cache_dir("probe") / f"{key}.json" if use_cache else None
+    if info is None and cache_file is not None and cache_file.exists():
+        try:
+            info = _unpack(json.load(open(cache_file, "r", encoding="utf-8")))
+        except Exception:
+            info = None
+    dirty = False
+    if info is None:
+        info = _run_ffprobe(path)
+        dirty = True
+    if keyframes and "keyframes" not in info:
+        info = dict(info, keyframes=_run_ffprobe_keyframes(path))
+        dirty = True
+    if dirty and cache_file is not None:
+        try:
+            cache.write_json_atomic(cache_file, _pack(info))
+        except Exception:
+            pass
+    if use_cache:
+        with _memo_lock:
+            _memo[key] = info
+    return info
+
+# stream copy한 구간과 재인코딩한 구간을 이어 붙여도 되는지 판단하는 비디오 스트림 파라미터
+CONCAT_PARAMS = ("codec_name", "profile", "level", "refs", "pix_fmt", "width", "height", "field_order",
+                 "color_range", "color_space", "color_primaries", "color_transfer")
+
+def video_params(info):
+    """probe_media 결과의 첫 비디오 스트림에서 CONCAT_PARAMS만 (값이 없는 항목은 빠짐)."""
+    video = next((st for st in info.get("streams", []) if st.get("codec_type") == "video"), {})
+    return {k: video[k] for k in CONCAT_PARAMS if k in video}
+
+def get_duration(path):
+    return probe_media(path)["duration"]
+
+def get_fps(path, default=25.0):
+    return probe_media(path).get("fps") or default
+
+def get_frame_count(path):
+    return probe_media(path).get("frame_count")
+
+def get_keyframes(path):
+    return probe_media(path, keyframes=True)["keyframes"]
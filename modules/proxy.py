@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+modules/proxy.py
+- 소스별 저해상도/저비트레이트 프록시를 한 번 만들어 캐시 (cache/proxy/<key>/proxy.mp4 + meta.json, 용량 상한 LRU)
+- 프록시는 원본의 모든 프레임을 그대로 유지(-vsync passthrough, fps 동일)하므로 프레임 번호 = 원본 프레임 번호
+  -> 시각 변환은 프레임 번호 기준 (to_source / to_proxy)
+- analyzer: use_proxy=True 이면 영상 분석(scan_video)을 프록시로 하고 결과 시각을 원본 기준으로 되돌림
+- editor: draft=True 이면 같은 EDL을 프록시로 렌더 (proxy_events)
+"""
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+from modules import cache
+from modules import probe
+
+PROXY_VERSION = 1
+PROXY_HEIGHT = 360
+PROXY_CRF = 28
+PROXY_MAX_BYTES = int(float(os.environ.get("AUTO_EDIT_PROXY_MB", 4096)) * 1024 * 1024)
+
+_key_locks = {}
+_key_locks_guard = threading.Lock()
+
+def _proxy_key(path: Path):
+    st = path.stat()
+    raw = f"{path}|{st.st_size}|{st.st_mtime_ns}|{PROXY_VERSION}|{PROXY_HEIGHT}|{PROXY_CRF}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _key_lock(key):
+    with _key_locks_guard:
+        return _key_locks.setdefault(key, threading.Lock())
+
+def needs_proxy(info) -> bool:
+    # 이미 작은 영상은 원본을 그대로 쓴다
+    return bool(info.get("height")) and info["height"] > PROXY_HEIGHT
+
+def _proxy_cmd(src: Path, out: Path, info):
+    fps = info.get("fps") or 25.0
+    return [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-i", str(src),
+        "-map", "0:v:0", "-map", "0:a:0?",
+        "-vf", f"scale=-2:{PROXY_HEIGHT}", "-vsync", "passthrough",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", str(PROXY_CRF), "-g", str(max(1, int(round(fps)))),
+        "-c:a", "aac", "-b:a", "96k", "-movflags", "+faststart", str(out)
+    ]
+
+def get_proxy(path, log_fn=None, create=True, max_bytes=PROXY_MAX_BYTES):
+    """
+    path의 프록시. return: meta dict {"source", "proxy", "source_fps", "proxy_fps", "source_frames", "proxy_frames", "height"}
+    원본이 이미 PROXY_HEIGHT 이하이거나 create=False인데 캐시에 없으면 None.
+    """
+    path = Path(path).resolve()
+    info = probe.probe_media(path)
+    if not needs_proxy(info):
+        return None
+    key = _proxy_key(path)
+    d = cache.cache_dir("proxy")
+    entry = d / key
+    meta_file = entry / "meta.json"
+    with _key_lock(key):
+        if meta_file.exists() and (entry / "proxy.mp4").exists():
+            cache.touch(entry)
+            meta = json.load(open(meta_file, "r", encoding="utf-8"))
+            meta["proxy"] = str(entry / "proxy.mp4")
+            return meta
+        if not create:
+            return None
+        if log_fn:
+            log_fn(f"Proxy: encoding {path.name} ({info.get('height')}p -> {PROXY_HEIGHT}p)")
+        tmp = d / f".tmp_{key}"
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        try:
+            subprocess.run(_proxy_cmd(path, tmp / "proxy.mp4", info), check=True)
+            pinfo = probe.probe_media(tmp / "proxy.mp4", use_cache=False)
+            meta = {
+                "source": str(path),
+                "source_fps": info.get("fps"), "proxy_fps": pinfo.get("fps") or info.get("fps"),
+                "source_frames": info.get("frame_count"), "proxy_frames": pinfo.get("frame_count"),
+                "height": pinfo.get("height"), "version": PROXY_VERSION
+            }
+            if meta["source_frames"] and meta["proxy_frames"] and abs(meta["source_frames"] - meta["proxy_frames"]) > 1 and log_fn:
+                log_fn(f"Proxy: frame count differs for {path.name} ({meta['source_frames']} vs {meta['proxy_frames']}); times are mapped by frame rate")
+            cache.write_json_atomic(tmp / "meta.json", meta)
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp, entry)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+    cache.evict_lru(d, max_bytes, log_fn=log_fn)
+    meta["proxy"] = str(entry / "proxy.mp4")
+    return meta
+
+def to_source(t: float, meta) -> float:
+    """프록시 시각 -> 원본 시각 (같은 프레임 번호)."""
+    if not meta:
+        return t
+    pf, sf = meta.get("proxy_fps"), meta.get("source_fps")
+    if not pf or not sf:
+        return t
+    return round(t * pf) / sf
+
+def to_proxy(t: float, meta) -> float:
+    """원본 시각 -> 프록시 시각 (같은 프레임 번호)."""
+    if not meta:
+        return t
+    pf, sf = meta.get("proxy_fps"), meta.get("source_fps")
+    if not pf or not sf:
+        return t
+    return round(t * sf) / pf
+
+def proxy_events(events, log_fn=None):
+    """
+    EDL 이벤트의 infile/in_start/in_end를 프록시 기준으로 바꾼 사본 (draft 렌더용, 원본 EDL은 그대로).
+    프록시가 필요 없는 소스는 원본 그대로 사용.
+    """
+    metas = {}
+    for f in sorted(set(ev["infile"] for ev in events)):
+        try:
+            metas[f] = get_proxy(f, log_fn=log_fn)
+        except Exception as e:
+            if log_fn:
+                log_fn(f"Proxy failed for {f}: {e}; draft uses the original")
+            metas[f] = None
+    out = []
+    for ev in events:
+        meta = metas[ev["infile"]]
+        if meta is None:
+            out.append(dict(ev))
+            continue
+        out.append(dict(ev, infile=meta["proxy"], in_start=to_proxy(ev["in_start"], meta), in_end=to_proxy(ev["in_end"], meta)))
+    return out
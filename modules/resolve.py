@@ -3,10 +3,12 @@
 modules/resolve.py
 - DaVinci Resolve 자동 타임라인 생성 (Resolve Python API)
 - Requires DaVinci Resolve to be installed and DaVinciResolveScript module accessible.
+- Resolve 없이 확인할 때는 modules/resolve_stub.py를 drs로 넘긴다 (호출 횟수/지연 기록)
 """
 from pathlib import Path
 import os
-import json
+from modules import probe
+from modules.edl import load_edl
 
 def _import_resolve_module():
     try:
@@ -26,13 +28,32 @@ def _import_resolve_module():
                 return mod
     raise RuntimeError("DaVinci Resolve scripting module not found. Ensure Resolve is installed and scripting module is available.")
 
-def export_to_resolve_project(edl_path: str, media_folder: Path, log_fn=print):
+def _frame_rate(path, item, fps_cache):
+    # 소스 fps: 로컬 probe 캐시 우선 (Resolve 호출 없이), 실패하면 클립 속성
+    if path not in fps_cache:
+        fps = None
+        try:
+            fps = probe.get_fps(path, default=None)
+        except Exception:
+            pass
+        if not fps and item is not None:
+            try:
+                fps = float(item.GetClipProperty("FPS") or 0) or None
+            except Exception:
+                fps = None
+        fps_cache[path] = fps or 25.0
+    return fps_cache[path]
+
+def export_to_resolve_project(edl_path: str, media_folder: Path, log_fn=print, drs=None):
     """
-    Create a Resolve project and timeline from edl.json.
-    Returns path or project name created.
+    Create a Resolve project and timeline from an EDL (edl.aedl or edl.json).
+    - 고유 소스 파일은 MediaPool.ImportMedia 한 번으로 모두 가져온다
+    - 타임라인은 이벤트별 startFrame/endFrame을 담은 AppendToTimeline 한 번으로 만든다
+    drs: DaVinciResolveScript 모듈 대신 쓸 객체 (예: modules.resolve_stub.StubScriptModule, Resolve 없이 테스트)
+    Returns project name created.
     """
     log_fn("Resolve export: initializing")
-    drs = _import_resolve_module()
+    drs = drs or _import_resolve_module()
     resolve = drs.scriptapp("Resolve")
     pm = resolve.GetProjectManager()
     project_name = f"AutoEdit_{Path(edl_path).stem}"
@@ -40,31 +61,45 @@ def export_to_resolve_project(edl_path: str, media_folder: Path, log_fn=print):
     if not project:
         raise RuntimeError("Failed to create Resolve project")
     log_fn(f"Created Resolve project: {project_name}")
-    # Import media
-    media_storage = resolve.GetMediaStorage()
-    edl = json.load(open(edl_path, "r", encoding="utf-8"))
+    edl = load_edl(edl_path, with_style=False)
     events = edl.get("events", [])
-    media_paths = set([e["infile"] for e in events])
-    for mp in media_paths:
-        log_fn(f"Importing {mp}")
-        media_storage.AddItemToMediaPool(str(Path(mp).resolve()))
-    # create timeline
+    # unique sources in first-use order
+    media_paths = list(dict.fromkeys(str(Path(e["infile"]).resolve()) for e in events))
+    fps_cache = {}
     project.SetSetting("timelineResolutionWidth", "1920")
     project.SetSetting("timelineResolutionHeight", "1080")
-    timeline = project.CreateTimeline(project_name + "_timeline")
-    # append clips to timeline in order: note this uses Resolve API high-level methods
-    # In many Resolve versions, AppendToTimeline may accept clip objects imported in MediaPool
-    med_pool = resolve.GetMediaPool()
-    mp_items = med_pool.GetRootFolder().GetClipList() if hasattr(med_pool.GetRootFolder(), "GetClipList") else []
-    # Simple approach: create timeline and place clips by filename matching
-    for e in events:
-        infile = str(Path(e["infile"]).resolve())
-        # find clip in media pool
+    if media_paths:
+        project.SetSetting("timelineFrameRate", str(_frame_rate(media_paths[0], None, fps_cache)))
+    med_pool = project.GetMediaPool()
+    log_fn(f"Importing {len(media_paths)} media files")
+    items = med_pool.ImportMedia(media_paths) or []
+    by_path = {}
+    for item in items:
         try:
-            media_pool_item = med_pool.ImportMedia([infile])
+            by_path[str(Path(item.GetClipProperty("File Path")).resolve())] = item
         except Exception:
-            log_fn(f"Failed to import media pool item for {infile}")
             continue
+    if len(by_path) < len(items) and len(items) == len(media_paths):
+        # 파일 경로 속성을 못 읽으면 가져온 순서대로 대응
+        by_path = dict(zip(media_paths, items))
+    missing = [mp for mp in media_paths if mp not in by_path]
+    for mp in missing:
+        log_fn(f"Failed to import media pool item for {mp}")
+    timeline = med_pool.CreateEmptyTimeline(project_name + "_timeline")
+    if not timeline:
+        raise RuntimeError("Failed to create Resolve timeline")
+    clip_infos = []
+    for e in events:
+        infile = str(Path(e["infile"]).resolve())
+        item = by_path.get(infile)
+        if item is None:
+            continue
+        fps = _frame_rate(infile, item, fps_cache)
+        start = int(round(float(e["in_start"]) * fps))
+        end = max(start, int(round(float(e["in_end"]) * fps)) - 1)
+        clip_infos.append({"mediaPoolItem": item, "startFrame": start, "endFrame": end})
+    appended = med_pool.AppendToTimeline(clip_infos) if clip_infos else []
+    log_fn(f"Timeline: appended {len(appended or [])}/{len(events)} events")
     # Save project
     pm.SaveProject()
     log_fn("Resolve project saved")
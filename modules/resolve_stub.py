@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+modules/resolve_stub.py
+- DaVinciResolveScript API의 로컬 대용품 (Resolve 설치 없이 export_to_resolve_project 확인용)
+- export가 쓰는 메서드만 구현: scriptapp / GetProjectManager / CreateProject / SaveProject / SetSetting /
+  GetMediaPool / ImportMedia / CreateEmptyTimeline / AppendToTimeline / GetClipProperty / GetMediaStorage
+- 모든 API 호출 횟수를 calls에 기록하고, latency(초)만큼 지연시켜 Resolve IPC 왕복 비용을 흉내낸다
+usage:
+  stub = StubScriptModule(latency=0.005)
+  export_to_resolve_project("edl.aedl", Path("."), drs=stub)
+  stub.calls["ImportMedia"], stub.timeline.items
+"""
+from collections import Counter
+from pathlib import Path
+import time
+
+class _Api:
+    def __init__(self, module):
+        self._module = module
+
+    def _call(self, name):
+        self._module.calls[name] += 1
+        if self._module.latency:
+            time.sleep(self._module.latency)
+
+class StubMediaPoolItem(_Api):
+    def __init__(self, module, path):
+        super().__init__(module)
+        self.path = path
+
+    def GetClipProperty(self, key=None):
+        self._call("GetClipProperty")
+        props = {"File Path": self.path, "FPS": str(self._module.clip_fps), "Clip Name": Path(self.path).name}
+        return props.get(key) if key else props
+
+class StubTimeline(_Api):
+    def __init__(self, module, name):
+        super().__init__(module)
+        self.name = name
+        self.items = []     # [{"path", "startFrame", "endFrame"}]
+
+    def GetName(self):
+        self._call("GetName")
+        return self.name
+
+    def GetItemListInTrack(self, track_type="video", index=1):
+        self._call("GetItemListInTrack")
+        return list(self.items)
+
+class StubMediaPool(_Api):
+    def __init__(self, module):
+        super().__init__(module)
+        self.items = {}
+
+    def ImportMedia(self, paths):
+        self._call("ImportMedia")
+        out = []
+        for p in paths:
+            if not Path(p).exists() and not self._module.allow_missing:
+                continue
+            item = self.items.get(p) or StubMediaPoolItem(self._module, p)
+            self.items[p] = item
+            out.append(item)
+        return out
+
+    def CreateEmptyTimeline(self, name):
+        self._call("CreateEmptyTimeline")
+        self._module.timeline = StubTimeline(self._module, name)
+        return self._module.timeline
+
+    def AppendToTimeline(self, clips):
+        self._call("AppendToTimeline")
+        timeline = self._module.timeline
+        out = []
+        for c in clips:
+            if isinstance(c, dict):
+                rec = {"path": c["mediaPoolItem"].path, "startFrame": c.get("startFrame"), "endFrame": c.get("endFrame")}
+            else:
+                rec = {"path": c.path, "startFrame": None, "endFrame": None}
+            timeline.items.append(rec)
+            out.append(rec)
+        return out
+
+    def GetRootFolder(self):
+        self._call("GetRootFolder")
+        return None
+
+class StubProject(_Api):
+    def __init__(self, module, name):
+        super().__init__(module)
+        self.name = name
+        self.settings = {}
+        self.media_pool = StubMediaPool(module)
+
+    def SetSetting(self, key, value):
+        self._call("SetSetting")
+        self.settings[key] = value
+        return True
+
+    def GetMediaPool(self):
+        self._call("GetMediaPool")
+        return self.media_pool
+
+class StubProjectManager(_Api):
+    def CreateProject(self, name):
+        self._call("CreateProject")
+        self._module.project = StubProject(self._module, name)
+        return self._module.project
+
+    def SaveProject(self):
+        self._call("SaveProject")
+        return True
+
+class StubMediaStorage(_Api):
+    def AddItemToMediaPool(self, *paths):
+        self._call("AddItemToMediaPool")
+        return [StubMediaPoolItem(self._module, p) for p in paths]
+
+class StubResolve(_Api):
+    def GetProjectManager(self):
+        self._call("GetProjectManager")
+        return StubProjectManager(self._module)
+
+    def GetMediaStorage(self):
+        self._call("GetMediaStorage")
+        return StubMediaStorage(self._module)
+
+class StubScriptModule:
+    """
+    DaVinciResolveScript 모듈 자리에 넘기는 객체.
+    latency: API 호출 1회당 지연(초), clip_fps: GetClipProperty("FPS") 값,
+    allow_missing: 디스크에 없는 경로도 가져온 것으로 처리
+    """
+    def __init__(self, latency=0.0, clip_fps=25.0, allow_missing=True):
+        self.latency = latency
+        self.clip_fps = clip_fps
+        self.allow_missing = allow_missing
+        self.calls = Counter()
+        self.project = None
+        self.timeline = None
+
+    def scriptapp(self, name):
+        self.calls["scriptapp"] += 1
+        return StubResolve(self)
+
+    def total_calls(self):
+        return sum(self.calls.values())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+modules/segments.py
+- 트림된 파트(이벤트 1개 = part mp4) 캐시: cache/segments/<key>.mp4, 용량 상한(LRU 제거)
+- 키 = sha1(소스 경로/크기/mtime, in/out 시각, 인코더 설정, 트림 모드, 강제 키프레임 위치)
+  -> 스타일을 조금 바꿔 다시 렌더하면 바뀐 이벤트만 인코딩하고 나머지는 캐시에서 가져온다
+- 캐시 항목은 작업 폴더(parts/)에 하드링크(안 되면 복사)로 꺼내므로 렌더 도중 LRU 제거와 무관
+  (파트와 캐시 항목이 inode를 공유하므로 파트 경로에 새로 인코딩할 때는 먼저 unlink해야 함: editor._trim_parts)
+"""
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+from modules import cache
+
+SEGMENT_VERSION = 2
+SEGMENT_MAX_BYTES = int(float(os.environ.get("AUTO_EDIT_SEGMENT_MB", 8192)) * 1024 * 1024)
+
+def segment_key(ev, encoder, mode="encode", keys=None) -> str:
+    """
+    ev: EDL 이벤트 (infile, in_start, in_end), encoder: 인코더 인자 목록 (예: editor.TRIM_ENCODER),
+    mode: 트림 모드 ("encode" / "smart"), keys: 파트 안의 강제 키프레임 시각
+    """
+    src = Path(ev["infile"]).resolve()
+    st = src.stat()
+    raw = {
+        "v": SEGMENT_VERSION, "src": str(src), "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+        "in": round(float(ev["in_start"]), 6), "out": round(float(ev["in_end"]), 6),
+        "enc": list(encoder), "mode": mode, "keys": [round(float(k), 6) for k in keys or []]
+    }
+    return hashlib.sha1(json.dumps(raw, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _link_or_copy(src: Path, dst: Path):
+    tmp = dst.parent / f".tmp_{dst.name}"
+    try:
+        tmp.unlink()
+    except OSError:
+        pass
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+def fetch(key, out_file) -> bool:
+    """캐시에 key가 있으면 out_file로 꺼내고 True."""
+    entry = cache.cache_dir("segments") / f"{key}.mp4"
+    if not entry.exists():
+        return False
+    try:
+        _link_or_copy(entry, Path(out_file))
+    except OSError:
+        return False
+    cache.touch(entry)
+    return True
+
+def store(key, part_file):
+    """완성된 파트를 캐시에 넣는다 (실패해도 렌더에는 영향 없음)."""
+    entry = cache.cache_dir("segments") / f"{key}.mp4"
+    try:
+        _link_or_copy(Path(part_file), entry)
+        cache.touch(entry)
+    except OSError:
+        pass
+
+def evict(max_bytes=SEGMENT_MAX_BYTES, log_fn=None):
+    return cache.evict_lru(cache.cache_dir("segments"), max_bytes, log_fn=log_fn)
@@ -2,12 +2,191 @@
 """
 modules/style.py
 - style_profile 입출력 및 style 패키지 저장
+- 스타일 통계는 병합 가능한 요약으로 저장 (count / sum / sumsq / min / max + 고정 구간 히스토그램, 빈 구간은 생략)
+  -> 소스가 몇 개든 style.json 크기가 일정하고, 저장된 스타일 두 개를 재분석 없이 합칠 수 있다 (merge_styles)
+- 이전 형식(profiles 전체 포함) 스타일은 load_style / merge_styles에서 자동 변환 (upgrade_style)
 """
 from pathlib import Path
 import json
+import math
 import shutil
 import uuid
 
+STYLE_VERSION = 2
+# 지표별 히스토그램 구간 (lo, hi, bins). 구간이 같아야 병합할 수 있으므로 바꾸면 STYLE_VERSION도 올린다
+STAT_SPECS = {
+    "cut_length": (0.0, 30.0, 300),       # 모든 씬 길이(초)
+    "avg_cut_length": (0.0, 30.0, 300),   # 소스별 평균 씬 길이(초)
+    "num_scenes": (0.0, 2000.0, 200),     # 소스별 씬 수
+    "dissolves": (0.0, 200.0, 200),       # 소스별 dissolve 수
+    "tempo": (40.0, 240.0, 200),          # 소스별 템포(BPM)
+    "rms_mean": (0.0, 1.0, 200),          # 소스별 RMS 평균
+    "rms_std": (0.0, 1.0, 200),           # 소스별 RMS 표준편차
+}
+
+def new_stat(name):
+    lo, hi, bins = STAT_SPECS[name]
+    return {"count": 0, "sum": 0.0, "sumsq": 0.0, "min": None, "max": None,
+            "hist": {"lo": lo, "hi": hi, "bins": bins, "counts": {}, "under": 0, "over": 0}}
+
+def stat_add(stat, value):
+    v = float(value)
+    if not math.isfinite(v):
+        return stat
+    stat["count"] += 1
+    stat["sum"] += v
+    stat["sumsq"] += v * v
+    stat["min"] = v if stat["min"] is None else min(stat["min"], v)
+    stat["max"] = v if stat["max"] is None else max(stat["max"], v)
+    h = stat["hist"]
+    if v < h["lo"]:
+        h["under"] += 1
+    elif v >= h["hi"]:
+        h["over"] += 1
+    else:
+        # counts: {"구간 번호": 개수} (JSON 키는 문자열)
+        i = str(min(h["bins"] - 1, int((v - h["lo"]) / (h["hi"] - h["lo"]) * h["bins"])))
+        h["counts"][i] = h["counts"].get(i, 0) + 1
+    return stat
+
+def stat_merge(a, b):
+    """두 요약의 합 (새 dict). 히스토그램 구간이 다르면 ValueError."""
+    ha, hb = a["hist"], b["hist"]
+    if (ha["lo"], ha["hi"], ha["bins"]) != (hb["lo"], hb["hi"], hb["bins"]):
+        raise ValueError("cannot merge statistics with different histogram bins")
+    counts = dict(ha["counts"])
+    for i, c in hb["counts"].items():
+        counts[i] = counts.get(i, 0) + c
+    mins = [m for m in (a["min"], b["min"]) if m is not None]
+    maxs = [m for m in (a["max"], b["max"]) if m is not None]
+    return {
+        "count": a["count"] + b["count"], "sum": a["sum"] + b["sum"], "sumsq": a["sumsq"] + b["sumsq"],
+        "min": min(mins) if mins else None, "max": max(maxs) if maxs else None,
+        "hist": {"lo": ha["lo"], "hi": ha["hi"], "bins": ha["bins"], "counts": counts,
+                 "under": ha["under"] + hb["under"], "over": ha["over"] + hb["over"]}
+    }
+
+def stat_mean(stat):
+    return stat["sum"] / stat["count"] if stat and stat["count"] else None
+
+def stat_std(stat):
+    if not stat or not stat["count"]:
+        return None
+    m = stat["sum"] / stat["count"]
+    return math.sqrt(max(0.0, stat["sumsq"] / stat["count"] - m * m))
+
+def _rank_value(stat, j):
+    # 정렬했을 때 j번째(0부터) 값의 근사: 처음/끝은 정확한 min/max, 구간 밖은 min/max, 나머지는 구간 중심
+    n, h = stat["count"], stat["hist"]
+    if j <= 0 or j < h["under"]:
+        return stat["min"]
+    if j >= n - 1 or j >= n - h["over"]:
+        return stat["max"]
+    width = (h["hi"] - h["lo"]) / h["bins"]
+    acc = h["under"]
+    for i, c in sorted((int(k), c) for k, c in h["counts"].items()):
+        acc += c
+        if j < acc:
+            return min(max(h["lo"] + width * (i + 0.5), stat["min"]), stat["max"])
+    return stat["max"]
+
+def stat_quantile(stat, q):
+    """
+    히스토그램으로 근사한 q 분위수. statistics.median / numpy.quantile(기본 linear)과 같은 mid-rank 방식:
+    순위 q*(n-1)의 앞뒤 값을 선형 보간하고, 각 값은 구간 중심(처음/끝 값은 정확한 min/max)으로 본다.
+    오차 <= 구간 폭의 절반. 구간 밖 값은 min / max 쪽으로 붙인다.
+    """
+    if not stat or not stat["count"]:
+        return None
+    rank = min(max(q, 0.0), 1.0) * (stat["count"] - 1)
+    j = int(math.floor(rank))
+    lo = _rank_value(stat, j)
+    frac = rank - j
+    if not frac:
+        return lo
+    return lo + frac * (_rank_value(stat, j + 1) - lo)
+
+def _derive(style):
+    # 편집기가 읽는 대표값 (이전 형식과 같은 키)
+    stats = style["stats"]
+    style["mean_avg_cut_length"] = stat_mean(stats["avg_cut_length"]) or 3.0
+    style["median_avg_cut_length"] = stat_quantile(stats["avg_cut_length"], 0.5) or 3.0
+    style["tempo_median"] = stat_quantile(stats["tempo"], 0.5)
+    style["cut_length_mean"] = stat_mean(stats["cut_length"])
+    style["cut_length_std"] = stat_std(stats["cut_length"])
+    return style
+
+def empty_style():
+    return {"style_version": STYLE_VERSION, "source_count": 0, "stats": {k: new_stat(k) for k in STAT_SPECS}}
+
+def add_profile(style, profile):
+    """analyzer profile 1개를 스타일 요약에 더한다 (씬 목록 등 원본 데이터는 저장하지 않음)."""
+    stats = style["stats"]
+    style["source_count"] += 1
+    for c in profile.get("cut_lengths") or []:
+        stat_add(stats["cut_length"], c)
+    if profile.get("avg_cut_length"):
+        stat_add(stats["avg_cut_length"], profile["avg_cut_length"])
+    if not profile.get("errors") or profile.get("scenes"):
+        stat_add(stats["num_scenes"], profile.get("num_scenes") or 0)
+        stat_add(stats["dissolves"], sum(1 for t in profile.get("transitions") or [] if t.get("type") == "dissolve"))
+    audio = profile.get("audio") or {}
+    for k in ("tempo", "rms_mean", "rms_std"):
+        if audio.get(k):
+            stat_add(stats[k], audio[k])
+    return style
+
+def style_from_profiles(profiles):
+    style = empty_style()
+    for p in profiles:
+        add_profile(style, p)
+    return _derive(style)
+
+def upgrade_style(style):
+    """
+    이전 형식 스타일(profiles 포함 또는 대표값만)을 요약 통계 형식으로 변환한 사본. 이미 새 형식이면 그대로 반환.
+    profiles가 없으면 대표값(mean_avg_cut_length, tempo_median)을 source_count번 관측한 것으로 근사한다 ("approximate": true).
+    """
+    if style.get("stats"):
+        return style
+    extra = {k: v for k, v in style.items() if k not in ("profiles", "source_count", "mean_avg_cut_length",
+                                                          "median_avg_cut_length", "tempo_median")}
+    if style.get("profiles") is not None:
+        out = style_from_profiles(style["profiles"])
+    else:
+        out = empty_style()
+        n = int(style.get("source_count") or 0)
+        out["source_count"] = n
+        for _ in range(n):
+            if style.get("mean_avg_cut_length"):
+                stat_add(out["stats"]["avg_cut_length"], style["mean_avg_cut_length"])
+            if style.get("tempo_median"):
+                stat_add(out["stats"]["tempo"], style["tempo_median"])
+        out = _derive(out)
+        out["approximate"] = True
+    extra.update(out)
+    return extra
+
+def merge_styles(styles, name=None):
+    """
+    저장된 스타일 여러 개를 재분석 없이 합친다 (요약 통계끼리 더함, 이전 형식은 먼저 upgrade_style).
+    결과의 대표값(mean/median/tempo_median)은 합친 통계에서 다시 계산한다.
+    """
+    styles = [upgrade_style(s) for s in styles]
+    if not styles:
+        raise ValueError("no styles to merge")
+    out = empty_style()
+    for s in styles:
+        out["source_count"] += int(s.get("source_count") or 0)
+        for k, stat in s["stats"].items():
+            out["stats"][k] = stat_merge(out["stats"][k], stat) if k in out["stats"] else stat
+        if s.get("approximate"):
+            out["approximate"] = True
+    out["merged_from"] = [s.get("name") for s in styles]
+    if name:
+        out["name"] = name
+    return _derive(out)
+
 def save_style_package(style_dict, target_folder: Path):
     # Create folder named by style name or uuid
     target_folder = Path(target_folder)
@@ -25,8 +204,23 @@ def save_style_package(style_dict, target_folder: Path):
     (base / "assets").mkdir(exist_ok=True)
     return str(base)
 
+def save_preview_assets(style_pkg_path, preview):
+    # copy preview assets (histogram, thumbnails, srt) into package assets
+    assets_dir = Path(style_pkg_path) / "assets"
+    assets_dir.mkdir(exist_ok=True)
+    hist_png = preview.get("histogram_png")
+    if hist_png:
+        shutil.copy(hist_png, assets_dir / Path(hist_png).name)
+    for t in preview.get("thumbs", []):
+        shutil.copy(t["thumb"], assets_dir / Path(t["thumb"]).name)
+    srt = preview.get("srt_path")
+    if srt:
+        shutil.copy(srt, assets_dir / Path(srt).name)
+    return str(assets_dir)
+
 def load_style(path):
+    # 이전 형식(profiles 전체 포함) 파일도 요약 통계 형식으로 변환해 반환 (파일은 그대로 둔다)
     p = Path(path)
     if not p.exists():
         raise FileNotFoundError(path)
-    return json.load(open(p, "r", encoding="utf-8"))
+    return upgrade_style(json.load(open(p, "r", encoding="utf-8")))
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+modules/trace.py
+- 파이프라인 단계별 계측: wall/CPU 시간, RSS(단계 시작/끝 차이, 프로세스 최대 RSS), 자식 프로세스(ffmpeg 등) CPU 시간
+  ru_maxrss는 프로세스 전체의 최댓값이라 단계별 값이 아니다: process_peak_rss_mb로 기록하고,
+  단계별로는 현재 RSS 차이(rss_delta_mb, Linux)와 이 단계에서 최댓값이 늘어난 양(peak_growth_mb)을 기록
+- stage() 컨텍스트 / traced() 데코레이터로 단계 기록, run()으로 한 번의 실행을 묶어 저장
+- 출력: Chrome trace / Perfetto JSON(trace.json) + 단계별 요약 표(trace_summary.txt)
+- 프로세스 풀 워커의 기록은 drain()으로 돌려받아 부모에서 merge()
+- 기본은 꺼져 있음: run(enabled=True) 또는 환경변수 AUTO_EDIT_TRACE=1
+"""
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: RSS/자식 CPU 시간은 기록하지 않음
+    resource = None
+
+_lock = threading.Lock()
+_events = []
+_active = False
+_local = threading.local()
+
+def env_enabled():
+    return os.environ.get("AUTO_EDIT_TRACE", "").lower() in ("1", "true", "yes")
+
+def enable(flag=True):
+    global _active
+    _active = bool(flag)
+
+def active():
+    return _active
+
+def _rss_mb(ru):
+    # ru_maxrss: Linux는 KB, macOS는 bytes
+    return ru.ru_maxrss / (1024.0 * 1024.0) if sys.platform == "darwin" else ru.ru_maxrss / 1024.0
+
+_PAGE_MB = os.sysconf("SC_PAGE_SIZE") / (1024.0 * 1024.0) if hasattr(os, "sysconf") else None
+
+def _current_rss_mb():
+    # 현재 RSS (최댓값 아님): Linux /proc만 지원, 없으면 None
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE_MB
+    except (OSError, ValueError, IndexError, TypeError):
+        return None
+
+def _snapshot(children):
+    snap = {"wall": time.perf_counter(), "cpu": time.process_time()}
+    cur = _current_rss_mb()
+    if cur is not None:
+        snap["cur_rss_mb"] = cur
+    if resource is not None:
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        snap["rss_mb"] = _rss_mb(own)
+        if children:
+            kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+            snap["child_cpu"] = kids.ru_utime + kids.ru_stime
+            snap["child_rss_mb"] = _rss_mb(kids)
+    return snap
+
+@contextmanager
+def stage(name, cat="pipeline", children=True, **args):
+    """
+    단계 하나를 기록. children=False: 자식 프로세스 CPU 시간을 이 단계에 넣지 않음
+    (여러 스레드가 동시에 ffmpeg를 기다리는 경우, 자식 시간은 상위 단계에서 합산).
+    """
+    if not _active:
+        yield
+        return
+    depth = getattr(_local, "depth", 0)
+    _local.depth = depth + 1
+    ts = time.time()
+    before = _snapshot(children)
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _local.depth = depth
+        after = _snapshot(children)
+        rec = {
+            "name": name, "cat": cat, "ph": "X",
+            "ts": int(ts * 1e6), "dur": int((after["wall"] - before["wall"]) * 1e6),
+            "pid": os.getpid(), "tid": threading.get_native_id() if hasattr(threading, "get_native_id") else threading.get_ident(),
+            "args": dict(args, depth=depth, wall_s=round(after["wall"] - before["wall"], 4),
+                         cpu_s=round(after["cpu"] - before["cpu"], 4))
+        }
+        if "cur_rss_mb" in after:
+            rec["args"]["rss_delta_mb"] = round(after["cur_rss_mb"] - before["cur_rss_mb"], 1)
+        if "rss_mb" in after:
+            rec["args"]["peak_growth_mb"] = round(after["rss_mb"] - before["rss_mb"], 1)
+            rec["args"]["process_peak_rss_mb"] = round(after["rss_mb"], 1)
+        if "child_cpu" in after:
+            rec["args"]["child_cpu_s"] = round(after["child_cpu"] - before["child_cpu"], 4)
+            # RUSAGE_CHILDREN의 ru_maxrss는 지금까지 끝난 자식 중 가장 큰 프로세스 하나의 값
+            rec["args"]["child_process_peak_rss_mb"] = round(after["child_rss_mb"], 1)
+        if error:
+            rec["args"]["error"] = error
+        with _lock:
+            _events.append(rec)
+
+def traced(name, cat="pipeline", children=True):
+    """함수 전체를 stage(name)으로 기록하는 데코레이터."""
+    def deco(fn):
+        @wraps(fn)
+        def wrapper(*a, **kw):
+            if not _active:
+                return fn(*a, **kw)
+            with stage(name, cat=cat, children=children):
+                return fn(*a, **kw)
+        return wrapper
+    return deco
+
+def drain():
+    """지금까지 기록된 이벤트를 꺼내고 비운다 (워커 -> 부모 전달용)."""
+    with _lock:
+        out = list(_events)
+        _events.clear()
+    return out
+
+def merge(events):
+    if not _active or not events:
+        return
+    with _lock:
+        _events.extend(events)
+
+def summarize(events):
+    """
+    단계 이름별 집계. 중첩된 같은 이름은 각각 더해진다.
+    return: [{"stage", "count", "wall_s", "cpu_s", "child_cpu_s", "rss_delta_mb", "peak_growth_mb",
+              "process_peak_rss_mb", "errors"}] (wall_s 내림차순)
+    rss_delta_mb / peak_growth_mb는 한 번 실행의 최댓값, process_peak_rss_mb는 단계 종료 시점 프로세스 최대 RSS의 최댓값.
+    """
+    rows = {}
+    for ev in events:
+        a = ev.get("args", {})
+        r = rows.setdefault(ev["name"], {"stage": ev["name"], "count": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                                         "child_cpu_s": 0.0, "rss_delta_mb": 0.0, "peak_growth_mb": 0.0,
+                                         "process_peak_rss_mb": 0.0, "errors": 0})
+        r["count"] += 1
+        r["wall_s"] += a.get("wall_s", 0.0)
+        r["cpu_s"] += a.get("cpu_s", 0.0)
+        r["child_cpu_s"] += a.get("child_cpu_s", 0.0)
+        r["rss_delta_mb"] = max(r["rss_delta_mb"], a.get("rss_delta_mb", 0.0))
+        r["peak_growth_mb"] = max(r["peak_growth_mb"], a.get("peak_growth_mb", 0.0))
+        r["process_peak_rss_mb"] = max(r["process_peak_rss_mb"], a.get("process_peak_rss_mb", 0.0),
+                                       a.get("child_process_peak_rss_mb", 0.0))
+        r["errors"] += 1 if a.get("error") else 0
+    return sorted(rows.values(), key=lambda r: r["wall_s"], reverse=True)
+
+def format_summary(rows):
+    lines = [f"{'stage':<22}{'count':>6}{'wall s':>10}{'cpu s':>10}{'child s':>10}{'rss +MB':>10}{'peak +MB':>10}"
+             f"{'proc peak':>10}{'err':>5}"]
+    for r in rows:
+        lines.append(f"{r['stage']:<22}{r['count']:>6}{r['wall_s']:>10.2f}{r['cpu_s']:>10.2f}"
+                     f"{r['child_cpu_s']:>10.2f}{r['rss_delta_mb']:>10.1f}{r['peak_growth_mb']:>10.1f}"
+                     f"{r['process_peak_rss_mb']:>10.1f}{r['errors']:>5}")
+    return "\n".join(lines)
+
+def export_chrome(path, events, meta=None):
+    """Chrome trace(chrome://tracing) / Perfetto(ui.perfetto.dev)에서 열 수 있는 JSON."""
+    names = []
+    for pid in sorted({ev["pid"] for ev in events}):
+        label = "main" if pid == os.getpid() else f"worker {pid}"
+        names.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": label}})
+    data = {"traceEvents": names + sorted(events, key=lambda ev: ev["ts"]), "displayTimeUnit": "ms",
+            "metadata": meta or {}}
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, ensure_ascii=False)
+    return str(path)
+
+@contextmanager
+def run(name, out_dir=None, log_fn=None, enabled=None, **args):
+    """
+    실행 하나를 계측. enabled=None이면 AUTO_EDIT_TRACE 환경변수를 따른다.
+    이미 계측 중이면(예: 배치 작업 안의 렌더) 단계 하나로만 기록하고 저장은 바깥 run()이 한다.
+    끝나면 out_dir에 trace.json / trace_summary.txt를 쓰고 요약 표를 log_fn으로 출력.
+    yield: 결과 dict (종료 후 "trace", "summary" 경로가 채워짐; 계측하지 않으면 빈 dict)
+    """
+    info = {}
+    enabled = env_enabled() if enabled is None else enabled
+    if _active or not enabled:
+        with stage(name, **args):
+            yield info
+        return
+    drain()
+    enable(True)
+    try:
+        with stage(name, **args):
+            yield info
+    finally:
+        enable(False)
+        events = drain()
+        rows = summarize(events)
+        if out_dir is not None:
+            out_dir = Path(out_dir)
+            out_dir.mkdir(parents=True, exist_ok=True)
+            info["trace"] = export_chrome(out_dir / "trace.json", events, meta={"run": name, **args})
+            summary_path = out_dir / "trace_summary.txt"
+            summary_path.write_text(format_summary(rows) + "\n", encoding="utf-8")
+            info["summary"] = str(summary_path)
+        info["rows"] = rows
+        if log_fn:
+            log_fn(f"Trace summary ({name}):\n{format_summary(rows)}")
+            if info.get("trace"):
+                log_fn(f"Trace written: {info['trace']}")
@@ -3,6 +3,7 @@
 modules/whisper_integration.py
 - openai/whisper 기반 간단 자막 추출기
 - 출력: SRT 파일 (path)
+- 로드된 모델은 모델 이름별로 메모리에 유지 (idle timeout / 메모리 상한 초과 시 해제)
 Note: requires 'openai-whisper' (pip) and torch backend installed.
 """
 from pathlib import Path
@@ -11,24 +12,161 @@ import tempfile
 import srt
 import datetime
 import os
+import gc
+import threading
+import time
+from modules import trace
 
+# 마지막 사용 후 이 시간(초)이 지나면 모델을 해제
+MODEL_IDLE_TIMEOUT = float(os.environ.get("AUTO_EDIT_WHISPER_IDLE_SEC", 300))
+# 동시에 메모리에 둘 모델 가중치 총량 상한 (bytes)
+MODEL_MEMORY_LIMIT = int(float(os.environ.get("AUTO_EDIT_WHISPER_MEM_MB", 4096)) * 1024 * 1024)
+
+_models = {}            # model_name -> {"model", "bytes", "last_used", "in_use"}
+_loading = {}           # model_name -> threading.Event (로드 중인 모델, 같은 모델을 기다리는 스레드는 이 이벤트를 기다린다)
+_reserved = {}          # model_name -> 로드 중인 모델의 예상 크기 (메모리 상한 계산에 포함)
+_models_lock = threading.RLock()
+_janitor = None
+# 로드 전 메모리 확보용 예상 크기 (whisper 모델 파라미터 수 x fp32)
+_MODEL_PARAMS = {
+    "tiny": 39e6, "tiny.en": 39e6, "base": 74e6, "base.en": 74e6, "small": 244e6, "small.en": 244e6,
+    "medium": 769e6, "medium.en": 769e6, "large": 1550e6, "large-v1": 1550e6, "large-v2": 1550e6, "large-v3": 1550e6,
+    "turbo": 809e6, "large-v3-turbo": 809e6
+}
+
+def _model_bytes(model):
+    try:
+        return int(sum(p.numel() * p.element_size() for p in model.parameters()))
+    except Exception:
+        return 0
+
+def _free_memory():
+    gc.collect()
+    try:
+        import torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+    except Exception:
+        pass
+
+def release_idle_models(idle_timeout=None):
+    idle_timeout = MODEL_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+    now = time.monotonic()
+    with _models_lock:
+        idle = [n for n, e in _models.items() if e["in_use"] == 0 and now - e["last_used"] >= idle_timeout]
+        for name in idle:
+            del _models[name]
+    if idle:
+        _free_memory()
+    return idle
+
+def _janitor_tick():
+    global _janitor
+    release_idle_models()
+    with _models_lock:
+        _janitor = None
+        if _models:
+            _schedule_janitor()
+
+def _schedule_janitor():
+    global _janitor
+    with _models_lock:
+        if _janitor is None:
+            _janitor = threading.Timer(max(1.0, MODEL_IDLE_TIMEOUT / 2.0), _janitor_tick)
+            _janitor.daemon = True
+            _janitor.start()
+
+def _estimated_bytes(model_name):
+    return int(_MODEL_PARAMS.get(model_name, 0) * 4)
+
+def _evict_for(size, keep, progress_callback=print):
+    """
+    로드 중인 모델의 예상 크기까지 합쳐 size만큼 더 들어가도록 오래 안 쓴 모델부터 해제 (사용 중인 모델은 유지).
+    """
+    with _models_lock:
+        total = sum(e["bytes"] for n, e in _models.items() if n != keep)
+        total += sum(b for n, b in _reserved.items() if n != keep)
+        freed = False
+        for name, e in sorted(_models.items(), key=lambda kv: kv[1]["last_used"]):
+            if total + size <= MODEL_MEMORY_LIMIT:
+                break
+            if name != keep and e["in_use"] == 0:
+                del _models[name]
+                total -= e["bytes"]
+                freed = True
+                progress_callback(f"Whisper: released model {name} (memory limit)")
+    if freed:
+        _free_memory()
+
+def _acquire_model(model_name, progress_callback=print):
+    """
+    로드된 모델을 빌려 온다 (사용 후 _release_model). 로드는 레지스트리 잠금 밖에서 하므로
+    다른 모델을 쓰는 스레드는 기다리지 않고, 같은 모델을 요청한 스레드만 로드 완료를 기다린다.
+    """
+    release_idle_models()
+    while True:
+        with _models_lock:
+            entry = _models.get(model_name)
+            if entry is not None:
+                progress_callback(f"Whisper: using loaded model {model_name}")
+                entry["in_use"] += 1
+                entry["last_used"] = time.monotonic()
+                _schedule_janitor()
+                return entry["model"]
+            loading = _loading.get(model_name)
+            if loading is None:
+                # 이 스레드가 로드한다: 예상 크기를 먼저 예약해 동시에 다른 모델을 로드해도 상한을 넘지 않게
+                loading = _loading[model_name] = threading.Event()
+                _reserved[model_name] = _estimated_bytes(model_name)
+                break
+        # 다른 스레드가 로드 중: 끝나면 다시 확인 (실패했으면 이 스레드가 다시 시도)
+        loading.wait()
+    try:
+        _evict_for(_reserved[model_name], model_name, progress_callback)
+        progress_callback(f"Whisper: loading model {model_name} (may take time)...")
+        try:
+            with trace.stage("whisper_load", model=model_name):
+                model = whisper.load_model(model_name)
+        except Exception as e:
+            progress_callback(f"Whisper model load failed: {e}")
+            raise RuntimeError("Whisper model failed to load. Ensure 'torch' is installed and choose a smaller model if necessary.")
+        size = _model_bytes(model)
+        with _models_lock:
+            _reserved[model_name] = size
+            _models[model_name] = {"model": model, "bytes": size, "last_used": time.monotonic(), "in_use": 1}
+        # 예상 크기가 없던 모델(또는 예상보다 큰 모델)이면 실제 크기로 한 번 더 맞춘다
+        _evict_for(size, model_name, progress_callback)
+        _schedule_janitor()
+        return model
+    finally:
+        with _models_lock:
+            _reserved.pop(model_name, None)
+            _loading.pop(model_name, None)
+        loading.set()
+
+def _release_model(model_name):
+    with _models_lock:
+        entry = _models.get(model_name)
+        if entry:
+            entry["in_use"] = max(0, entry["in_use"] - 1)
+            entry["last_used"] = time.monotonic()
+
+@trace.traced("whisper")
 def transcribe_with_whisper(video_path: Path, model_name="small", progress_callback=print):
     """
     Transcribe using Whisper and write an SRT file next to the video (tmp file).
+    The model stays loaded for later calls (see MODEL_IDLE_TIMEOUT / MODEL_MEMORY_LIMIT).
     Returns path to srt.
     """
-    progress_callback(f"Whisper: loading model {model_name} (may take time)...")
-    try:
-        model = whisper.load_model(model_name)
-    except Exception as e:
-        progress_callback(f"Whisper model load failed: {e}")
-        raise RuntimeError("Whisper model failed to load. Ensure 'torch' is installed and choose a smaller model if necessary.")
+    model = _acquire_model(model_name, progress_callback=progress_callback)
     progress_callback("Whisper: transcribing (this may take long)...")
     try:
         result = model.transcribe(str(video_path), verbose=False)
     except Exception as e:
         progress_callback(f"Whisper transcription failed during transcribe(): {e}")
         raise RuntimeError("Whisper transcription failed during model.transcribe(). Check system resources and model compatibility.")
+    finally:
+        _release_model(model_name)
     segments = result.get("segments", [])
     subtitles = []
     for i, seg in enumerate(segments, start=1):
@@ -43,3 +181,23 @@ def transcribe_with_whisper(video_path: Path, model_name="small", progress_callb
         fh.write(srt_text)
     progress_callback(f"Whisper: wrote SRT to {out_srt}")
     return str(out_srt)
+
+def transcribe_many(video_paths, model_name="small", progress_callback=print):
+    """
+    여러 파일을 같은 (한 번 로드된) 모델로 연달아 전사한다.
+    return: video_paths 순서의 SRT 경로 목록 (실패한 파일은 None)
+    """
+    results = []
+    # 배치 동안 모델을 붙잡아 둔다 (idle timeout으로 해제되지 않도록)
+    _acquire_model(model_name, progress_callback=progress_callback)
+    try:
+        for i, p in enumerate(video_paths, start=1):
+            progress_callback(f"Whisper: [{i}/{len(video_paths)}] {p}")
+            try:
+                results.append(transcribe_with_whisper(p, model_name=model_name, progress_callback=progress_callback))
+            except Exception as e:
+                progress_callback(f"Whisper failed for {p}: {e}")
+                results.append(None)
+    finally:
+        _release_model(model_name)
+    return results
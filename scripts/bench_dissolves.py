@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+detect_dissolves 벤치마크: 순차 읽기/일괄 계산 구현 vs 이전 seek 구현
+Usage:
+  python scripts/bench_dissolves.py path/to/video.mp4 [--window 8] [--repeat 1]
+"""
+import argparse
+import resource
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from modules.analyzer import detect_scenes, detect_dissolves, _detect_dissolves_seek
+
+def _timed(fn, *args, repeat=1, **kwargs):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return result, best
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("video")
+    p.add_argument("--window", type=int, default=8)
+    p.add_argument("--repeat", type=int, default=1)
+    args = p.parse_args()
+    video = Path(args.video)
+    scenes = detect_scenes(video)
+    print(f"scenes: {len(scenes)} ({len(scenes) - 1} boundaries)")
+    new, t_new = _timed(detect_dissolves, video, scenes, window=args.window, repeat=args.repeat)
+    rss_new = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    old, t_old = _timed(_detect_dissolves_seek, video, scenes, window=args.window, repeat=args.repeat)
+    rss_old = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"sequential: {t_new:.2f}s, {len(new)} dissolves, peak RSS so far {rss_new} KB")
+    print(f"seek (old): {t_old:.2f}s, {len(old)} dissolves, peak RSS so far {rss_old} KB")
+    if t_new > 0:
+        print(f"speedup: {t_old / t_new:.1f}x")
+    same = {tuple(t["between"]) for t in new} == {tuple(t["between"]) for t in old}
+    print("same boundaries flagged:", same)
+    if not same:
+        print(" only sequential:", sorted({tuple(t["between"]) for t in new} - {tuple(t["between"]) for t in old}))
+        print(" only seek:", sorted({tuple(t["between"]) for t in old} - {tuple(t["between"]) for t in new}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Resolve export 확인: modules/resolve_stub.py로 Resolve 없이 API 호출 횟수와 소요 시간을 측정
+Usage:
+  python scripts/bench_resolve.py [edl.aedl|edl.json] [--events 500] [--sources 20] [--latency 0.005]
+  (EDL을 주지 않으면 합성 EDL 사용)
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from modules.edl import write_edl, load_edl
+from modules.resolve import export_to_resolve_project
+from modules.resolve_stub import StubScriptModule
+
+def _synthetic_edl(n_events, n_sources, out: Path):
+    events = []
+    t = 0.0
+    for i in range(n_events):
+        start = (i // n_sources) * 3.0
+        events.append({"infile": f"/media/src_{i % n_sources:03d}.mp4", "in_start": start, "in_end": start + 3.0,
+                       "out_start": t, "duration": 3.0, "transition": "cut", "transition_duration": 0.0})
+        t += 3.0
+    write_edl(out, events, style={})
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("edl", nargs="?", default=None)
+    p.add_argument("--events", type=int, default=500)
+    p.add_argument("--sources", type=int, default=20)
+    p.add_argument("--latency", type=float, default=0.005, help="simulated seconds per Resolve API call")
+    args = p.parse_args()
+    edl_path = args.edl
+    if edl_path is None:
+        edl_path = Path(tempfile.mkdtemp(prefix="bench_resolve_")) / "edl.aedl"
+        _synthetic_edl(args.events, args.sources, edl_path)
+    n_events = len(load_edl(edl_path, with_style=False)["events"])
+    stub = StubScriptModule(latency=args.latency)
+    t0 = time.perf_counter()
+    export_to_resolve_project(str(edl_path), Path(edl_path).parent, log_fn=lambda m: None, drs=stub)
+    dt = time.perf_counter() - t0
+    print(f"events: {n_events}, timeline items: {len(stub.timeline.items) if stub.timeline else 0}")
+    print(f"API calls: {stub.total_calls()} total, " + ", ".join(f"{k}={v}" for k, v in sorted(stub.calls.items())))
+    print(f"elapsed: {dt:.3f}s with {args.latency * 1000:.1f} ms/call simulated latency")
+    ok = stub.calls["ImportMedia"] == 1 and stub.calls["AppendToTimeline"] <= 1
+    print("batched import/append:", ok)
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
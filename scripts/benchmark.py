@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+파이프라인 성능 벤치마크 (합성 미디어 사용, 외부 샘플 불필요)
+- ffmpeg lavfi 소스(testsrc2 등 + hue/밝기 변화)로 컷/디졸브 위치, 클릭 트랙 템포(120 BPM), 톤, 길이를 아는 영상을 생성
+- 기본 패턴(약 60초)을 만들고 -stream_loop -c copy로 1분~2시간 길이를 만든다 (생성 결과는 cache/bench에 보관)
+- 측정 단계: detect_scenes, detect_scenes_fast(coarse-to-fine), detect_scenes_sharded(시간 샤드 병렬), detect_dissolves, analyze_audio, _trim_parts, _render_concat, _render_with_transitions
+- 결과(JSON)를 기준 결과와 비교해 허용 비율 이상 느려진 단계가 있으면 종료 코드 1
+- 컷 감지 정확도(정답 대비 precision/recall, fast / sharded는 full 모드와의 프레임 단위 일치율)가 --min-accuracy 미만이어도 종료 코드 1
+Usage:
+  python scripts/benchmark.py --sizes 60,600 --out bench.json
+  python scripts/benchmark.py --full --baseline bench_baseline.json --threshold 0.2
+  python scripts/benchmark.py --sizes 60 --save-baseline bench_baseline.json
+  python scripts/benchmark.py --sizes 600 --stages detect_scenes,detect_scenes_fast --min-accuracy 0.95
+  python scripts/benchmark.py --sizes 1800 --stages detect_scenes,detect_scenes_sharded --scene-workers 8 --min-accuracy 0.95
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from modules import cache
+from modules.analyzer import detect_scenes, detect_scenes_sharded, detect_dissolves, analyze_audio
+from modules.editor import _trim_parts, _render_concat, _render_with_transitions
+
+BENCH_VERSION = 1
+FULL_SIZES = [60, 600, 1800, 7200]
+STAGES = ["detect_scenes", "detect_scenes_fast", "detect_scenes_sharded", "detect_dissolves", "analyze_audio", "trim_parts", "render_concat", "render_transitions"]
+
+# 기본 패턴: (lavfi 소스, hue 회전, 밝기) 세그먼트를 순서대로 잇고, DISSOLVE_EVERY번째 경계마다 디졸브
+PATTERN = [
+    ("testsrc2", 0, 0), ("smptehdbars", 0, 0), ("rgbtestsrc", 0, -2), ("mandelbrot", 0, 0),
+    ("testsrc2", 180, 2), ("yuvtestsrc", 0, 0), ("pal100bars", 0, -2), ("testsrc2", 90, -4),
+    ("smptehdbars", 120, 2), ("mandelbrot", 200, 3), ("rgbtestsrc", 240, 0), ("yuvtestsrc", 60, -3),
+]
+SEGMENT_S = 5.0
+DISSOLVE_EVERY = 3
+DISSOLVE_S = 1.0
+FPS = 25
+SIZE = "640x360"
+BPM = 120
+SR = 22050
+
+def _run(cmd):
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+def _ffmpeg_version():
+    try:
+        out = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True).stdout
+        return out.splitlines()[0] if out else None
+    except OSError:
+        return None
+
+def _base_timeline():
+    """
+    기본 패턴의 길이와 정답 타임라인. cuts: 컷 시각(초), dissolves: [시작, 끝]
+    """
+    cuts, dissolves = [], []
+    length = SEGMENT_S
+    for i in range(1, len(PATTERN)):
+        if i % DISSOLVE_EVERY == 0:
+            dissolves.append([length - DISSOLVE_S, length])
+            length += SEGMENT_S - DISSOLVE_S
+        else:
+            cuts.append(length)
+            length += SEGMENT_S
+    return length, cuts, dissolves
+
+def _make_base(out: Path):
+    length, _, _ = _base_timeline()
+    cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
+    for src, _, _ in PATTERN:
+        cmd += ["-f", "lavfi", "-i", f"{src}=size={SIZE}:rate={FPS}:duration={SEGMENT_S}"]
+    # 120 BPM 클릭(880Hz, 지수 감쇠) + 220Hz 배경 톤
+    beat = 60.0 / BPM
+    cmd += ["-f", "lavfi", "-i",
+            f"aevalsrc='0.1*sin(2*PI*220*t)+0.8*sin(2*PI*880*t)*exp(-40*mod(t\\,{beat}))':s={SR}:d={length}"]
+    filters = []
+    for i, (_, hue, bright) in enumerate(PATTERN):
+        filters.append(f"[{i}:v]format=yuv420p,hue=h={hue}:b={bright},setsar=1,settb=1/{FPS}[s{i}]")
+    acc, acc_len = "[s0]", SEGMENT_S
+    for i in range(1, len(PATTERN)):
+        out_label = f"[j{i}]"
+        if i % DISSOLVE_EVERY == 0:
+            filters.append(f"{acc}[s{i}]xfade=transition=fade:duration={DISSOLVE_S}:offset={acc_len - DISSOLVE_S}{out_label}")
+            acc_len += SEGMENT_S - DISSOLVE_S
+        else:
+            filters.append(f"{acc}[s{i}]concat=n=2:v=1:a=0{out_label}")
+            acc_len += SEGMENT_S
+        acc = out_label
+    cmd += ["-filter_complex", ";".join(filters), "-map", acc, "-map", f"{len(PATTERN)}:a",
+            "-c:v", "libx264", "-preset", "veryfast", "-g", str(2 * FPS), "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-t", str(length), str(out)]
+    _run(cmd)
+
+def make_media(seconds, media_dir: Path):
+    """
+    seconds 길이의 합성 영상과 정답 타임라인(<name>.json)을 만든다. 이미 있으면 재사용.
+    return: (video path, truth dict)
+    """
+    media_dir.mkdir(parents=True, exist_ok=True)
+    base = media_dir / f"base_v{BENCH_VERSION}.mp4"
+    if not base.exists():
+        _make_base(base)
+    period, base_cuts, base_dissolves = _base_timeline()
+    video = media_dir / f"synthetic_v{BENCH_VERSION}_{int(seconds)}s.mp4"
+    truth_file = video.with_suffix(".json")
+    if video.exists() and truth_file.exists():
+        return video, json.load(open(truth_file, "r", encoding="utf-8"))
+    _run(["ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-stream_loop", "-1", "-i", str(base),
+          "-t", str(seconds), "-c", "copy", str(video)])
+    cuts, dissolves = [], []
+    k = 0
+    while k * period < seconds:
+        off = k * period
+        if k > 0:
+            cuts.append(off)  # 패턴 마지막 세그먼트 -> 첫 세그먼트 경계
+        cuts += [off + c for c in base_cuts if off + c < seconds]
+        dissolves += [[off + a, off + b] for a, b in base_dissolves if off + b < seconds]
+        k += 1
+    truth = {"duration": float(seconds), "fps": FPS, "tempo": float(BPM), "cuts": cuts, "dissolves": dissolves}
+    with open(truth_file, "w", encoding="utf-8") as fh:
+        json.dump(truth, fh)
+    return video, truth
+
+def _usage():
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + kids.ru_utime + kids.ru_stime
+
+def _timed(fn, repeat=1):
+    """
+    fn()을 repeat번 실행해 가장 빠른 wall time과 그때의 CPU 시간(자식 프로세스 포함)을 반환.
+    """
+    best = None
+    result = None
+    for _ in range(max(1, repeat)):
+        c0 = _usage()
+        t0 = time.perf_counter()
+        result = fn()
+        wall = time.perf_counter() - t0
+        cpu = _usage() - c0
+        if best is None or wall < best["wall_s"]:
+            best = {"wall_s": round(wall, 4), "cpu_s": round(cpu, 4)}
+    return result, best
+
+def _match(found, expected, tol):
+    """
+    found/expected 시각 목록을 tol(초) 안에서 1:1 매칭. return: (precision, recall)
+    """
+    expected = sorted(expected)
+    used = set()
+    hits = 0
+    for t in sorted(found):
+        for j, e in enumerate(expected):
+            if j not in used and abs(t - e) <= tol:
+                used.add(j)
+                hits += 1
+                break
+    precision = hits / len(found) if found else 1.0
+    recall = hits / len(expected) if expected else 1.0
+    return round(precision, 4), round(recall, 4)
+
+def _bench_events(video: Path, truth, n_events, event_s):
+    # 파일 전체에 고르게 흩어진 고정 길이 이벤트 (매 3번째 전환은 dissolve)
+    duration = truth["duration"]
+    n = max(2, min(n_events, int(duration // (event_s * 2))))
+    step = (duration - event_s) / n
+    events = []
+    out_time = 0.0
+    for i in range(n):
+        start = round(i * step, 3)
+        dissolve = i > 0 and i % 3 == 0
+        events.append({"infile": str(video), "in_start": start, "in_end": round(start + event_s, 3),
+                       "out_start": out_time, "duration": event_s,
+                       "transition": "dissolve" if dissolve else "cut",
+                       "transition_duration": 0.5 if dissolve else 0.0})
+        out_time += event_s
+    return events
+
+def bench_size(seconds, media_dir: Path, stages, repeat=1, trim_workers=None, n_events=40, n_xfade=12, event_s=3.0,
+               scene_workers=None):
+    video, truth = make_media(seconds, media_dir)
+    tol = 2.0 / truth["fps"]
+    res = {"video": str(video), "duration_s": truth["duration"], "stages": {}, "accuracy": {}}
+    log = lambda m: None
+    scenes = None
+    if "detect_scenes" in stages or "detect_dissolves" in stages:
+        scenes, t = _timed(lambda: detect_scenes(video), repeat)
+        if "detect_scenes" in stages:
+            res["stages"]["detect_scenes"] = t
+        found = [s for s, _ in scenes[1:]]
+        p, r = _match(found, truth["cuts"] + [b for _, b in truth["dissolves"]], max(tol, DISSOLVE_S))
+        res["accuracy"]["scene_boundaries"] = {"found": len(found), "precision": p, "recall": r}
+    variants = [
+        ("detect_scenes_fast", "scene_boundaries_fast", lambda: detect_scenes(video, mode="fast")),
+        ("detect_scenes_sharded", "scene_boundaries_sharded", lambda: detect_scenes_sharded(video, workers=scene_workers)),
+    ]
+    for stage, name, fn in variants:
+        if stage not in stages:
+            continue
+        found_scenes, t = _timed(fn, repeat)
+        res["stages"][stage] = t
+        found_v = [s for s, _ in found_scenes[1:]]
+        p, r = _match(found_v, truth["cuts"] + [b for _, b in truth["dissolves"]], max(tol, DISSOLVE_S))
+        acc = {"found": len(found_v), "precision": p, "recall": r}
+        if scenes is not None:
+            # full 모드와 같은 컷 프레임을 찾았는지 (반 프레임 허용)
+            p, r = _match(found_v, [s for s, _ in scenes[1:]], 0.5 / truth["fps"])
+            acc.update({"full_precision": p, "full_recall": r})
+            if res["stages"].get("detect_scenes"):
+                acc["speedup"] = round(res["stages"]["detect_scenes"]["wall_s"] / max(t["wall_s"], 1e-6), 2)
+        res["accuracy"][name] = acc
+    if "detect_dissolves" in stages:
+        trans, t = _timed(lambda: detect_dissolves(video, scenes), repeat)
+        res["stages"]["detect_dissolves"] = t
+        flagged = [scenes[tr["between"][1]][0] for tr in trans if tr["between"][1] < len(scenes)]
+        p, r = _match(flagged, [b for _, b in truth["dissolves"]], DISSOLVE_S + tol)
+        res["accuracy"]["dissolves"] = {"found": len(flagged), "precision": p, "recall": r}
+    if "analyze_audio" in stages:
+        audio, t = _timed(lambda: analyze_audio(video), repeat)
+        res["stages"]["analyze_audio"] = t
+        tempo = audio.get("tempo")
+        res["accuracy"]["tempo"] = {"found": tempo, "expected": truth["tempo"],
+                                    "error_bpm": round(abs(tempo - truth["tempo"]), 2) if tempo else None}
+    render_stages = {"trim_parts", "render_concat", "render_transitions"} & set(stages)
+    if render_stages:
+        events = _bench_events(video, truth, n_events, event_s)
+        tmpdir = Path(tempfile.mkdtemp(prefix="bench_render_"))
+        try:
+            parts, t = _timed(lambda: _trim_parts([video], events, tmpdir / "parts", log_fn=log, workers=trim_workers, use_cache=False), repeat)
+            if "trim_parts" in stages:
+                res["stages"]["trim_parts"] = dict(t, events=len(events))
+            if "render_concat" in stages:
+                _, t = _timed(lambda: _render_concat(parts, str(tmpdir / "concat.mp4"), tmpdir / "parts", log_fn=log), repeat)
+                res["stages"]["render_concat"] = dict(t, parts=len(parts))
+            if "render_transitions" in stages:
+                sub = parts[:n_xfade]
+                _, t = _timed(lambda: _render_with_transitions(sub, str(tmpdir / "xfade.mp4"), tmpdir / "parts", log_fn=log), repeat)
+                res["stages"]["render_transitions"] = dict(t, parts=len(sub))
+        finally:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+    return res
+
+def compare(results, baseline, threshold=0.2, min_delta=0.05):
+    """
+    wall time 비교. (현재 - 기준) > threshold * 기준 이고 차이가 min_delta초 이상이면 회귀.
+    return: 비교 행 목록 [{size, stage, baseline_s, current_s, ratio, regression}]
+    """
+    rows = []
+    for size, cur in results["results"].items():
+        base = baseline.get("results", {}).get(size)
+        if not base:
+            continue
+        for stage, m in cur["stages"].items():
+            b = base["stages"].get(stage)
+            if not b:
+                continue
+            ratio = m["wall_s"] / b["wall_s"] if b["wall_s"] > 0 else float("inf")
+            regression = (m["wall_s"] - b["wall_s"]) > max(threshold * b["wall_s"], min_delta)
+            rows.append({"size": size, "stage": stage, "baseline_s": b["wall_s"], "current_s": m["wall_s"],
+                         "ratio": round(ratio, 3), "regression": regression})
+    return rows
+
+def accuracy_failures(results, min_accuracy):
+    """컷 감지 precision/recall 항목 중 min_accuracy 미만인 것. return: [(size, 항목, 키, 값)]"""
+    fails = []
+    for size, r in results["results"].items():
+        for name in ("scene_boundaries", "scene_boundaries_fast", "scene_boundaries_sharded"):
+            acc = r["accuracy"].get(name) or {}
+            for k in ("precision", "recall", "full_precision", "full_recall"):
+                if k in acc and acc[k] < min_accuracy:
+                    fails.append((size, name, k, acc[k]))
+    return fails
+
+def main():
+    p = argparse.ArgumentParser(description="Synthetic-media pipeline benchmark")
+    p.add_argument("--sizes", default="60,600", help="영상 길이 목록(초), 쉼표 구분")
+    p.add_argument("--full", action="store_true", help=f"길이 {FULL_SIZES} 전체 실행")
+    p.add_argument("--stages", default=",".join(STAGES), help="측정할 단계, 쉼표 구분")
+    p.add_argument("--repeat", type=int, default=1, help="단계별 반복 횟수 (가장 빠른 값 기록)")
+    p.add_argument("--trim-workers", type=int, default=None)
+    p.add_argument("--scene-workers", type=int, default=None, help="detect_scenes_sharded 프로세스 수 (기본: CPU 수)")
+    p.add_argument("--events", type=int, default=40, help="트림/concat 벤치마크 이벤트 수")
+    p.add_argument("--media-dir", default=None, help="합성 미디어 보관 폴더 (기본: cache/bench)")
+    p.add_argument("--out", default=None, help="결과 JSON 경로 (기본: 표준 출력)")
+    p.add_argument("--baseline", default=None, help="비교할 기준 결과 JSON")
+    p.add_argument("--threshold", type=float, default=0.2, help="허용 감속 비율 (0.2 = 20%%)")
+    p.add_argument("--save-baseline", default=None, help="이번 결과를 기준 결과로 저장")
+    p.add_argument("--min-accuracy", type=float, default=None, help="컷 감지 precision/recall 하한 (미만이면 종료 코드 1)")
+    args = p.parse_args()
+
+    sizes = FULL_SIZES if args.full else [int(float(s)) for s in args.sizes.split(",") if s]
+    stages = [s for s in args.stages.split(",") if s]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        p.error(f"unknown stages: {sorted(unknown)} (choose from {STAGES})")
+    media_dir = Path(args.media_dir) if args.media_dir else cache.cache_dir("bench")
+
+    results = {
+        "version": BENCH_VERSION,
+        "created_at": time.time(),
+        "env": {"python": platform.python_version(), "platform": platform.platform(),
+                "cpu_count": os.cpu_count(), "ffmpeg": _ffmpeg_version()},
+        "params": {"stages": stages, "repeat": args.repeat, "trim_workers": args.trim_workers, "events": args.events,
+                   "scene_workers": args.scene_workers},
+        "results": {}
+    }
+    for sec in sizes:
+        print(f"[bench] {sec}s ...", file=sys.stderr, flush=True)
+        r = bench_size(sec, media_dir, stages, repeat=args.repeat, trim_workers=args.trim_workers, n_events=args.events,
+                       scene_workers=args.scene_workers)
+        results["results"][f"{sec}s"] = r
+        for stage, m in r["stages"].items():
+            print(f"[bench]   {stage:<20} {m['wall_s']:8.2f}s wall {m['cpu_s']:8.2f}s cpu", file=sys.stderr, flush=True)
+
+    text = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(text, encoding="utf-8")
+        print(f"[bench] baseline saved: {args.save_baseline}", file=sys.stderr)
+
+    status = 0
+    if args.min_accuracy is not None:
+        for size, name, k, v in accuracy_failures(results, args.min_accuracy):
+            print(f"[bench] {size:>6} {name} {k} {v:.3f} < {args.min_accuracy} ACCURACY", file=sys.stderr)
+            status = 1
+    if args.baseline:
+        baseline = json.load(open(args.baseline, "r", encoding="utf-8"))
+        if baseline.get("version") != BENCH_VERSION:
+            print(f"[bench] baseline version {baseline.get('version')} != {BENCH_VERSION}; media differ, skipping comparison", file=sys.stderr)
+            return status
+        rows = compare(results, baseline, threshold=args.threshold)
+        for row in rows:
+            flag = "REGRESSION" if row["regression"] else "ok"
+            print(f"[bench] {row['size']:>6} {row['stage']:<20} {row['baseline_s']:8.2f}s -> {row['current_s']:8.2f}s "
+                  f"(x{row['ratio']:.2f}) {flag}", file=sys.stderr)
+        if any(row["regression"] for row in rows):
+            return 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
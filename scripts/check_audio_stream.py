@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+scripts/check_audio_stream.py
+- 스트리밍 오디오 분석(_StreamingAudioStats)과 전체 로드 분석(librosa beat_track / rms)이 같은 결과를 내는지 확인
+- 합성 픽스처: 비트 없는 사인파(템포 0 이어야 함), 120 BPM 클릭 트랙
+usage:
+  python scripts/check_audio_stream.py [--seconds 60] [--tol 0.05]
+종료 코드: 0 일치, 1 불일치
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import librosa
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from modules.analyzer import AUDIO_SR, AUDIO_BLOCK_S, _AUDIO_HOP, _StreamingAudioStats
+
+def beatless(seconds, sr=AUDIO_SR):
+    t = np.arange(int(seconds * sr)) / sr
+    return (0.3 * np.sin(2 * np.pi * 440.0 * t)).astype(np.float32)
+
+def clicks(seconds, bpm=120.0, sr=AUDIO_SR):
+    times = np.arange(0.0, seconds, 60.0 / bpm)
+    return librosa.clicks(times=times, sr=sr, length=int(seconds * sr)).astype(np.float32)
+
+def full(y, sr=AUDIO_SR):
+    tempo, _ = librosa.beat.beat_track(y=y, sr=sr, trim=False)
+    rms = librosa.feature.rms(y=y)[0]
+    # librosa 0.10+는 길이 1 배열을 반환
+    return {"tempo": float(np.atleast_1d(tempo)[0]), "rms_mean": float(np.mean(rms)), "rms_std": float(np.std(rms))}
+
+def streaming(y, sr=AUDIO_SR, block_seconds=AUDIO_BLOCK_S):
+    stats = _StreamingAudioStats(sr)
+    block = int(block_seconds * sr) // _AUDIO_HOP * _AUDIO_HOP
+    for i in range(0, len(y), block):
+        stats.feed(y[i:i + block])
+    stats.feed(np.zeros(0, dtype=np.float32), final=True)
+    return stats.result()
+
+def _close(a, b, tol):
+    return abs(a - b) <= tol * max(abs(a), abs(b), 1e-9)
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--seconds", type=float, default=60.0)
+    p.add_argument("--tol", type=float, default=0.05, help="relative tolerance")
+    args = p.parse_args()
+    failures = 0
+    for name, y in (("beatless", beatless(args.seconds)), ("clicks_120bpm", clicks(args.seconds))):
+        a, b = full(y), streaming(y)
+        ok = all(_close(a[k], b[k], args.tol) for k in ("tempo", "rms_mean", "rms_std"))
+        if name == "beatless":
+            ok = ok and a["tempo"] == 0.0 and b["tempo"] == 0.0
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {name}: full tempo={a['tempo']:.2f} rms={a['rms_mean']:.4f}/{a['rms_std']:.4f}"
+              f" | streaming tempo={b['tempo']:.2f} rms={b['rms_mean']:.4f}/{b['rms_std']:.4f}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+scripts/check_segment_cache.py
+- 세그먼트 캐시 회귀 확인: 같은 작업 폴더(out_base/parts)에 이벤트 순서를 바꿔 다시 트림해도
+  이전 렌더에서 하드링크로 공유된 캐시 항목(cache/segments/<key>.mp4)이 덮어써지지 않는지 확인
+- ffmpeg lavfi로 짧은 테스트 영상을 만들고, 캐시는 임시 폴더(AUTO_EDIT_CACHE_DIR)를 쓴다
+usage:
+  python scripts/check_segment_cache.py [--keep]
+종료 코드: 0 정상, 1 캐시 항목 손상
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+WORK = Path(tempfile.mkdtemp(prefix="segcheck_"))
+os.environ["AUTO_EDIT_CACHE_DIR"] = str(WORK / "cache")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from modules import segments
+from modules.editor import TRIM_ENCODER, _trim_parts
+
+def _sha1(path):
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+def _make_clip(out: Path):
+    subprocess.run(["ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+                    "-f", "lavfi", "-i", "testsrc2=size=320x180:rate=25:duration=6",
+                    "-f", "lavfi", "-i", "sine=frequency=440:duration=6",
+                    "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-shortest", str(out)], check=True)
+
+def _event(clip, start, end):
+    return {"infile": str(clip), "in_start": start, "in_end": end, "out_start": 0.0, "duration": end - start, "transition": "cut"}
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--keep", action="store_true", help="keep the temp folder")
+    args = p.parse_args()
+    try:
+        clip = WORK / "clip.mp4"
+        _make_clip(clip)
+        parts = WORK / "out_base" / "parts"
+        a, b, c = _event(clip, 0.0, 2.0), _event(clip, 2.0, 4.0), _event(clip, 4.0, 6.0)
+        # 1차: part_0000 = a, part_0001 = b (캐시에 저장되며 하드링크 공유)
+        _trim_parts([clip], [a, b], parts, log_fn=lambda m: None)
+        entries = {}
+        for ev in (a, b):
+            entry = segments.cache.cache_dir("segments") / f"{segments.segment_key(ev, TRIM_ENCODER)}.mp4"
+            entries[entry] = _sha1(entry)
+        # 2차: 같은 폴더에서 part_0000 = c (miss, 새로 인코딩), part_0001 = a (hit)
+        _trim_parts([clip], [c, a], parts, log_fn=lambda m: None)
+        bad = [str(e) for e, h in entries.items() if _sha1(e) != h]
+        if _sha1(parts / "part_0001.mp4") != entries[next(iter(entries))]:
+            bad.append(str(parts / "part_0001.mp4"))
+        if bad:
+            print("FAIL: overwritten by re-render:", *bad, sep="\n  ")
+            return 1
+        print("OK: cache entries unchanged after re-render into the same out_base")
+        return 0
+    finally:
+        if args.keep:
+            print("kept", WORK)
+        else:
+            shutil.rmtree(WORK, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+scripts/check_style_stats.py
+- 스타일 요약 통계(modules/style.py)가 정확한 값과 맞는지 확인: 평균/표준편차는 statistics와 같고,
+  히스토그램 중앙값은 statistics.median과 구간 폭 절반 이내, 병합 결과는 한 번에 넣은 것과 같아야 한다
+usage:
+  python scripts/check_style_stats.py [--trials 500] [--seed 0]
+종료 코드: 0 정상, 1 불일치
+"""
+import argparse
+import random
+import statistics
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from modules.style import STAT_SPECS, new_stat, stat_add, stat_merge, stat_mean, stat_std, stat_quantile
+
+# (지표, 값 목록, 기대 중앙값)
+EXACT_CASES = [
+    ("tempo", [90.0, 120.0], 105.0),
+    ("avg_cut_length", [2.0, 4.0], 3.0),
+    ("avg_cut_length", [3.3], 3.3),
+    ("tempo", [30.0, 100.0, 300.0], 100.5),   # 구간 밖 값은 min/max, 가운데 값은 구간 중심
+]
+
+def _stat(name, values):
+    st = new_stat(name)
+    for v in values:
+        stat_add(st, v)
+    return st
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--trials", type=int, default=500)
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args()
+    rng = random.Random(args.seed)
+    failures = []
+    for name, values, want in EXACT_CASES:
+        got = stat_quantile(_stat(name, values), 0.5)
+        if abs(got - want) > 1e-9:
+            failures.append(f"{name} {values}: median {got} != {want}")
+    for _ in range(args.trials):
+        name = rng.choice(["avg_cut_length", "tempo"])
+        lo, hi, bins = STAT_SPECS[name]
+        values = [rng.uniform(lo, hi) for _ in range(rng.randint(1, 12))]
+        st = _stat(name, values)
+        tol = (hi - lo) / bins / 2 + 1e-9
+        med = stat_quantile(st, 0.5)
+        if abs(med - statistics.median(values)) > tol:
+            failures.append(f"{name} {values}: median {med} vs {statistics.median(values)}")
+        if abs(stat_mean(st) - statistics.fmean(values)) > 1e-9 * max(1.0, hi):
+            failures.append(f"{name} {values}: mean {stat_mean(st)} vs {statistics.fmean(values)}")
+        if abs(stat_std(st) - statistics.pstdev(values)) > 1e-6 * max(1.0, hi):
+            failures.append(f"{name} {values}: std {stat_std(st)} vs {statistics.pstdev(values)}")
+        k = rng.randint(0, len(values))
+        merged = stat_merge(_stat(name, values[:k]), _stat(name, values[k:]))
+        if stat_quantile(merged, 0.5) != med or merged["count"] != st["count"]:
+            failures.append(f"{name} {values}: merge at {k} differs")
+    for f in failures[:20]:
+        print("FAIL", f)
+    print(f"{len(failures)} failures ({len(EXACT_CASES)} exact cases, {args.trials} random trials)")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
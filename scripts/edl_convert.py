@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+scripts/edl_convert.py
+- EDL 형식 변환: edl.json <-> edl.aedl (modules/edl.py, 무손실)
+usage:
+  python scripts/edl_convert.py edls/ep01/edl.json            # -> edls/ep01/edl.aedl
+  python scripts/edl_convert.py edls/ep01/edl.aedl [out.json] [--indent 2]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from modules.edl import is_aedl, json_to_aedl, aedl_to_json
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("src", help="edl.json or edl.aedl")
+    p.add_argument("dst", nargs="?", default=None, help="output path (default: same name, other extension)")
+    p.add_argument("--indent", type=int, default=None, help="JSON indent when writing edl.json")
+    args = p.parse_args()
+    if is_aedl(args.src):
+        out = aedl_to_json(args.src, args.dst, indent=args.indent)
+    else:
+        out = json_to_aedl(args.src, args.dst)
+    print("Wrote", out)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+scripts/render.py
+- EDL(edl.aedl / edl.json) -> 최종 mp4 렌더 (render.sh의 파이썬 버전, 파트 트리밍 병렬 실행)
+usage:
+  python scripts/render.py edl.aedl output/final.mp4 [--workers 4] [--smart] [--direct] [--trace] [--draft] [--no-cache]
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from modules import trace
+from modules import proxy
+from modules.edl import load_edl
+from modules.editor import _trim_parts, _render_timeline, _render_direct
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("edl", help="edl.aedl or edl.json path")
+    p.add_argument("out", help="output mp4 path")
+    p.add_argument("--workers", type=int, default=None, help="concurrent ffmpeg trims (default: cores/2)")
+    p.add_argument("--smart", action="store_true", help="stream-copy keyframe-aligned ranges, re-encode only GOP edges")
+    p.add_argument("--direct", action="store_true", help="render straight from sources in one ffmpeg pass (no part files)")
+    p.add_argument("--keep-parts", action="store_true", help="keep intermediate part files")
+    p.add_argument("--draft", action="store_true", help="render the same EDL from cached low-res proxies (quick preview)")
+    p.add_argument("--no-cache", action="store_true", help="re-encode every part instead of reusing cached segments")
+    p.add_argument("--trace", action="store_true", help="write per-stage trace.json / trace_summary.txt next to the output")
+    args = p.parse_args()
+    edl = load_edl(args.edl, with_style=False)
+    events = edl.get("events", [])
+    if not events:
+        print("No events in EDL:", args.edl)
+        sys.exit(1)
+    if args.draft:
+        events = proxy.proxy_events(events, log_fn=print)
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmpdir = Path(tempfile.mkdtemp(prefix="render_parts_"))
+    with trace.run("render", out_dir=out.parent, log_fn=print, enabled=args.trace or None, events=len(events)):
+        try:
+            if args.direct:
+                _render_direct(events, str(out), tmpdir, log_fn=print)
+            else:
+                part_paths = _trim_parts(None, events, tmpdir, log_fn=print, workers=args.workers, mode="smart" if args.smart else "encode",
+                                         use_cache=not args.no_cache)
+                _render_timeline(part_paths, str(out), tmpdir, log_fn=print, workers=args.workers)
+        finally:
+            if args.keep_parts:
+                print("Parts kept in", tmpdir)
+            else:
+                shutil.rmtree(tmpdir, ignore_errors=True)
+    print("Rendered", out)
+
+if __name__ == "__main__":
+    main()